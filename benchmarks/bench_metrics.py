@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Overhead benchmark for the built-in metrics
+Usage: python -m benchmarks.bench_metrics [--iterations N]
+
+Reports the cost of the individual recording calls and the end-to-end cost
+of ToolRegistry.execute_tool on add_numbers with metrics enabled and
+disabled. The difference is the per-call instrumentation overhead.
+"""
+
+import argparse
+import timeit
+
+from server.metrics import Metrics
+from server.registry import ToolRegistry
+
+UNCACHED_TOOL = "bench_uncached_add_numbers"
+
+def per_call_ns(statement, iterations: int) -> float:
+    """Best-of-five time per call in nanoseconds"""
+    return min(timeit.repeat(statement, number=iterations, repeat=5)) / iterations * 1e9
+
+def run(iterations: int):
+    """Print the cost of recording and of instrumented tool calls"""
+    metrics = Metrics()
+    print(f"{'operation':<36}{'per call':>12}")
+    print("-" * 48)
+    print(f"{'Metrics.record_call':<36}{per_call_ns(lambda: metrics.record_call('add_numbers', 'success'), iterations):>9.0f} ns")
+    print(f"{'Metrics.record_phase':<36}{per_call_ns(lambda: metrics.record_phase('add_numbers', 'execution', 0.00012), iterations):>9.0f} ns")
+    
+    registry = ToolRegistry()
+    # A copy of add_numbers that is not deterministic, so the result cache
+    # is bypassed and every call runs the tool; registry snapshots are immutable
+    add_numbers = registry.get_tool("add_numbers")
+    registry.register_tool(
+        UNCACHED_TOOL,
+        function=add_numbers["function"],
+        request_model=add_numbers["request_model"],
+        description=add_numbers["description"],
+        parameters=add_numbers["parameters"]
+    )
+    arguments = {"a": 12, "b": 30}
+    
+    registry.metrics.enabled = False
+    disabled = per_call_ns(lambda: registry.execute_tool(UNCACHED_TOOL, arguments), iterations)
+    registry.metrics.enabled = True
+    enabled = per_call_ns(lambda: registry.execute_tool(UNCACHED_TOOL, arguments), iterations)
+    
+    print(f"{'execute_tool, metrics disabled':<36}{disabled:>9.0f} ns")
+    print(f"{'execute_tool, metrics enabled':<36}{enabled:>9.0f} ns")
+    print(f"{'overhead per call':<36}{enabled - disabled:>9.0f} ns")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=50_000)
+    args = parser.parse_args()
+    run(args.iterations)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of response encoders in bytes per second
+Usage: python -m benchmarks.bench_serialization [--iterations N]
+
+Encodes representative response bodies with every available encoder:
+the standard library (what the server used before), orjson, Pydantic's
+compiled serializer and MessagePack. Throughput is measured in bytes of
+encoded output per second.
+"""
+
+import argparse
+import json
+import timeit
+
+from server.registry import registry
+from server.schemas.tool_schema import BatchResponse, ToolResponse
+from server.serialization import encode_json, msgpack, orjson
+
+def _payloads():
+    """name -> Pydantic model or plain dict, as the routes hand them to the serializer"""
+    single = ToolResponse(success=True, result=42, message="Successfully added 12 and 30")
+    batch = BatchResponse(
+        results=[ToolResponse(success=True, result=index, message=f"Result {index}") for index in range(500)],
+        count=500
+    )
+    catalog = {
+        "success": True,
+        "tools": {
+            name: {"description": tool["description"], "parameters": tool["request_model"].model_json_schema()}
+            for name, tool in registry.list_tools().items()
+        },
+        "count": len(registry.list_tools())
+    }
+    return {"tool_response": single, "batch_500": batch, "catalog": catalog}
+
+def _as_dict(value):
+    return value.model_dump(mode="json") if hasattr(value, "model_dump") else value
+
+def encoders():
+    """label -> encode function; models are converted to dicts where the encoder needs it"""
+    available = {
+        "stdlib json": lambda value: json.dumps(_as_dict(value), separators=(",", ":")).encode(),
+        "serializer": encode_json
+    }
+    if orjson is not None:
+        available["orjson"] = lambda value: orjson.dumps(_as_dict(value))
+    if msgpack is not None:
+        available["msgpack"] = lambda value: msgpack.packb(_as_dict(value))
+    return available
+
+def run(iterations: int):
+    """Time every encoder on every payload and print a table"""
+    print(f"{'payload':<16}{'encoder':<14}{'bytes':>9}{'us/op':>10}{'MB/s':>10}")
+    print("-" * 59)
+    
+    for payload_name, payload in _payloads().items():
+        for label, encode in encoders().items():
+            size = len(encode(payload))
+            seconds = min(timeit.repeat(lambda: encode(payload), number=iterations, repeat=5)) / iterations
+            print(f"{payload_name:<16}{label:<14}{size:>9}{seconds * 1e6:>10.2f}{size / seconds / 1e6:>10.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2_000)
+    args = parser.parse_args()
+    run(args.iterations)
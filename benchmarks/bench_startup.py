@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for tool discovery with lazy imports
+Usage: python -m benchmarks.bench_startup [--counts 10 100 500]
+
+Generates throwaway packages with N tool modules, each doing some work at
+import time to stand in for a heavy dependency, and times building a
+ToolRegistry in a fresh interpreter. "lazy" is the default behaviour (tool
+modules imported on first call); "eager" also imports every module up
+front, which is what startup cost looked like before lazy loading.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TOOL_TEMPLATE = '''
+from server.discovery import tool
+from server.schemas.tool_schema import AddNumbersRequest, ToolResponse
+
+# Stand-in for a heavy dependency imported by the tool
+_TABLE = [i * i for i in range({import_work})]
+
+@tool(description="Synthetic tool {index}", request_model=AddNumbersRequest, deterministic=True)
+def synthetic_tool_{index}(request):
+    """Synthetic tool {index}"""
+    return ToolResponse(success=True, result=request.a + request.b + {index})
+'''
+
+MEASURE = '''
+import sys, time
+start = time.perf_counter()
+from server.registry import ToolRegistry
+registry = ToolRegistry(packages=[{package!r}], entry_point_group="")
+if {eager}:
+    registry.warm_up()
+elapsed = time.perf_counter() - start
+assert len(registry.list_tools()) == {count}
+print(elapsed)
+'''
+
+def generate_package(directory: str, count: int, import_work: int) -> str:
+    """Write a package with count tool modules and return its name"""
+    package = f"bench_tools_{count}"
+    package_dir = os.path.join(directory, package)
+    os.makedirs(package_dir)
+    open(os.path.join(package_dir, "__init__.py"), "w").close()
+    for index in range(count):
+        with open(os.path.join(package_dir, f"tool_{index}.py"), "w") as module:
+            module.write(TOOL_TEMPLATE.format(index=index, import_work=import_work))
+    return package
+
+def measure(directory: str, package: str, count: int, eager: bool, repeat: int) -> float:
+    """Best-of-repeat startup time in a fresh interpreter, in seconds"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([PROJECT_ROOT, directory]), PYTHONDONTWRITEBYTECODE="1")
+    script = MEASURE.format(package=package, eager=eager, count=count)
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", script], env=env, check=True, capture_output=True, text=True
+        )
+        timings.append(float(output.stdout.strip()))
+    return min(timings)
+
+def run(counts, import_work: int, repeat: int):
+    """Print startup times for every tool count"""
+    print(f"{'tools':>6}{'lazy':>12}{'eager':>12}")
+    print("-" * 30)
+    with tempfile.TemporaryDirectory() as directory:
+        for count in counts:
+            package = generate_package(directory, count, import_work)
+            lazy = measure(directory, package, count, eager=False, repeat=repeat)
+            eager = measure(directory, package, count, eager=True, repeat=repeat)
+            print(f"{count:>6}{lazy * 1000:>9.1f} ms{eager * 1000:>9.1f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--import-work", type=int, default=50_000,
+                        help="Size of the loop each tool module runs at import time")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.counts, args.import_work, args.repeat)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark comparing the dict and raw-body validation paths
+Usage: python -m benchmarks.bench_validation [--iterations N]
+
+The dict path mirrors what the server did before the raw-body fast path:
+decode the body into a dict, then build the request model from it. The raw
+path hands the bytes to the tool's precompiled validator in one step.
+"""
+
+import argparse
+import json
+import timeit
+
+from server.registry import registry
+
+PAYLOADS = {
+    "add_numbers": b'{"a": 12345, "b": -678}',
+    "dummy_tool": b"{}",
+}
+
+def dict_path(tool, raw_body: bytes):
+    """Decode to a dict, then construct the model (previous behaviour)"""
+    return tool["request_model"](**json.loads(raw_body))
+
+def raw_path(tool, raw_body: bytes):
+    """Validate the raw bytes with the precompiled validator"""
+    return tool["validator"].validate_json(raw_body)
+
+def run(iterations: int):
+    """Time both paths for every benchmarked tool and print a table"""
+    print(f"{'tool':<14}{'dict path':>14}{'raw path':>14}{'speedup':>10}")
+    print("-" * 52)
+    
+    for tool_name, raw_body in PAYLOADS.items():
+        tool = registry.get_tool(tool_name)
+        timings = {}
+        for label, path in (("dict", dict_path), ("raw", raw_path)):
+            seconds = min(timeit.repeat(lambda: path(tool, raw_body), number=iterations, repeat=5))
+            timings[label] = seconds / iterations * 1e9
+        
+        print(
+            f"{tool_name:<14}{timings['dict']:>11.0f} ns{timings['raw']:>11.0f} ns"
+            f"{timings['dict'] / timings['raw']:>9.2f}x"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+    run(args.iterations)
@@ -0,0 +1,252 @@
+# Load and latency benchmark suite for the MCP server
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import httpx
+
+from server.config import config
+from server.schemas.tool_schema import SyntheticWorkloadRequest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# Tool registered only for benchmarks, after startup, so the route generated
+# for a tool added at runtime is exercised (every registered tool gets its own
+# route; the generic /tools/{tool_name} route only answers unknown tools)
+RUNTIME_BENCH_TOOL = "bench_add_numbers"
+# Synthetic workload driven by the load profiles (benchmarks/profiles.py)
+SYNTHETIC_TOOL = "synthetic_workload"
+
+# name -> (method, path, JSON body)
+SCENARIOS: Dict[str, Tuple[str, str, Optional[Dict[str, Any]]]] = {
+    "health": ("GET", "/health", None),
+    "list_tools": ("GET", f"{config.API_PREFIX}/tools", None),
+    "add_numbers": ("POST", f"{config.API_PREFIX}/tools/add_numbers", {"a": 12, "b": 30}),
+    "dummy_tool": ("POST", f"{config.API_PREFIX}/tools/dummy_tool", None),
+    "runtime_tool": ("POST", f"{config.API_PREFIX}/tools/{RUNTIME_BENCH_TOOL}", {"a": 12, "b": 30}),
+}
+
+def register_bench_tools(registry):
+    """Register the tools the benchmark scenarios and load profiles rely on"""
+    if not registry.tool_exists(RUNTIME_BENCH_TOOL):
+        add_numbers = registry.get_tool("add_numbers")
+        registry.register_tool(
+            RUNTIME_BENCH_TOOL,
+            function=add_numbers["function"],
+            request_model=add_numbers["request_model"],
+            description="add_numbers registered at runtime for the benchmarks",
+            parameters=add_numbers["parameters"]
+        )
+    if not registry.tool_exists(SYNTHETIC_TOOL):
+        from server.workloads.synthetic import synthetic_workload
+        registry.register_tool(
+            SYNTHETIC_TOOL,
+            function=synthetic_workload,
+            request_model=SyntheticWorkloadRequest,
+            description="Simulated tool workload for capacity testing"
+        )
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+async def _drive(client: httpx.AsyncClient, scenario: str, concurrency: int, requests: int) -> Dict[str, Any]:
+    """Send requests for one scenario at a fixed concurrency and summarize latencies"""
+    method, path, body = SCENARIOS[scenario]
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000
+    }
+
+async def _allocations(client: httpx.AsyncClient, scenario: str, requests: int) -> Dict[str, float]:
+    """
+    Allocation profile of sequential requests, measured with tracemalloc
+
+    ``alloc_kib_per_request`` is the mean peak of traced memory above the
+    starting point during a request; ``retained_blocks_per_request`` is the
+    growth in live memory blocks, which should stay near zero. In-process
+    runs include the client's own allocations.
+    """
+    method, path, body = SCENARIOS[scenario]
+    peaks = 0
+    tracemalloc.start()
+    try:
+        blocks_before = sys.getallocatedblocks()
+        for _ in range(requests):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await client.request(method, path, json=body)
+            peaks += tracemalloc.get_traced_memory()[1] - current
+        blocks_after = sys.getallocatedblocks()
+    finally:
+        tracemalloc.stop()
+    return {
+        "alloc_kib_per_request": peaks / requests / 1024,
+        "retained_blocks_per_request": (blocks_after - blocks_before) / requests
+    }
+
+async def run_suite(
+    client_factory: Callable[[], httpx.AsyncClient],
+    scenarios: List[str],
+    concurrency_levels: List[int],
+    requests: int,
+    warmup: int,
+    measure_allocations: bool
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run every scenario at every concurrency level
+
+    Returns:
+        {"<scenario>@c<concurrency>": stats}
+    """
+    results = {}
+    async with client_factory() as client:
+        for scenario in scenarios:
+            await _drive(client, scenario, 1, warmup)
+            allocations = await _allocations(client, scenario, min(requests, 200)) if measure_allocations else {}
+            for concurrency in concurrency_levels:
+                stats = await _drive(client, scenario, concurrency, requests)
+                stats.update(allocations)
+                results[f"{scenario}@c{concurrency}"] = stats
+    return results
+
+def in_process_client() -> httpx.AsyncClient:
+    """Client that calls the app in-process through the ASGI transport"""
+    from server.main import app
+    from server.registry import registry
+    register_bench_tools(registry)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+class UvicornServer:
+    """Local uvicorn process running the app for over-the-wire benchmarks"""
+
+    def __init__(self, port: Optional[int] = None):
+        self.port = port or _free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self._process: Optional[subprocess.Popen] = None
+
+    @property
+    def pid(self) -> Optional[int]:
+        """Process id of the running server"""
+        return None if self._process is None else self._process.pid
+
+    def __enter__(self) -> "UvicornServer":
+        env = dict(os.environ, DEBUG="false", PYTHONPATH=PROJECT_ROOT)
+        self._process = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.serve", "--port", str(self.port)],
+            cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                if httpx.get(f"{self.base_url}/health", timeout=1).status_code == 200:
+                    return self
+            except httpx.TransportError:
+                time.sleep(0.1)
+        self.__exit__(None, None, None)
+        raise RuntimeError("uvicorn did not become healthy within 30 seconds")
+
+    def __exit__(self, *exc_info):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.wait(timeout=10)
+            self._process = None
+
+    def client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(max_connections=256, max_keepalive_connections=256)
+        return httpx.AsyncClient(base_url=self.base_url, limits=limits)
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], threshold: float) -> List[str]:
+    """
+    Compare results against a baseline
+
+    A run regresses when throughput drops, or p99 latency rises, by more
+    than ``threshold`` (a fraction) for any case present in both.
+
+    Returns:
+        Human readable regression descriptions, empty if none
+    """
+    regressions = []
+    for case, stats in results.items():
+        reference = baseline.get(case)
+        if reference is None:
+            continue
+        if reference["rps"] and stats["rps"] < reference["rps"] * (1 - threshold):
+            regressions.append(
+                f"{case}: throughput {stats['rps']:.0f} req/s vs baseline {reference['rps']:.0f} req/s"
+            )
+        if reference["p99_ms"] and stats["p99_ms"] > reference["p99_ms"] * (1 + threshold):
+            regressions.append(
+                f"{case}: p99 {stats['p99_ms']:.2f} ms vs baseline {reference['p99_ms']:.2f} ms"
+            )
+    return regressions
+
+def format_table(results: Dict[str, Dict[str, Any]]) -> str:
+    """Render results as a text table"""
+    header = f"{'case':<24}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'KiB/req':>9}{'errors':>8}"
+    lines = [header, "-" * len(header)]
+    for case, stats in results.items():
+        alloc = stats.get("alloc_kib_per_request")
+        lines.append(
+            f"{case:<24}{stats['rps']:>10.0f}{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}"
+            f"{stats['p99_ms']:>9.2f}{'-' if alloc is None else f'{alloc:.1f}':>9}{stats['errors']:>8}"
+        )
+    return "\n".join(lines)
+
+def baseline_path(mode: str) -> str:
+    return os.path.join(BASELINE_DIR, f"{mode}.json")
+
+def load_baseline(path: str) -> Optional[Dict[str, Dict[str, Any]]]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as source:
+        return json.load(source)["results"]
+
+def save_baseline(path: str, mode: str, results: Dict[str, Dict[str, Any]]):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as output:
+        json.dump({
+            "mode": mode,
+            "python": sys.version.split()[0],
+            "cpu_count": os.cpu_count(),
+            "recorded_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "results": results
+        }, output, indent=2)
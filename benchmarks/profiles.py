@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Load profiles - scripted mixes of synthetic workloads for capacity testing
+Usage: python -m benchmarks.profiles --profile mixed [--mode inprocess|uvicorn] [--scale 0.5]
+
+A profile is a list of stages run one after another. Each stage sends
+``requests`` calls to the synthetic_workload tool from ``concurrency``
+concurrent clients, drawing each call's arguments from a weighted ``mix``.
+While a stage runs, /health is probed every few milliseconds: its latency
+shows how long the event loop is stalled. Server memory (RSS) is sampled
+before and after each stage to expose growth per worker.
+
+In ``--mode inprocess`` the probe would run on the server's own event loop,
+so it cannot see stalls: the probe columns are left out there, and profiles
+that only measure stalls (loop_blocking) are refused.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+import httpx
+
+from server.config import config
+from benchmarks.load import SYNTHETIC_TOOL, UvicornServer, in_process_client, percentile
+
+WORKLOAD_PATH = f"{config.API_PREFIX}/tools/{SYNTHETIC_TOOL}"
+PROBE_INTERVAL = 0.01
+
+# Profiles whose only result is the probe latency
+STALL_PROFILES = {"loop_blocking"}
+
+def stage(name: str, concurrency: int, requests: int, *mix) -> Dict[str, Any]:
+    """A profile stage; ``mix`` holds (weight, synthetic_workload arguments) pairs"""
+    return {"name": name, "concurrency": concurrency, "requests": requests, "mix": list(mix)}
+
+PROFILES: Dict[str, List[Dict[str, Any]]] = {
+    # Async I/O only: concurrency should scale until the loop itself saturates
+    "io_bound": [
+        stage(f"io@c{concurrency}", concurrency, 500, (1, {"async_io_ms": 10}))
+        for concurrency in (8, 64, 256)
+    ],
+    # CPU-bound calls on worker threads: throughput flattens at the saturation point
+    "cpu_saturation": [
+        stage(f"cpu@c{concurrency}", concurrency, 200, (1, {"cpu_ms": 5}))
+        for concurrency in (1, 4, 16, 64)
+    ],
+    # A production-like blend, including failures and medium payloads
+    "mixed": [
+        stage(
+            "mixed", 32, 1000,
+            (70, {"async_io_ms": 10, "payload_bytes": 2048}),
+            (15, {"cpu_ms": 2, "payload_bytes": 512}),
+            (10, {"blocking_io_ms": 20}),
+            (5, {"async_io_ms": 5, "failure_rate": 1})
+        )
+    ],
+    # The same blocking work off and on the event loop: compare probe latencies
+    "loop_blocking": [
+        stage("threaded", 16, 200, (1, {"blocking_io_ms": 10})),
+        stage("on_loop", 16, 200, (1, {"blocking_io_ms": 10, "block_event_loop": True}))
+    ],
+    # Growing responses: serialization cost and memory per worker
+    "large_payloads": [
+        stage(f"payload@{size // 1024}KiB", 16, 200, (1, {"payload_bytes": size}))
+        for size in (1024, 64 * 1024, 1024 * 1024)
+    ]
+}
+
+def rss_bytes(pid: Optional[int]) -> Optional[int]:
+    """Resident memory of a process, or None where /proc is unavailable"""
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _picker(mix: List[Any], rng: random.Random) -> Callable[[], Dict[str, Any]]:
+    """Draw call arguments from a weighted mix"""
+    weights = [weight for weight, _ in mix]
+    arguments = [args for _, args in mix]
+    return lambda: rng.choices(arguments, weights)[0]
+
+async def run_stage(client: httpx.AsyncClient, spec: Dict[str, Any], pid: Optional[int] = None, seed: int = 0, probe: bool = True) -> Dict[str, Any]:
+    """Run one stage and summarize its latencies, errors, loop stalls (when probed) and memory"""
+    pick = _picker(spec["mix"], random.Random(seed))
+    latencies: List[float] = []
+    probes: List[float] = []
+    errors = 0
+    remaining = spec["requests"]
+    done = asyncio.Event()
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await client.post(WORKLOAD_PATH, json=pick())
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    async def prober_loop():
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get("/health")
+            probes.append(time.perf_counter() - start)
+            try:
+                await asyncio.wait_for(done.wait(), PROBE_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    rss_before = rss_bytes(pid)
+    prober = asyncio.ensure_future(prober_loop()) if probe else None
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(spec["concurrency"])))
+    finally:
+        elapsed = time.perf_counter() - start
+        done.set()
+        if prober is not None:
+            await prober
+    rss_after = rss_bytes(pid)
+
+    latencies.sort()
+    probes.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "probe_p99_ms": percentile(probes, 0.99) * 1000 if probe else None,
+        "probe_max_ms": (probes[-1] if probes else 0.0) * 1000 if probe else None,
+        "rss_mib": None if rss_after is None else rss_after / 2 ** 20,
+        "rss_growth_mib": None if rss_before is None or rss_after is None else (rss_after - rss_before) / 2 ** 20
+    }
+
+async def run_profile(
+    client_factory: Callable[[], httpx.AsyncClient],
+    stages: List[Dict[str, Any]],
+    pid: Optional[int] = None,
+    scale: float = 1.0,
+    seed: int = 0,
+    probe: bool = True
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run the stages of a profile in order
+
+    Args:
+        client_factory: Creates the client the calls are sent with
+        stages: Stage specs, as built by ``stage``
+        pid: Server process whose memory is sampled
+        scale: Factor applied to every stage's request count
+        seed: Seed of the argument draws, for repeatable runs
+        probe: Probe /health for loop stalls; only meaningful when the
+            server runs its own event loop
+
+    Returns:
+        {"<stage name>": stats}
+    """
+    results = {}
+    async with client_factory() as client:
+        for index, spec in enumerate(stages):
+            spec = dict(spec, requests=max(1, int(spec["requests"] * scale)))
+            results[spec["name"]] = await run_stage(client, spec, pid, seed + index, probe)
+    return results
+
+def format_table(results: Dict[str, Dict[str, Any]]) -> str:
+    """Render profile results as a text table"""
+    header = (
+        f"{'stage':<20}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'probe p99':>11}"
+        f"{'probe max':>11}{'RSS MiB':>9}{'growth':>8}{'errors':>8}"
+    )
+    lines = [header, "-" * len(header)]
+    for name, stats in results.items():
+        rss, growth = stats["rss_mib"], stats["rss_growth_mib"]
+        probe_p99, probe_max = stats["probe_p99_ms"], stats["probe_max_ms"]
+        lines.append(
+            f"{name:<20}{stats['rps']:>9.0f}{stats['p50_ms']:>9.2f}{stats['p99_ms']:>9.2f}"
+            f"{'-' if probe_p99 is None else f'{probe_p99:.2f}':>11}{'-' if probe_max is None else f'{probe_max:.2f}':>11}"
+            f"{'-' if rss is None else f'{rss:.1f}':>9}{'-' if growth is None else f'{growth:+.1f}':>8}"
+            f"{stats['errors']:>8}"
+        )
+    return "\n".join(lines)
+
+def load_stages(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Stages of the named profile, or of a JSON file holding a list of stages"""
+    if args.file is None:
+        return PROFILES[args.profile]
+    with open(args.file) as source:
+        return json.load(source)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="mixed")
+    parser.add_argument("--file", help="JSON list of stages to run instead of a built-in profile")
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="uvicorn")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every stage's request count")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the raw results to this JSON file")
+    args = parser.parse_args()
+
+    if args.mode == "inprocess" and args.file is None and args.profile in STALL_PROFILES:
+        parser.error(f"--profile {args.profile} measures event-loop stalls, which --mode inprocess cannot see")
+    stages = load_stages(args)
+    if args.mode == "inprocess":
+        # The client shares the server's event loop and memory: no stall probe
+        results = asyncio.run(run_profile(in_process_client, stages, os.getpid(), args.scale, args.seed, probe=False))
+    else:
+        with UvicornServer() as server:
+            results = asyncio.run(run_profile(server.client, stages, server.pid, args.scale, args.seed))
+
+    print(format_table(results))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
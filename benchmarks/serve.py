@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Start the app under uvicorn with the benchmark-only tools registered
+Usage: python -m benchmarks.serve [--port PORT]
+"""
+
+import argparse
+import uvicorn
+
+from server.config import config
+from server.main import app
+from server.registry import registry
+from benchmarks.load import register_bench_tools
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=config.PORT)
+    args = parser.parse_args()
+    
+    register_bench_tools(registry)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Script to run the load and latency benchmarks for the MCP server
+Usage: python run_benchmarks.py [--mode inprocess|uvicorn|both] [--save-baseline]
+
+Compares every run with the stored baseline (benchmarks/baselines/<mode>.json)
+and exits non-zero when throughput or p99 latency regress by more than
+--max-regression.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+def parse_args():
+    from benchmarks.load import SCENARIOS
+    parser = argparse.ArgumentParser(description="Load and latency benchmarks for the MCP server")
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn", "both"], default="inprocess")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per scenario and concurrency level")
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--no-allocations", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--baseline", help="Baseline file (default: benchmarks/baselines/<mode>.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--max-regression", type=float, default=float(os.getenv("BENCH_MAX_REGRESSION", 0.2)),
+                        help="Allowed fractional drop in req/s or rise in p99 (default 0.2)")
+    parser.add_argument("--output", help="Also write the raw results to this JSON file")
+    return parser.parse_args()
+
+def run_benchmarks():
+    """Run the selected benchmark modes and check them against their baselines"""
+    # Ensure we're in the project root
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, os.getcwd())
+    from benchmarks import load
+    
+    args = parse_args()
+    modes = ["inprocess", "uvicorn"] if args.mode == "both" else [args.mode]
+    all_results = {}
+    failed = False
+    
+    for mode in modes:
+        print(f"Running {mode} benchmarks...")
+        print("=" * 50)
+        
+        suite_args = (args.scenarios, args.concurrency, args.requests, args.warmup)
+        if mode == "inprocess":
+            results = asyncio.run(load.run_suite(load.in_process_client, *suite_args, not args.no_allocations))
+        else:
+            # Allocations happen in the server process and are not visible here
+            with load.UvicornServer() as server:
+                results = asyncio.run(load.run_suite(server.client, *suite_args, False))
+        
+        print(load.format_table(results))
+        all_results[mode] = results
+        
+        path = args.baseline or load.baseline_path(mode)
+        if args.save_baseline:
+            load.save_baseline(path, mode, results)
+            print(f"\nBaseline saved to {path}")
+            continue
+        
+        baseline = load.load_baseline(path)
+        if baseline is None:
+            print(f"\nNo baseline at {path}; run with --save-baseline to record one")
+            continue
+        
+        regressions = load.compare(results, baseline, args.max_regression)
+        if regressions:
+            failed = True
+            print(f"\n❌ Regressions beyond {args.max_regression:.0%}:")
+            for regression in regressions:
+                print(f"  - {regression}")
+        else:
+            print(f"\n✅ Within {args.max_regression:.0%} of baseline")
+        print()
+    
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(all_results, output, indent=2)
+    
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    exit_code = run_benchmarks()
+    sys.exit(exit_code)
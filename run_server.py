@@ -2,10 +2,11 @@
 """
 Simple script to run the MCP test server
 Usage: python run_server.py
+       SERVER_MODE=production WORKERS=8 python run_server.py
+       SERVER_MODE=gateway GATEWAY_BACKENDS=http://127.0.0.1:8001,http://127.0.0.1:8002 python run_server.py
 """
 
 import uvicorn
-from server.main import app
 from server.config import config
 
 if __name__ == "__main__":
@@ -13,9 +14,21 @@ if __name__ == "__main__":
     print(f"API Documentation: http://{config.HOST}:{config.PORT}/docs")
     print(f"Health Check: http://{config.HOST}:{config.PORT}/health")
     
-    uvicorn.run(
-        app,
-        host=config.HOST,
-        port=config.PORT,
-        reload=config.DEBUG
-    )
\ No newline at end of file
+    if config.SERVER_MODE == "production":
+        from server.serving import serve_production
+        serve_production()
+    elif config.SERVER_MODE == "gateway":
+        # Front GATEWAY_BACKENDS: one async process is plenty to relay calls
+        from server.serving import fast_http, fast_loop
+        uvicorn.run(
+            "server.gateway:app", host=config.HOST, port=config.PORT,
+            loop=fast_loop(), http=fast_http(), access_log=config.ACCESS_LOG
+        )
+    else:
+        # The reloader needs an import string to re-import the app
+        uvicorn.run(
+            "server.main:app",
+            host=config.HOST,
+            port=config.PORT,
+            reload=config.DEBUG
+        )
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+Script to serve MCP JSON-RPC 2.0 over stdin/stdout
+Usage: python run_stdio.py
+"""
+
+import asyncio
+from server.registry import registry
+from server.jsonrpc import JsonRpcDispatcher, serve_stdio
+
+if __name__ == "__main__":
+    asyncio.run(serve_stdio(JsonRpcDispatcher(registry)))
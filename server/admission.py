@@ -0,0 +1,178 @@
+# Admission control - concurrency limits with bounded wait queues
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+import asyncio
+import threading
+
+GLOBAL_SCOPE = "__global__"
+
+class Overloaded(Exception):
+    """Raised when a limiter's wait queue is full"""
+
+    def __init__(self, limiter: "ConcurrencyLimiter"):
+        super().__init__(f"'{limiter.name}' is at capacity")
+        self.scope = limiter.name
+        self.max_concurrency = limiter.max_concurrency
+        self.max_queue = limiter.max_queue
+
+class ConcurrencyLimiter:
+    """
+    Caps how many calls run at once and how many may wait for a slot
+
+    Waiting calls are admitted first in, first out. Once ``max_queue`` calls
+    are waiting, ``acquire`` raises Overloaded straight away instead of
+    queuing, so excess load is shed in constant time. A waiter that is
+    cancelled leaves the queue, or passes its slot on if it was just granted.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max(0, max_queue)
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.peak_queued = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def queued(self) -> int:
+        """Calls currently waiting for a slot"""
+        return len(self._waiters)
+
+    async def acquire(self):
+        """Take a slot, waiting in the queue if all slots are busy"""
+        with self._lock:
+            if self.active < self.max_concurrency and not self._waiters:
+                self.active += 1
+                self.admitted += 1
+                return
+            if len(self._waiters) >= self.max_queue:
+                self.rejected += 1
+                raise Overloaded(self)
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.append(future)
+            self.peak_queued = max(self.peak_queued, len(self._waiters))
+
+        try:
+            # release() hands its slot over by resolving the future
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(future)
+                    still_queued = True
+                except ValueError:
+                    still_queued = False
+            if not still_queued and future.done() and not future.cancelled():
+                # Granted a slot just before being cancelled: give it back
+                self.release()
+            raise
+
+    def release(self):
+        """Free a slot, handing it to the longest waiting call if there is one"""
+        with self._lock:
+            while self._waiters:
+                future = self._waiters.popleft()
+                if future.done():
+                    continue
+                try:
+                    # Waiters may belong to another thread's event loop
+                    future.get_loop().call_soon_threadsafe(self._grant, future)
+                except RuntimeError:
+                    # Its loop has been closed; nobody is left to wake
+                    continue
+                self.admitted += 1
+                return
+            self.active -= 1
+
+    def _grant(self, future: asyncio.Future):
+        """Wake a waiter on its own loop, or pass the slot on if it gave up"""
+        if future.done():
+            self.release()
+        else:
+            future.set_result(None)
+
+    def stats(self) -> Dict[str, int]:
+        """Current load and counters"""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected
+        }
+
+class AdmissionController:
+    """
+    Per-tool and global concurrency limits for tool calls
+
+    A call first takes a slot from its tool's limiter, if the tool sets
+    ``max_concurrency``, then one from the global limiter, if
+    ``max_concurrency`` is set for the server. Tools without limits on a
+    server without a global limit are admitted without any bookkeeping.
+    """
+
+    def __init__(self, max_concurrency: int = 0, max_queue: int = 0):
+        self.global_limiter: Optional[ConcurrencyLimiter] = (
+            ConcurrencyLimiter(GLOBAL_SCOPE, max_concurrency, max_queue) if max_concurrency > 0 else None
+        )
+        self._tools: Dict[str, ConcurrencyLimiter] = {}
+
+    def configure_tool(self, tool_name: str, max_concurrency: Optional[int], max_queue: int):
+        """
+        Set or remove (max_concurrency=None) a tool's limit
+
+        An unchanged limit keeps its limiter, so calls holding its slots stay counted.
+        """
+        if max_concurrency:
+            current = self._tools.get(tool_name)
+            if current is not None and (current.max_concurrency, current.max_queue) == (max_concurrency, max(0, max_queue)):
+                return
+            self._tools[tool_name] = ConcurrencyLimiter(tool_name, max_concurrency, max_queue)
+        else:
+            self._tools.pop(tool_name, None)
+
+    async def acquire(self, tool_name: str) -> Tuple[ConcurrencyLimiter, ...]:
+        """
+        Admit a call to a tool
+
+        Returns:
+            Permit to pass to ``release`` when the call finishes
+
+        Raises:
+            Overloaded: A queue the call needs to wait in is full
+        """
+        limiters = tuple(
+            limiter for limiter in (self._tools.get(tool_name), self.global_limiter) if limiter is not None
+        )
+        acquired = []
+        try:
+            for limiter in limiters:
+                await limiter.acquire()
+                acquired.append(limiter)
+        except BaseException:
+            self.release(acquired)
+            raise
+        return limiters
+
+    def release(self, permit):
+        """Give back the slots of a permit"""
+        for limiter in reversed(permit):
+            limiter.release()
+
+    def limiters(self) -> Dict[str, ConcurrencyLimiter]:
+        """Every configured limiter by scope (tool name or GLOBAL_SCOPE)"""
+        limiters = dict(self._tools)
+        if self.global_limiter is not None:
+            limiters[GLOBAL_SCOPE] = self.global_limiter
+        return limiters
+
+    def stats(self) -> Dict[str, Any]:
+        """Load and counters of every configured limiter"""
+        return {scope: limiter.stats() for scope, limiter in self.limiters().items()}
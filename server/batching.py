@@ -0,0 +1,72 @@
+# Micro-batching - coalesces concurrent calls to one tool into batched runs
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+import asyncio
+import contextvars
+
+class MicroBatcher:
+    """
+    Gathers concurrent calls to one tool and runs them as a single batch
+
+    The first call to arrive opens a batch; calls arriving within ``window``
+    seconds join it. The batch is sent when the window closes or as soon as it
+    holds ``max_size`` calls. ``run`` receives the requests of a batch and
+    returns one result per request, in order, and each caller gets its own.
+    A caller that gives up before its batch is sent is left out of it.
+    Create a batcher on the event loop its calls will run on.
+    """
+
+    def __init__(self, tool: Any, run: Callable[[List[Any]], Awaitable[List[Any]]], window: float, max_size: int):
+        self.tool = tool
+        self.loop = asyncio.get_running_loop()
+        self.window = window
+        self.max_size = max(1, max_size)
+        self.batches = 0
+        self.calls = 0
+        self._run = run
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._sending: Set[asyncio.Task] = set()
+
+    async def submit(self, request: Any) -> Any:
+        """Add a call to the open batch and wait for its own result"""
+        future = self.loop.create_future()
+        self._pending.append((request, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = self.loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        """Close the open batch and send it"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = [(request, future) for request, future in self._pending if not future.done()]
+        self._pending = []
+        if not batch:
+            return
+        self.batches += 1
+        self.calls += len(batch)
+        # A fresh context, so the batch is not attributed to whichever caller opened it
+        task = contextvars.Context().run(self.loop.create_task, self._send(batch))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _send(self, batch: List[Tuple[Any, asyncio.Future]]):
+        """Run a batch and hand each caller its result"""
+        try:
+            results = await self._run([request for request, _ in batch])
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            # Never leave callers waiting on a batch that broke
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
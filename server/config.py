@@ -9,7 +9,146 @@ class Config:
     PORT = int(os.getenv("PORT", 8000))
     DEBUG = os.getenv("DEBUG", "true").lower() == "true"
     
+    # Serving mode: "development" runs one process (with the reloader when
+    # DEBUG is on); "production" pre-forks WORKERS processes sharing one socket;
+    # "gateway" fronts the GATEWAY_BACKENDS instances of this server
+    SERVER_MODE = os.getenv("SERVER_MODE", "development").lower()
+    WORKERS = int(os.getenv("WORKERS", os.cpu_count() or 1))
+    BACKLOG = int(os.getenv("BACKLOG", 2048))
+    KEEPALIVE_TIMEOUT = int(os.getenv("KEEPALIVE_TIMEOUT", 5))
+    # Seconds a stopping worker keeps draining open connections
+    GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", 30))
+    LIMIT_CONCURRENCY = int(os.getenv("LIMIT_CONCURRENCY", 0)) or None
+    ACCESS_LOG = os.getenv("ACCESS_LOG", "false").lower() == "true"
+    
     # API settings
     API_PREFIX = "/api/v1"
     
+    # Tool discovery: packages scanned for @tool functions, the entry point group
+    # installed plugins use to add more, and whether to import tool modules in
+    # the background at startup instead of on first call
+    TOOL_PACKAGES = [p.strip() for p in os.getenv("TOOL_PACKAGES", "server.tools").split(",") if p.strip()]
+    TOOL_ENTRY_POINT_GROUP = os.getenv("TOOL_ENTRY_POINT_GROUP", "mcp_server.tools")
+    TOOL_WARMUP = os.getenv("TOOL_WARMUP", "true").lower() == "true"
+    
+    # Execution settings
+    # Size of the shared thread pool synchronous tools run on; tools can ask
+    # for a dedicated pool with "max_workers" in their registry metadata
+    TOOL_THREAD_POOL_SIZE = int(os.getenv("TOOL_THREAD_POOL_SIZE", min(32, (os.cpu_count() or 1) + 4)))
+    
+    # Time limits: seconds a tool call may take unless the tool sets its own
+    # "timeout" (0 = no limit). Clients can shorten the limit of a call by
+    # sending DEADLINE_HEADER with the seconds they are willing to wait.
+    TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", 0))
+    DEADLINE_HEADER = os.getenv("DEADLINE_HEADER", "X-Request-Timeout")
+    # Cancel tool calls whose HTTP client disconnects before the response
+    CANCEL_ON_DISCONNECT = os.getenv("CANCEL_ON_DISCONNECT", "true").lower() == "true"
+    
+    # Process pool for CPU-bound tools registered with "executor": "process":
+    # number of worker processes, how they are started (forkserver where
+    # available), and the size from which bytes arguments and results go
+    # through shared memory. Every production worker has its own pool, so by
+    # default the CPUs are split between the WORKERS pools
+    PROCESS_POOL_SIZE = int(os.getenv(
+        "PROCESS_POOL_SIZE",
+        max(1, (os.cpu_count() or 1) // WORKERS) if SERVER_MODE == "production" else os.cpu_count() or 1
+    ))
+    PROCESS_POOL_START_METHOD = os.getenv("PROCESS_POOL_START_METHOD") or None
+    SHARED_MEMORY_THRESHOLD = int(os.getenv("SHARED_MEMORY_THRESHOLD", 64 * 1024))
+    
+    # Admission control: at most MAX_CONCURRENT_CALLS tool calls run at once
+    # (0 = no global limit) with up to MAX_QUEUED_CALLS more waiting. Tools can
+    # set their own "max_concurrency" and "max_queue" (default TOOL_MAX_QUEUE)
+    # in registry metadata. Calls beyond a full queue get 503 with Retry-After.
+    MAX_CONCURRENT_CALLS = int(os.getenv("MAX_CONCURRENT_CALLS", 0))
+    MAX_QUEUED_CALLS = int(os.getenv("MAX_QUEUED_CALLS", 256))
+    TOOL_MAX_QUEUE = int(os.getenv("TOOL_MAX_QUEUE", 64))
+    OVERLOAD_RETRY_AFTER = int(os.getenv("OVERLOAD_RETRY_AFTER", 1))
+    
+    # Result cache for tools registered as deterministic (0 entries disables it)
+    RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", 1024))
+    RESULT_CACHE_TTL_SECONDS = float(os.getenv("RESULT_CACHE_TTL_SECONDS", 60))
+    
+    # JSON-RPC transport (WebSocket and stdio)
+    JSONRPC_MAX_IN_FLIGHT = int(os.getenv("JSONRPC_MAX_IN_FLIGHT", 64))
+    JSONRPC_MAX_MESSAGE_BYTES = int(os.getenv("JSONRPC_MAX_MESSAGE_BYTES", 16 * 1024 * 1024))
+    
+    # Metrics: with METRICS_DIR set, each worker writes its totals there every
+    # METRICS_FLUSH_INTERVAL seconds and /metrics sums the files of running workers
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_DIR = os.getenv("METRICS_DIR", os.getenv("PROMETHEUS_MULTIPROC_DIR")) or None
+    METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 5))
+    
+    # Tracing: time the phases of each tool call (body parse, validation,
+    # queue, execution, serialization) and report them in a Server-Timing
+    # header. A TRACE_SAMPLE_RATE fraction of calls, plus calls whose W3C
+    # traceparent is sampled, are also written to TRACE_FILE as OTLP JSON
+    # lines, rotated at TRACE_FILE_MAX_BYTES keeping TRACE_FILE_BACKUPS files
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+    TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", 0.01))
+    TRACE_FILE = os.getenv("TRACE_FILE") or None
+    TRACE_FILE_MAX_BYTES = int(os.getenv("TRACE_FILE_MAX_BYTES", 10 * 1024 * 1024))
+    TRACE_FILE_BACKUPS = int(os.getenv("TRACE_FILE_BACKUPS", 5))
+    
+    # Hot reload: POST /admin/reload, SIGHUP (when RELOAD_ON_SIGHUP) or, with
+    # RELOAD_WATCH on, a change to a tool source file (checked every
+    # RELOAD_WATCH_INTERVAL seconds) rediscovers the tools and swaps them in
+    RELOAD_ON_SIGHUP = os.getenv("RELOAD_ON_SIGHUP", "true").lower() == "true"
+    RELOAD_WATCH = os.getenv("RELOAD_WATCH", "false").lower() == "true"
+    RELOAD_WATCH_INTERVAL = float(os.getenv("RELOAD_WATCH_INTERVAL", 1))
+    
+    # Admin endpoints need "Authorization: Bearer <ADMIN_TOKEN>"; with no
+    # token configured they refuse every request
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN") or None
+    
+    # On-demand profiling at /debug/profile (admin only, off by default):
+    # samples stacks every PROFILE_INTERVAL_MS for at most PROFILE_MAX_SECONDS
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", 60))
+    PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", 5))
+    
+    # Async jobs (POST /api/v1/jobs/{tool_name}): at most JOB_MAX_PENDING
+    # unfinished jobs; results are kept JOB_RESULT_TTL seconds, with up to
+    # JOB_STORE_MAX_ENTRIES results and JOB_STORE_MAX_BYTES of them in memory.
+    # With JOB_SPILL_DIR set, results pushed out of memory go there (up to
+    # JOB_SPILL_MAX_BYTES) instead of being dropped. Polls may wait for a
+    # result for at most JOB_MAX_WAIT seconds. Jobs live in the memory of the
+    # worker that accepted them, so a poll must reach the same process: with
+    # several production workers they are off (submissions get 501) unless
+    # JOBS_ENABLED is set, e.g. behind a load balancer with sticky sessions.
+    JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", 1024))
+    JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", 300))
+    JOB_STORE_MAX_ENTRIES = int(os.getenv("JOB_STORE_MAX_ENTRIES", 10000))
+    JOB_STORE_MAX_BYTES = int(os.getenv("JOB_STORE_MAX_BYTES", 64 * 1024 * 1024))
+    JOB_SPILL_DIR = os.getenv("JOB_SPILL_DIR") or None
+    JOB_SPILL_MAX_BYTES = int(os.getenv("JOB_SPILL_MAX_BYTES", 1024 * 1024 * 1024))
+    JOB_MAX_WAIT = float(os.getenv("JOB_MAX_WAIT", 30))
+    JOBS_ENABLED = os.getenv("JOBS_ENABLED", str(SERVER_MODE != "production" or WORKERS <= 1)).lower() == "true"
+    
+    # Gateway mode: comma-separated base URLs of the backend instances, how
+    # often and how patiently their /health is checked, the timeout of
+    # forwarded calls, keep-alive connection pool sizes per backend and the
+    # virtual nodes each backend gets on the consistent-hash ring
+    GATEWAY_BACKENDS = [u.strip().rstrip("/") for u in os.getenv("GATEWAY_BACKENDS", "").split(",") if u.strip()]
+    GATEWAY_HEALTH_INTERVAL = float(os.getenv("GATEWAY_HEALTH_INTERVAL", 2))
+    GATEWAY_HEALTH_TIMEOUT = float(os.getenv("GATEWAY_HEALTH_TIMEOUT", 1))
+    GATEWAY_TIMEOUT = float(os.getenv("GATEWAY_TIMEOUT", 60))
+    GATEWAY_MAX_CONNECTIONS = int(os.getenv("GATEWAY_MAX_CONNECTIONS", 256))
+    GATEWAY_MAX_KEEPALIVE = int(os.getenv("GATEWAY_MAX_KEEPALIVE", 64))
+    GATEWAY_VIRTUAL_NODES = int(os.getenv("GATEWAY_VIRTUAL_NODES", 64))
+    
+    # Directory the OpenAPI document is cached in, keyed by a fingerprint of
+    # the server code and tools, so workers and restarts load it instead of
+    # building it (prebuild with python -m server.openapi). Unset: memory only
+    OPENAPI_CACHE_DIR = os.getenv("OPENAPI_CACHE_DIR") or None
+
+    # Micro-batching of tools registered with "micro_batch": True: concurrent
+    # calls are gathered for up to MICRO_BATCH_WINDOW_MS milliseconds, or
+    # until MICRO_BATCH_MAX_SIZE calls, then run as one batch_function call
+    MICRO_BATCH_WINDOW_MS = float(os.getenv("MICRO_BATCH_WINDOW_MS", 2))
+    MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", 64))
+
+    # Batch settings
+    MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", 1000))
+    
 config = Config()
\ No newline at end of file
@@ -0,0 +1,267 @@
+# Tool discovery - @tool decorator, package scanning and lazy imports
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import ast
+import importlib
+import importlib.util
+import os
+import threading
+
+TOOL_METADATA_ATTR = "__tool_metadata__"
+
+def tool(
+    name: Optional[str] = None,
+    description: Optional[str] = None,
+    request_model: Any = None,
+    parameters: Optional[Dict[str, Any]] = None,
+    batch: Optional[str] = None,
+    **options: Any
+) -> Callable[[Callable], Callable]:
+    """
+    Mark a function as an MCP tool
+
+    The decorator only records metadata on the function. Discovery reads the
+    same arguments straight from the module source, so a tool's module is not
+    imported until the tool is first called. Keep the arguments literal
+    (strings, numbers, dicts, ...) and give ``request_model`` as a name
+    imported from a schemas module; anything else makes discovery fall back
+    to importing the module.
+
+    Args:
+        name: Tool name, defaults to the function name
+        description: Tool description, defaults to the docstring's first line
+        request_model: Pydantic model used to validate the tool's input
+        parameters: Parameter descriptions, defaults to the model's JSON Schema properties
+        batch: Name of a vectorized implementation in the same module
+        **options: Extra registry metadata such as ``deterministic`` or ``max_workers``
+    """
+    def decorator(function: Callable) -> Callable:
+        setattr(function, TOOL_METADATA_ATTR, {
+            "name": name or function.__name__,
+            "description": description,
+            "request_model": request_model,
+            "parameters": parameters,
+            "batch": batch,
+            "options": options
+        })
+        return function
+    return decorator
+
+class LazyCallable:
+    """
+    Stand-in for a function that imports its module on first call
+
+    Picklable by reference, so it can also be handed to worker processes.
+    """
+
+    def __init__(self, module: str, attr: str):
+        self.module = module
+        self.attr = attr
+        self._target: Optional[Callable] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the implementation module has been imported"""
+        return self._target is not None
+
+    def resolve(self) -> Callable:
+        """Import the module if needed and return the real function"""
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    self._target = getattr(importlib.import_module(self.module), self.attr)
+        return self._target
+
+    def __call__(self, *args, **kwargs):
+        target = self._target
+        if target is None:
+            target = self.resolve()
+        return target(*args, **kwargs)
+
+    def __reduce__(self):
+        return LazyCallable, (self.module, self.attr)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyCallable {self.module}:{self.attr} ({state})>"
+
+def _is_tool_decorator(node: ast.expr) -> bool:
+    """Check if a decorator expression is a call to ``tool(...)``"""
+    if not isinstance(node, ast.Call):
+        return False
+    func = node.func
+    return (isinstance(func, ast.Name) and func.id == "tool") or \
+        (isinstance(func, ast.Attribute) and func.attr == "tool")
+
+def _contains_yield(function: ast.AST) -> bool:
+    """Check if a function body yields, ignoring nested functions"""
+    stack = list(ast.iter_child_nodes(function))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.Yield, ast.YieldFrom)):
+            return True
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)):
+            stack.extend(ast.iter_child_nodes(node))
+    return False
+
+def _imported_names(tree: ast.Module, module: str) -> Dict[str, str]:
+    """Map names bound by ``from x import y`` statements to ``module:attr`` references"""
+    package = module.rpartition(".")[0]
+    names = {}
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom):
+            source = importlib.util.resolve_name("." * node.level + (node.module or ""), package)
+            for alias in node.names:
+                names[alias.asname or alias.name] = f"{source}:{alias.name}"
+    return names
+
+def _load_reference(reference: str) -> Any:
+    """Import ``module:attr``"""
+    module, _, attr = reference.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+class _NeedsImport(Exception):
+    """Raised when tool metadata cannot be read without importing the module"""
+
+def _spec_from_source(module: str, function: ast.AST, decorator: ast.Call, imports: Dict[str, str]) -> Dict[str, Any]:
+    """Build a tool spec from a decorated function's source"""
+    if decorator.args:
+        raise _NeedsImport()
+
+    arguments = {}
+    for keyword in decorator.keywords:
+        if keyword.arg is None:
+            raise _NeedsImport()
+        if keyword.arg == "request_model":
+            if not isinstance(keyword.value, ast.Name) or keyword.value.id not in imports:
+                raise _NeedsImport()
+            arguments["request_model"] = _load_reference(imports[keyword.value.id])
+            continue
+        try:
+            arguments[keyword.arg] = ast.literal_eval(keyword.value)
+        except ValueError:
+            raise _NeedsImport()
+
+    docstring = ast.get_docstring(function) or ""
+    is_async_def = isinstance(function, ast.AsyncFunctionDef)
+    streaming = _contains_yield(function)
+    batch = arguments.pop("batch", None)
+
+    return {
+        "name": arguments.pop("name", None) or function.name,
+        "module": module,
+        "function": LazyCallable(module, function.name),
+        "batch_function": LazyCallable(module, batch) if batch else None,
+        "request_model": arguments.pop("request_model", None),
+        "description": arguments.pop("description", None) or docstring.strip().split("\n")[0],
+        "parameters": arguments.pop("parameters", None),
+        "is_async": is_async_def,
+        "streaming": streaming,
+        "options": arguments
+    }
+
+def _specs_from_import(module: str) -> List[Dict[str, Any]]:
+    """Build tool specs by importing a module and reading decorator metadata"""
+    imported = importlib.import_module(module)
+    specs = []
+    for function in vars(imported).values():
+        metadata = getattr(function, TOOL_METADATA_ATTR, None)
+        if metadata is None or getattr(function, "__module__", None) != module:
+            continue
+        batch = metadata["batch"]
+        specs.append({
+            "name": metadata["name"],
+            "module": module,
+            "function": function,
+            "batch_function": getattr(imported, batch) if batch else None,
+            "request_model": metadata["request_model"],
+            "description": metadata["description"] or (function.__doc__ or "").strip().split("\n")[0],
+            "parameters": metadata["parameters"],
+            "is_async": None,
+            "streaming": None,
+            "options": dict(metadata["options"])
+        })
+    return specs
+
+def scan_module(module: str, path: str) -> List[Dict[str, Any]]:
+    """
+    Find the ``@tool`` functions in a module without importing it
+
+    Falls back to importing the module when a decorator uses arguments
+    that cannot be read from the source.
+
+    Returns:
+        Tool specs with ``name``, ``function``, ``request_model`` and the rest
+        of the metadata the registry needs
+    """
+    with open(path, "rb") as source:
+        tree = ast.parse(source.read(), filename=path)
+
+    imports = None
+    specs = []
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for decorator in node.decorator_list:
+            if not _is_tool_decorator(decorator):
+                continue
+            if imports is None:
+                imports = _imported_names(tree, module)
+            try:
+                specs.append(_spec_from_source(module, node, decorator, imports))
+            except _NeedsImport:
+                return _specs_from_import(module)
+    return specs
+
+def _package_modules(package: str) -> Iterable[tuple]:
+    """Yield (module name, source path) for a module or every module in a package"""
+    spec = importlib.util.find_spec(package)
+    if spec is None:
+        raise ImportError(f"Tool package '{package}' not found")
+
+    if spec.submodule_search_locations is None:
+        yield package, spec.origin
+        return
+
+    for location in spec.submodule_search_locations:
+        for filename in sorted(os.listdir(location)):
+            if filename.endswith(".py") and filename != "__init__.py":
+                yield f"{package}.{filename[:-3]}", os.path.join(location, filename)
+
+def _entry_point_packages(group: str) -> List[str]:
+    """Module names advertised by installed distributions under an entry point group"""
+    from importlib.metadata import entry_points
+    try:
+        selected = entry_points(group=group)
+    except TypeError:
+        # Python 3.9: no selection, all groups come back as a dict
+        selected = entry_points().get(group, ())
+    return [entry_point.value.partition(":")[0] for entry_point in selected]
+
+def tool_sources(packages: Iterable[str], entry_point_group: Optional[str] = None) -> List[str]:
+    """Source files discovery scans, for watching them for changes"""
+    packages = list(packages)
+    if entry_point_group:
+        packages.extend(_entry_point_packages(entry_point_group))
+    return [path for package in packages for _, path in _package_modules(package)]
+
+def discover_tools(packages: Iterable[str], entry_point_group: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Discover tools in packages and, optionally, in installed plugins
+
+    Args:
+        packages: Module or package names to scan for ``@tool`` functions
+        entry_point_group: Entry point group whose values name more modules to scan
+
+    Returns:
+        Tool specs in discovery order
+    """
+    packages = list(packages)
+    if entry_point_group:
+        packages.extend(_entry_point_packages(entry_point_group))
+
+    specs = []
+    for package in packages:
+        for module, path in _package_modules(package):
+            specs.extend(scan_module(module, path))
+    return specs
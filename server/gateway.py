@@ -0,0 +1,401 @@
+# Gateway - one front server routing tool calls across backend instances
+from bisect import bisect
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Tuple, Union
+import asyncio
+import hashlib
+import json
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import Response, StreamingResponse
+
+from .config import config
+from .schemas.tool_schema import ErrorResponse, HealthResponse
+from .serialization import encode_json, decode_body, etag_matches, negotiate_response_type, render
+from .streaming import NDJSON_MEDIA_TYPE, SSE_MEDIA_TYPE
+
+# Request headers passed on to backends, and response headers passed back
+FORWARDED_REQUEST_HEADERS = ("content-type", "accept", "traceparent", config.DEADLINE_HEADER.lower())
+FORWARDED_RESPONSE_HEADERS = ("retry-after", "server-timing", "cache-control", "vary", "location")
+
+# Failures before the request left the gateway: safe to send it to another backend
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+def _hash(value: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "big")
+
+class Backend:
+    """One backend instance: its connection pool, health and tool catalog"""
+
+    def __init__(self, url: str, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.url = url
+        self._transport = transport
+        self.client: Optional[httpx.AsyncClient] = None
+        self.healthy = False
+        self.in_flight = 0
+        self.failures = 0
+        self.requests = 0
+        # Tools of the last catalog fetched, and its ETag for conditional refreshes
+        self.tools: Dict[str, Dict[str, Any]] = {}
+        self.etag: Optional[str] = None
+
+    def open(self):
+        """Create the keep-alive connection pool"""
+        self.client = httpx.AsyncClient(
+            base_url=self.url,
+            transport=self._transport,
+            limits=httpx.Limits(
+                max_connections=config.GATEWAY_MAX_CONNECTIONS,
+                max_keepalive_connections=config.GATEWAY_MAX_KEEPALIVE
+            ),
+            timeout=config.GATEWAY_TIMEOUT
+        )
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "tools": sorted(self.tools)
+        }
+
+class HashRing:
+    """
+    Consistent-hash ring over backends
+
+    Each backend owns ``virtual_nodes`` points, so removing one only moves
+    the keys it owned and spreads them over all the others.
+    """
+
+    def __init__(self, backends: List[Backend], virtual_nodes: int):
+        points = sorted((
+            (_hash(f"{backend.url}#{index}".encode()), backend)
+            for backend in backends for index in range(virtual_nodes)
+        ), key=lambda point: point[0])
+        self._hashes = [point for point, _ in points]
+        self._backends = [backend for _, backend in points]
+        self._count = len(backends)
+
+    def preference(self, key: bytes) -> List[Backend]:
+        """Distinct backends in ring order starting from the key's position"""
+        if not self._hashes:
+            return []
+        start = bisect(self._hashes, _hash(key))
+        order: List[Backend] = []
+        for offset in range(len(self._hashes)):
+            backend = self._backends[(start + offset) % len(self._hashes)]
+            if backend not in order:
+                order.append(backend)
+                if len(order) == self._count:
+                    break
+        return order
+
+class Gateway:
+    """
+    Routes tool calls to backend instances of this server
+
+    The catalog is the union of the healthy backends' catalogs (the first
+    backend listing a tool describes it). Calls to a tool go to a healthy
+    backend that has it: tools whose catalog entry is ``deterministic`` are
+    sharded by consistent hashing over their arguments, so repeated calls
+    hit the same backend's result cache; others go to the backend with the
+    fewest calls in flight. A backend that cannot be reached is marked down
+    and the call moves on to the next candidate; a backend shedding load
+    (503) is skipped the same way. A call that may already have reached a
+    backend (it timed out or the connection broke mid-response) is never
+    sent again, since the tool may have run. Backends are brought back by
+    the periodic ``/health`` checks, which also refresh their catalogs.
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        transports: Optional[Dict[str, httpx.AsyncBaseTransport]] = None,
+        health_interval: Optional[float] = None
+    ):
+        transports = transports or {}
+        self.backends = [Backend(url, transports.get(url)) for url in urls]
+        self.ring = HashRing(self.backends, config.GATEWAY_VIRTUAL_NODES)
+        self.health_interval = config.GATEWAY_HEALTH_INTERVAL if health_interval is None else health_interval
+        self._health_task: Optional[asyncio.Task] = None
+        self._catalog: Optional[Tuple[tuple, bytes, str]] = None
+        self._next = 0
+
+    async def start(self):
+        """Open the connection pools, check every backend and start the periodic checks"""
+        for backend in self.backends:
+            backend.open()
+        await self.check_health()
+        if self.health_interval > 0:
+            self._health_task = asyncio.ensure_future(self._health_loop())
+
+    async def stop(self):
+        """Stop the health checks and close the connection pools"""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        for backend in self.backends:
+            await backend.close()
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await self.check_health()
+
+    async def check_health(self):
+        """Probe every backend's /health, refreshing the catalogs of the healthy ones"""
+        # One backend failing in an unexpected way must not stop the checks of the others
+        results = await asyncio.gather(*(self._check(backend) for backend in self.backends), return_exceptions=True)
+        for backend, result in zip(self.backends, results):
+            if isinstance(result, Exception):
+                backend.healthy = False
+                print(f"Health check of {backend.url} failed: {result!r}")
+
+    async def _check(self, backend: Backend):
+        try:
+            response = await backend.client.get("/health", timeout=config.GATEWAY_HEALTH_TIMEOUT)
+            healthy = response.status_code == 200
+            if healthy:
+                await self._refresh_catalog(backend)
+        except (httpx.HTTPError, ValueError, KeyError, TypeError):
+            # Unreachable, or not answering with a catalog
+            healthy = False
+        backend.healthy = healthy
+
+    async def _refresh_catalog(self, backend: Backend):
+        """Fetch a backend's catalog unless its ETag is unchanged"""
+        headers = {"if-none-match": backend.etag} if backend.etag else {}
+        response = await backend.client.get(f"{config.API_PREFIX}/tools", headers=headers)
+        if response.status_code == 304:
+            return
+        response.raise_for_status()
+        tools = response.json()["tools"]
+        if not isinstance(tools, dict):
+            raise TypeError("catalog 'tools' is not an object")
+        backend.tools = tools
+        backend.etag = response.headers.get("etag")
+
+    def catalog(self) -> Tuple[bytes, str]:
+        """Merged catalog of the healthy backends and its ETag, rebuilt only when they change"""
+        key = tuple((backend.url, backend.etag) for backend in self.backends if backend.healthy)
+        if self._catalog is None or self._catalog[0] != key:
+            tools: Dict[str, Dict[str, Any]] = {}
+            for backend in self.backends:
+                if backend.healthy:
+                    for name, tool in backend.tools.items():
+                        tools.setdefault(name, tool)
+            body = encode_json({"success": True, "tools": tools, "count": len(tools)})
+            self._catalog = (key, body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        return self._catalog[1], self._catalog[2]
+
+    def known_tool(self, tool_name: str) -> bool:
+        """Whether any backend (healthy or not) has listed the tool"""
+        return any(tool_name in backend.tools for backend in self.backends)
+
+    def candidates(self, tool_name: str, raw_body: bytes, content_type: Optional[str]) -> List[Backend]:
+        """Healthy backends serving a tool, in the order they should be tried"""
+        serving = [backend for backend in self.backends if backend.healthy and tool_name in backend.tools]
+        if not serving:
+            return []
+        if any(backend.tools[tool_name].get("deterministic") for backend in serving):
+            order = self.ring.preference(tool_name.encode() + b"\0" + self._arguments_key(raw_body, content_type))
+            return [backend for backend in order if backend in serving]
+
+        # Fewest calls in flight first; rotate the starting point to break ties
+        self._next = (self._next + 1) % len(serving)
+        rotated = serving[self._next:] + serving[:self._next]
+        return sorted(rotated, key=lambda backend: backend.in_flight)
+
+    @staticmethod
+    def _arguments_key(raw_body: bytes, content_type: Optional[str]) -> bytes:
+        """Canonical form of the arguments, so equal calls hash alike whatever their key order"""
+        try:
+            arguments = decode_body(raw_body, content_type)
+        except Exception:
+            return raw_body
+        return json.dumps(arguments, sort_keys=True, separators=(",", ":"), default=str).encode()
+
+    async def forward(self, tool_name: str, request: Request) -> Union[Response, ErrorResponse, None]:
+        """
+        Send a tool call to the first candidate backend that takes it
+
+        Only calls that never reached a backend (connection refused or timed
+        out, or no free connection in the pool) are tried on the next one.
+
+        Returns:
+            The backend's response; a TIMEOUT or BACKEND_ERROR ErrorResponse
+            if the backend taking the call did not answer; or None if no
+            backend could take the call
+        """
+        raw_body = await request.body()
+        headers = {name: request.headers[name] for name in FORWARDED_REQUEST_HEADERS if name in request.headers}
+        candidates = self.candidates(tool_name, raw_body, request.headers.get("content-type"))
+        path = f"{config.API_PREFIX}/tools/{tool_name}"
+
+        for index, backend in enumerate(candidates):
+            backend.in_flight += 1
+            backend.requests += 1
+            try:
+                upstream = await backend.client.send(
+                    backend.client.build_request("POST", path, content=raw_body, headers=headers),
+                    stream=True
+                )
+            except RETRYABLE_ERRORS as e:
+                backend.in_flight -= 1
+                if not isinstance(e, httpx.PoolTimeout):
+                    # Unreachable: stop routing to it until a health check succeeds
+                    backend.healthy = False
+                    backend.failures += 1
+                continue
+            except httpx.TransportError as e:
+                backend.in_flight -= 1
+                return self._unanswered(tool_name, backend, e)
+            except BaseException:
+                backend.in_flight -= 1
+                raise
+
+            if upstream.status_code == 503 and index < len(candidates) - 1:
+                # Shedding load; the call never ran there, so another backend may take it
+                await upstream.aclose()
+                backend.in_flight -= 1
+                continue
+            try:
+                return await self._relay(backend, upstream)
+            except httpx.TransportError as e:
+                return self._unanswered(tool_name, backend, e)
+        return None
+
+    @staticmethod
+    def _unanswered(tool_name: str, backend: Backend, error: httpx.TransportError) -> ErrorResponse:
+        """
+        Error for a call that reached a backend but got no complete answer
+
+        The tool may have run, so the call is not resent. A timeout means the
+        backend is slow rather than down, so it stays in rotation.
+        """
+        if isinstance(error, httpx.TimeoutException):
+            return ErrorResponse(
+                error="Backend did not answer in time",
+                error_type="TIMEOUT",
+                details={"tool_name": tool_name, "backend": backend.url}
+            )
+        backend.failures += 1
+        return ErrorResponse(
+            error="Backend connection failed",
+            error_type="BACKEND_ERROR",
+            details={"tool_name": tool_name, "backend": backend.url, "message": str(error)}
+        )
+
+    async def _relay(self, backend: Backend, upstream: httpx.Response) -> Response:
+        """Turn a backend response into ours, streaming NDJSON/SSE bodies through"""
+        headers = {name: upstream.headers[name] for name in FORWARDED_RESPONSE_HEADERS if name in upstream.headers}
+        media_type = upstream.headers.get("content-type")
+        if media_type and media_type.split(";")[0] in (NDJSON_MEDIA_TYPE, SSE_MEDIA_TYPE):
+            async def chunks():
+                try:
+                    async for chunk in upstream.aiter_raw():
+                        yield chunk
+                finally:
+                    await upstream.aclose()
+                    backend.in_flight -= 1
+            return StreamingResponse(chunks(), status_code=upstream.status_code, media_type=media_type, headers=headers)
+
+        try:
+            content = await upstream.aread()
+        finally:
+            await upstream.aclose()
+            backend.in_flight -= 1
+        return Response(content=content, status_code=upstream.status_code, media_type=media_type, headers=headers)
+
+    def stats(self) -> Dict[str, Any]:
+        """Health, load and tools of every backend"""
+        return {"backends": [backend.stats() for backend in self.backends]}
+
+def create_app(gateway: Gateway) -> FastAPI:
+    """The gateway's HTTP API: the backends' tool routes, catalog and health behind one address"""
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await gateway.start()
+        yield
+        await gateway.stop()
+
+    app = FastAPI(
+        title="MCP Test Server Gateway",
+        description="Routes tool calls across MCP test server instances",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+    app.state.gateway = gateway
+
+    def response_type(request: Request) -> str:
+        return negotiate_response_type(request.headers.get("accept"))
+
+    @app.get("/health", response_model=HealthResponse)
+    async def health_check(request: Request):
+        """Healthy while at least one backend is"""
+        healthy = sum(backend.healthy for backend in gateway.backends)
+        if not healthy:
+            return render(
+                HealthResponse(status="unhealthy", message="No healthy backends"),
+                response_type(request),
+                status_code=503
+            )
+        return render(
+            HealthResponse(status="healthy", message=f"{healthy}/{len(gateway.backends)} backends healthy"),
+            response_type(request)
+        )
+
+    @app.get(f"{config.API_PREFIX}/gateway")
+    async def gateway_stats(request: Request):
+        """Health, load and tools of every backend"""
+        return render({"success": True, **gateway.stats()}, response_type(request))
+
+    @app.get(f"{config.API_PREFIX}/tools")
+    async def list_tools(request: Request):
+        """Merged tool catalog of the healthy backends"""
+        body, etag = gateway.catalog()
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    @app.post(f"{config.API_PREFIX}/tools/{{tool_name}}")
+    async def call_tool(tool_name: str, request: Request):
+        """Forward a tool call to a backend serving the tool"""
+        response = await gateway.forward(tool_name, request)
+        if isinstance(response, ErrorResponse):
+            status_code = 504 if response.error_type == "TIMEOUT" else 502
+            return render(response, response_type(request), status_code=status_code)
+        if response is not None:
+            return response
+        if not gateway.known_tool(tool_name):
+            error = ErrorResponse(
+                error=f"Tool '{tool_name}' not found",
+                error_type="TOOL_NOT_FOUND",
+                details={"available_tools": sorted({name for b in gateway.backends for name in b.tools})}
+            )
+            return render(error, response_type(request), status_code=404)
+        error = ErrorResponse(
+            error="No backend available for this tool",
+            error_type="BACKEND_UNAVAILABLE",
+            details={"tool_name": tool_name, "retry_after": config.OVERLOAD_RETRY_AFTER}
+        )
+        return render(
+            error, response_type(request), status_code=503,
+            headers={"Retry-After": str(config.OVERLOAD_RETRY_AFTER)}
+        )
+
+    return app
+
+# Gateway over the configured backends (SERVER_MODE=gateway)
+app = create_app(Gateway(config.GATEWAY_BACKENDS))
@@ -0,0 +1,305 @@
+# Async jobs - background tool calls with a bounded, expiring result store
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import os
+import secrets
+import threading
+import time
+
+from .schemas.tool_schema import ErrorResponse, ToolResponse
+from .serialization import decode_json, encode_json
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+class TooManyJobs(Exception):
+    """Raised when the number of unfinished jobs is at its limit"""
+
+class Job:
+    """A background tool call and, once finished, its encoded result"""
+
+    __slots__ = (
+        "id", "tool_name", "status", "created_at", "started_at", "finished_at",
+        "expires_at", "result", "size", "spilled", "task", "done"
+    )
+
+    def __init__(self, tool_name: str):
+        self.id = secrets.token_urlsafe(16)
+        self.tool_name = tool_name
+        self.status = PENDING
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.expires_at: Optional[float] = None
+        # JSON bytes of the ToolResponse/ErrorResponse; None while unfinished or spilled
+        self.result: Optional[bytes] = None
+        self.size = 0
+        self.spilled = False
+        self.task: Optional[asyncio.Task] = None
+        self.done = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED, CANCELLED)
+
+class JobStore:
+    """
+    Jobs by id, with finished results bounded in memory
+
+    Finished results expire ``ttl_seconds`` after the job ends. At most
+    ``max_entries`` finished jobs and ``max_bytes`` of results are kept in
+    memory; past either limit the least recently used results are dropped,
+    or, with a ``spill_dir``, written there until the directory holds
+    ``spill_max_bytes``. Unfinished jobs are never evicted.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl_seconds: float,
+        max_entries: int = 10000,
+        spill_dir: Optional[str] = None,
+        spill_max_bytes: int = 0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.spill_dir = spill_dir
+        self.spill_max_bytes = spill_max_bytes
+        self._clock = clock
+        # Unfinished jobs, then finished ones from least to most recently used
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._finished = 0
+        self._memory_bytes = 0
+        self._spilled_bytes = 0
+        self._next_sweep = 0.0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.spills = 0
+        self.expirations = 0
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def add(self, job: Job):
+        """Track a new job"""
+        with self._lock:
+            self._jobs[job.id] = job
+            # Keep unfinished jobs ahead of the LRU order of finished ones
+            self._jobs.move_to_end(job.id, last=False)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """A job by id, or None if unknown or expired"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not job.finished:
+                return job
+            if job.expires_at <= self._clock():
+                self._remove(job)
+                self.expirations += 1
+                return None
+            self._jobs.move_to_end(job_id)
+            return job
+
+    def result(self, job: Job) -> Optional[Any]:
+        """Decoded result of a finished job (read back from disk if spilled)"""
+        raw = job.result
+        if raw is None and job.spilled:
+            try:
+                with open(self._spill_path(job), "rb") as spilled:
+                    raw = spilled.read()
+            except OSError:
+                return None
+        return None if raw is None else decode_json(raw)
+
+    def finish(self, job: Job, status: str, result: bytes):
+        """Store a job's result and enforce the limits"""
+        with self._lock:
+            job.status = status
+            job.finished_at = time.time()
+            job.expires_at = self._clock() + self.ttl_seconds
+            if job.id not in self._jobs:
+                # Deleted while running: nobody can fetch the result
+                return
+            job.result = result
+            job.size = len(result)
+            self._memory_bytes += job.size
+            self._finished += 1
+            self._jobs.move_to_end(job.id)
+            self._sweep()
+            self._evict()
+
+    def remove(self, job_id: str) -> Optional[Job]:
+        """Forget a job; returns it if it was known"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._remove(job)
+            return job
+
+    def _remove(self, job: Job):
+        del self._jobs[job.id]
+        if not job.finished:
+            return
+        self._finished -= 1
+        if job.result is not None:
+            self._memory_bytes -= job.size
+            job.result = None
+        if job.spilled:
+            self._spilled_bytes -= job.size
+            job.spilled = False
+            try:
+                os.remove(self._spill_path(job))
+            except OSError:
+                pass
+
+    def _sweep(self):
+        """Drop expired results, at most every tenth of the TTL"""
+        now = self._clock()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.ttl_seconds / 10
+        for job in [job for job in self._jobs.values() if job.finished and job.expires_at <= now]:
+            self._remove(job)
+            self.expirations += 1
+
+    def _evict(self):
+        """Spill or drop least recently used results until within the limits"""
+        for job in list(self._jobs.values()):
+            if self._finished <= self.max_entries and self._memory_bytes <= self.max_bytes:
+                return
+            if not job.finished:
+                continue
+            if self._finished <= self.max_entries and job.result is not None and self._spill(job):
+                continue
+            if self._finished > self.max_entries or job.result is not None:
+                self._remove(job)
+                self.evictions += 1
+
+    def _spill(self, job: Job) -> bool:
+        """Move a result from memory to the spill directory if there is room"""
+        if not self.spill_dir or self._spilled_bytes + job.size > self.spill_max_bytes:
+            return False
+        try:
+            with open(self._spill_path(job), "wb") as spilled:
+                spilled.write(job.result)
+        except OSError:
+            return False
+        self._memory_bytes -= job.size
+        self._spilled_bytes += job.size
+        job.result = None
+        job.spilled = True
+        self.spills += 1
+        return True
+
+    def _spill_path(self, job: Job) -> str:
+        return os.path.join(self.spill_dir, f"{job.id}.json")
+
+    def stats(self) -> Dict[str, Any]:
+        """Sizes, limits and counters of the store"""
+        with self._lock:
+            return {
+                "jobs": len(self._jobs),
+                "unfinished": len(self._jobs) - self._finished,
+                "finished": self._finished,
+                "memory_bytes": self._memory_bytes,
+                "max_bytes": self.max_bytes,
+                "spilled_bytes": self._spilled_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "evictions": self.evictions,
+                "spills": self.spills,
+                "expirations": self.expirations
+            }
+
+class JobManager:
+    """
+    Runs tool calls in the background and keeps their results in a JobStore
+
+    At most ``max_pending`` jobs may be unfinished at once; the calls still
+    go through the registry, so admission limits and timeouts apply.
+    """
+
+    def __init__(self, store: JobStore, max_pending: int):
+        self.store = store
+        self.max_pending = max_pending
+        self._unfinished: Dict[str, Job] = {}
+
+    def submit(self, tool_name: str, call: Awaitable) -> Job:
+        """
+        Start a job running ``call`` (a registry coroutine) in the background
+
+        Raises:
+            TooManyJobs: ``max_pending`` jobs are unfinished
+        """
+        if len(self._unfinished) >= self.max_pending:
+            call.close()
+            raise TooManyJobs(f"{self.max_pending} jobs are already running")
+        job = Job(tool_name)
+        self.store.add(job)
+        self._unfinished[job.id] = job
+        job.task = asyncio.ensure_future(self._run(job, call))
+        return job
+
+    async def _run(self, job: Job, call: Awaitable):
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            result = await call
+            status = SUCCEEDED if isinstance(result, ToolResponse) and result.success else FAILED
+        except asyncio.CancelledError:
+            result, status = ErrorResponse(error="Job cancelled", error_type="CANCELLED"), CANCELLED
+        except Exception as e:
+            result, status = ErrorResponse(
+                error=f"Job failed: {e}", error_type="EXECUTION_ERROR", details={"tool_name": job.tool_name}
+            ), FAILED
+        finally:
+            self._unfinished.pop(job.id, None)
+        self.store.finish(job, status, encode_json(result))
+        job.done.set()
+
+    async def wait(self, job: Job, timeout: float) -> Job:
+        """Wait up to ``timeout`` seconds for a job to finish"""
+        if not job.finished and timeout > 0:
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a job if it is still running and forget it"""
+        job = self.store.remove(job_id)
+        if job is not None and job.task is not None and not job.task.done():
+            job.task.cancel()
+        return job
+
+    def cancel_all(self):
+        """Cancel every unfinished job (at shutdown)"""
+        for job in list(self._unfinished.values()):
+            if job.task is not None:
+                job.task.cancel()
+
+    async def describe(self, job: Job) -> Dict[str, Any]:
+        """Public view of a job, with its result once finished (spilled results are read on a thread)"""
+        description = {
+            "id": job.id,
+            "tool_name": job.tool_name,
+            "status": job.status,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at
+        }
+        if job.finished:
+            if job.spilled:
+                description["result"] = await asyncio.to_thread(self.store.result, job)
+            else:
+                description["result"] = self.store.result(job)
+        return description
+
+    def stats(self) -> Dict[str, Any]:
+        """Store statistics plus the unfinished job count and limit"""
+        return {**self.store.stats(), "running": len(self._unfinished), "max_pending": self.max_pending}
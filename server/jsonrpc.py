@@ -0,0 +1,281 @@
+# JSON-RPC 2.0 transport - exposes the tool registry to MCP clients
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+import asyncio
+import sys
+
+from .config import config
+from .registry import model_json_schema
+from .schemas.tool_schema import ErrorResponse
+from .serialization import decode_json, encode_json
+
+JSONRPC_VERSION = "2.0"
+MCP_PROTOCOL_VERSION = "2024-11-05"
+
+# Standard JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+# Registry errors caused by the caller rather than by the tool
+CLIENT_ERROR_TYPES = {"TOOL_NOT_FOUND", "VALIDATION_ERROR"}
+
+def _error(request_id: Any, code: int, message: str, data: Any = None) -> Dict[str, Any]:
+    """Build a JSON-RPC error response"""
+    error = {"code": code, "message": message}
+    if data is not None:
+        error["data"] = data
+    return {"jsonrpc": JSONRPC_VERSION, "id": request_id, "error": error}
+
+def _result(request_id: Any, result: Any) -> Dict[str, Any]:
+    """Build a JSON-RPC success response"""
+    return {"jsonrpc": JSONRPC_VERSION, "id": request_id, "result": result}
+
+class JsonRpcError(Exception):
+    """Raised by method handlers to return a JSON-RPC error"""
+
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+class JsonRpcDispatcher:
+    """
+    Dispatches JSON-RPC 2.0 messages into a ToolRegistry
+
+    Supports the MCP methods ``initialize``, ``ping``, ``tools/list`` and
+    ``tools/call``, JSON-RPC batch arrays and notifications. ``serve`` runs a
+    persistent connection on which many requests can be in flight at once;
+    their responses are sent as soon as each one finishes.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+        self._methods: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]] = {
+            "initialize": self._initialize,
+            "ping": self._ping,
+            "tools/list": self._tools_list,
+            "tools/call": self._tools_call
+        }
+
+    async def handle_raw(self, raw: Union[str, bytes]) -> Optional[Union[Dict[str, Any], List[Dict[str, Any]]]]:
+        """Parse and handle one incoming message; returns None when nothing should be sent back"""
+        try:
+            message = decode_json(raw)
+        except ValueError as e:
+            return _error(None, PARSE_ERROR, "Parse error", {"message": str(e)})
+        return await self.handle_message(message)
+
+    async def handle_message(self, message: Any) -> Optional[Union[Dict[str, Any], List[Dict[str, Any]]]]:
+        """Handle a decoded request, notification or batch array"""
+        if isinstance(message, list):
+            if not message:
+                return _error(None, INVALID_REQUEST, "Invalid Request", {"message": "Empty batch"})
+            responses = await asyncio.gather(*(self._handle_request(item) for item in message))
+            responses = [response for response in responses if response is not None]
+            # A batch made only of notifications gets no response at all
+            return responses or None
+        return await self._handle_request(message)
+
+    async def _handle_request(self, request: Any) -> Optional[Dict[str, Any]]:
+        """Handle a single request object"""
+        if not isinstance(request, dict) or request.get("jsonrpc") != JSONRPC_VERSION \
+                or not isinstance(request.get("method"), str):
+            request_id = request.get("id") if isinstance(request, dict) else None
+            return _error(request_id, INVALID_REQUEST, "Invalid Request")
+
+        is_notification = "id" not in request
+        request_id = request.get("id")
+        handler = self._methods.get(request["method"])
+
+        if handler is None:
+            if is_notification:
+                return None
+            return _error(request_id, METHOD_NOT_FOUND, f"Method '{request['method']}' not found")
+
+        # Only missing or null params mean none
+        params = request.get("params")
+        if params is None:
+            params = {}
+        if not isinstance(params, dict):
+            return None if is_notification else _error(
+                request_id, INVALID_PARAMS, "Invalid params", {"message": "params must be an object"}
+            )
+
+        try:
+            result = await handler(params)
+        except JsonRpcError as e:
+            return None if is_notification else _error(request_id, e.code, e.message, e.data)
+        except Exception as e:
+            return None if is_notification else _error(
+                request_id, INTERNAL_ERROR, "Internal error", {"message": str(e)}
+            )
+
+        return None if is_notification else _result(request_id, result)
+
+    async def _initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """MCP handshake"""
+        return {
+            "protocolVersion": params.get("protocolVersion", MCP_PROTOCOL_VERSION),
+            "capabilities": {"tools": {}},
+            "serverInfo": {"name": "MCP Test Server", "version": "1.0.0"}
+        }
+
+    async def _ping(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Liveness check"""
+        return {}
+
+    async def _tools_list(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """List tools with their input schemas"""
+        return {
+            "tools": [
+                {
+                    "name": name,
+                    "description": tool["description"],
+                    "inputSchema": model_json_schema(tool["request_model"])
+                }
+                for name, tool in self.registry.list_tools().items()
+            ]
+        }
+
+    async def _tools_call(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute a tool and wrap the outcome as an MCP tool result"""
+        name = params.get("name")
+        arguments = params.get("arguments")
+        if arguments is None:
+            arguments = {}
+        if not isinstance(name, str) or not isinstance(arguments, dict):
+            raise JsonRpcError(
+                INVALID_PARAMS, "Invalid params",
+                {"message": "tools/call needs a 'name' string and an 'arguments' object"}
+            )
+
+        response = await self.registry.execute_tool_async(name, arguments)
+
+        if isinstance(response, ErrorResponse) and response.error_type in CLIENT_ERROR_TYPES:
+            raise JsonRpcError(INVALID_PARAMS, response.error, response.model_dump())
+
+        payload = response.model_dump()
+        if isinstance(response, ErrorResponse):
+            text = response.error
+        elif response.result is not None:
+            text = encode_json(response.result).decode()
+        else:
+            text = response.message
+
+        return {
+            "content": [{"type": "text", "text": text}],
+            "structuredContent": payload,
+            "isError": not response.success
+        }
+
+    async def serve(
+        self,
+        receive: Callable[[], Awaitable[Optional[Union[str, bytes]]]],
+        send: Callable[[str], Awaitable[None]]
+    ):
+        """
+        Run a persistent, pipelined connection
+
+        Every incoming message is handled in its own task, so a slow tool call
+        does not hold up the requests behind it. At most
+        ``JSONRPC_MAX_IN_FLIGHT`` messages are processed at once; beyond that
+        reading pauses until one finishes.
+
+        Args:
+            receive: Returns the next raw message, or None at end of input;
+                raises JsonRpcError for a message it could not read, which
+                is answered with that error and skipped
+            send: Sends one encoded response
+        """
+        in_flight = asyncio.Semaphore(config.JSONRPC_MAX_IN_FLIGHT)
+        send_lock = asyncio.Lock()
+        tasks = set()
+
+        async def process(raw):
+            try:
+                if isinstance(raw, JsonRpcError):
+                    response = _error(None, raw.code, raw.message, raw.data)
+                else:
+                    response = await self.handle_raw(raw)
+                if response is not None:
+                    encoded = encode_json(response).decode()
+                    async with send_lock:
+                        await send(encoded)
+            finally:
+                in_flight.release()
+
+        try:
+            while True:
+                try:
+                    raw = await receive()
+                except JsonRpcError as e:
+                    raw = e
+                if raw is None:
+                    break
+                await in_flight.acquire()
+                task = asyncio.create_task(process(raw))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            # End of input: let the requests already received finish
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            # Connection lost: nobody is left to read the answers
+            for task in tasks:
+                task.cancel()
+
+def line_receiver(reader: asyncio.StreamReader) -> Callable[[], Awaitable[Optional[bytes]]]:
+    """
+    A ``serve`` receive function reading newline-delimited messages
+
+    Lines longer than the reader's limit are skipped up to their newline and
+    reported as an Invalid Request, so one oversized message does not end
+    the session.
+    """
+    async def discard_line():
+        while True:
+            try:
+                await reader.readuntil(b"\n")
+                return
+            except asyncio.LimitOverrunError as e:
+                # Nothing was consumed; drop what the reader holds and look again
+                await reader.readexactly(e.consumed)
+            except asyncio.IncompleteReadError:
+                return
+
+    async def receive() -> Optional[bytes]:
+        while True:
+            try:
+                line = await reader.readuntil(b"\n")
+            except asyncio.IncompleteReadError as e:
+                # Last line without a newline, then end of input
+                line = e.partial
+                if not line:
+                    return None
+            except asyncio.LimitOverrunError:
+                await discard_line()
+                raise JsonRpcError(
+                    INVALID_REQUEST, "Invalid Request",
+                    {"message": "Message is longer than JSONRPC_MAX_MESSAGE_BYTES"}
+                )
+            if line.strip():
+                return line
+
+    return receive
+
+async def serve_stdio(dispatcher: JsonRpcDispatcher):
+    """Serve newline-delimited JSON-RPC messages over stdin/stdout"""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=config.JSONRPC_MAX_MESSAGE_BYTES)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    receive = line_receiver(reader)
+
+    async def send(message: str):
+        sys.stdout.write(message + "\n")
+        sys.stdout.flush()
+
+    await dispatcher.serve(receive, send)
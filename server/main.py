@@ -1,129 +1,662 @@
 # FastAPI MCP test server - main entry point
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
-from typing import Dict, Any, Union
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
+from fastapi.openapi.utils import get_openapi
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Dict, Any, Optional, Tuple, Union
+import asyncio
+import fastapi
+import hashlib
+import hmac
+import math
+import signal
+import threading
+import time
 import uvicorn
 
 from .config import config
 from .registry import registry
-from .schemas.tool_schema import HealthResponse, ToolResponse, ErrorResponse
+from .jsonrpc import INVALID_REQUEST, JsonRpcDispatcher, JsonRpcError
+from .jobs import JobManager, JobStore, TooManyJobs
+from .openapi import OpenApiCache, source_fingerprint
+from .profiling import ProfileInProgress, profiler
+from .reload import SourceWatcher, reload_in_background
+from .routes import ToolRoutes, json_body
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, UNKNOWN_TOOL
+from .serialization import (
+    DECODERS, UnsupportedMediaType, decode_body, encode_json, etag_matches, is_msgpack,
+    negotiate_response_type, render
+)
+from .streaming import ENCODERS as STREAM_ENCODERS, negotiate_stream_format
+from .tracing import Trace, current_trace, finish_trace, shutdown as shutdown_tracing, start_trace
+from .schemas.tool_schema import HealthResponse, ToolResponse, ErrorResponse, BatchResponse
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start up and tear down server-wide resources"""
+    if config.TOOL_WARMUP:
+        # Import tool implementations without delaying readiness
+        registry.warm_up(background=True)
+    # Bring up worker processes for CPU-bound tools off the event loop
+    threading.Thread(target=registry.start_process_pool, name="process-pool-start", daemon=True).start()
+    # Publish this worker's metrics for the others to aggregate
+    registry.metrics.start_flusher(config.METRICS_FLUSH_INTERVAL)
+    
+    # Hot reload triggers
+    watcher = None
+    if config.RELOAD_WATCH:
+        watcher = SourceWatcher(
+            registry.sources,
+            lambda: reload_in_background(registry, "source change"),
+            config.RELOAD_WATCH_INTERVAL
+        )
+        watcher.start()
+    loop = asyncio.get_running_loop()
+    sighup = False
+    if config.RELOAD_ON_SIGHUP and hasattr(signal, "SIGHUP"):
+        try:
+            loop.add_signal_handler(signal.SIGHUP, reload_in_background, registry, "SIGHUP")
+            sighup = True
+        except (NotImplementedError, RuntimeError, ValueError):
+            # No signal support here, or not on the main thread (e.g. under a test client)
+            pass
+    
+    yield
+    jobs.cancel_all()
+    if sighup:
+        loop.remove_signal_handler(signal.SIGHUP)
+    if watcher is not None:
+        watcher.stop()
+    registry.metrics.stop_flusher()
+    # Release the thread pools used for synchronous tools
+    registry.shutdown(wait=False)
+    shutdown_tracing()
+
+# JSON-RPC dispatcher shared by all MCP connections
+dispatcher = JsonRpcDispatcher(registry)
+
+# Background tool calls of the async job API
+jobs = JobManager(
+    JobStore(
+        max_bytes=config.JOB_STORE_MAX_BYTES,
+        ttl_seconds=config.JOB_RESULT_TTL,
+        max_entries=config.JOB_STORE_MAX_ENTRIES,
+        spill_dir=config.JOB_SPILL_DIR,
+        spill_max_bytes=config.JOB_SPILL_MAX_BYTES
+    ),
+    max_pending=config.JOB_MAX_PENDING
+)
 
 # Create FastAPI app instance
 app = FastAPI(
     title="MCP Test Server",
     description="A minimal MCP-style server for testing and validation",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # Served below from a document built once and cached as bytes
+    openapi_url=None,
+    docs_url=None,
+    redoc_url=None
 )
+app.add_middleware(MetricsMiddleware, metrics=registry.metrics)
+
+def response_type(request: Request) -> str:
+    """Media type to answer a request with (JSON unless MessagePack is negotiated)"""
+    return negotiate_response_type(request.headers.get("accept"))
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler for consistent error responses"""
-    return JSONResponse(
-        status_code=500,
-        content={
+    return render(
+        {
             "success": False,
             "error": "Internal server error",
             "error_type": "INTERNAL_ERROR",
             "details": {"message": str(exc)}
-        }
+        },
+        response_type(request),
+        status_code=500
     )
 
 @app.get("/health", response_model=HealthResponse)
-async def health_check():
+async def health_check(request: Request):
     """Health check endpoint to verify server is running"""
-    return HealthResponse(
-        status="healthy",
-        message="MCP test server is operational"
+    return render(
+        HealthResponse(status="healthy", message="MCP test server is operational"),
+        response_type(request)
     )
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics, aggregated across workers when METRICS_DIR is set"""
+    return Response(content=registry.metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+def admin_error(request: Request) -> Optional[ErrorResponse]:
+    """Check the admin bearer token; returns the error to send if it is missing or wrong"""
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if (
+        config.ADMIN_TOKEN
+        and scheme.lower() == "bearer"
+        and hmac.compare_digest(token.strip().encode(), config.ADMIN_TOKEN.encode())
+    ):
+        return None
+    return ErrorResponse(error="Admin token required", error_type="UNAUTHORIZED")
+
+@app.get("/debug/profile", include_in_schema=False)
+async def profile(request: Request, seconds: float = 5.0, top: int = 25, format: str = "json"):
+    """
+    Record a CPU profile and allocation snapshot of this worker for ``seconds``
+
+    Returns collapsed stacks ready for flamegraph tools (as plain text with
+    format=collapsed) and the lines that allocated the most memory.
+    """
+    media_type = response_type(request)
+    if not config.PROFILING_ENABLED:
+        return render(ErrorResponse(error="Not found", error_type="NOT_FOUND"), media_type, status_code=404)
+    error = admin_error(request)
+    if error is not None:
+        return render(error, media_type, status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    if not 0 < seconds <= config.PROFILE_MAX_SECONDS or top < 0 or format not in ("json", "collapsed"):
+        error = ErrorResponse(
+            error="Invalid profile request",
+            error_type="VALIDATION_ERROR",
+            details={"max_seconds": config.PROFILE_MAX_SECONDS, "formats": ["json", "collapsed"]}
+        )
+        return render(error, media_type, status_code=400)
+    
+    try:
+        # Sample from another thread so the event loop keeps serving (and shows up in the profile)
+        result = await asyncio.to_thread(profiler.profile, seconds, config.PROFILE_INTERVAL_MS / 1000, top)
+    except ProfileInProgress as e:
+        error = ErrorResponse(error=str(e), error_type="PROFILE_IN_PROGRESS")
+        return render(error, media_type, status_code=409)
+    
+    if format == "collapsed":
+        return Response(content=result["collapsed"] + "\n", media_type="text/plain")
+    return render({"success": True, "profile": result}, media_type)
+
+@app.post("/admin/reload", include_in_schema=False)
+async def reload_tools(request: Request):
+    """Rediscover the tools and atomically swap them in, without dropping calls in flight"""
+    media_type = response_type(request)
+    error = admin_error(request)
+    if error is not None:
+        return render(error, media_type, status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    try:
+        summary = await asyncio.to_thread(registry.reload)
+    except Exception as e:
+        error = ErrorResponse(
+            error="Reload failed; the current tools are still served",
+            error_type="RELOAD_FAILED",
+            details={"message": f"{type(e).__name__}: {e}"}
+        )
+        return render(error, media_type, status_code=500)
+    return render({"success": True, "reload": summary}, media_type)
+
 @app.get(f"{config.API_PREFIX}/tools")
-async def list_tools():
-    """List all available tools with their descriptions"""
+async def list_tools(request: Request):
+    """List all available tools with their descriptions and input schemas"""
+    media_type = response_type(request)
     try:
-        tools = registry.list_tools()
+        body, etag = registry.catalog(media_type)
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
         
-        # Format tools for API response
-        formatted_tools = {}
-        for name, tool_info in tools.items():
-            formatted_tools[name] = {
-                "description": tool_info["description"],
-                "parameters": tool_info["parameters"]
-            }
+        # Conditional GET: clients holding the current catalog get an empty 304
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
         
-        return {
-            "success": True,
-            "tools": formatted_tools,
-            "count": len(formatted_tools)
-        }
+        return Response(content=body, media_type=media_type, headers=headers)
     except Exception as e:
-        return JSONResponse(
-            status_code=500,
-            content={
+        return render(
+            {
                 "success": False,
                 "error": f"Failed to list tools: {str(e)}",
                 "error_type": "INTERNAL_ERROR"
-            }
+            },
+            media_type,
+            status_code=500
         )
 
-@app.post(f"{config.API_PREFIX}/tools/add_numbers")
-async def call_add_numbers(request: Dict[str, Any]) -> Union[ToolResponse, ErrorResponse]:
-    """Execute the add_numbers tool"""
-    result = registry.execute_tool("add_numbers", request)
+@app.get(f"{config.API_PREFIX}/cache")
+async def cache_stats(request: Request):
+    """Hit/miss/eviction counters of the result cache for deterministic tools"""
+    return render(
+        {
+            "success": True,
+            "cache": registry.cache_stats()
+        },
+        response_type(request)
+    )
+
+def unsupported_media_type(error: UnsupportedMediaType) -> ErrorResponse:
+    """Error for a request body in a format this server cannot decode"""
+    return ErrorResponse(
+        error="Unsupported media type",
+        error_type="UNSUPPORTED_MEDIA_TYPE",
+        details={"message": str(error)}
+    )
+
+def invalid_body(error: ValueError) -> ErrorResponse:
+    """Error for a request body that could not be decoded"""
+    return ErrorResponse(
+        error="Invalid request body",
+        error_type="VALIDATION_ERROR",
+        details={"message": str(error)}
+    )
+
+def error_status(result: ErrorResponse) -> int:
+    """HTTP status for a registry error"""
+    if result.error_type == "TOOL_NOT_FOUND":
+        return 404
+    if result.error_type == "VALIDATION_ERROR":
+        return 400
+    if result.error_type == "UNSUPPORTED_MEDIA_TYPE":
+        return 415
+    if result.error_type == "OVERLOADED":
+        return 503
+    if result.error_type == "TIMEOUT":
+        return 504
+    if result.error_type == "CANCELLED":
+        # Client closed the connection; nginx's code, never actually seen by the client
+        return 499
+    return 500
+
+def client_timeout(request: Request) -> Optional[float]:
+    """Seconds the client is willing to wait, from the deadline header (ignored if malformed)"""
+    value = request.headers.get(config.DEADLINE_HEADER)
+    if value is None:
+        return None
+    try:
+        timeout = float(value)
+    except ValueError:
+        return None
+    return max(0.0, timeout) if math.isfinite(timeout) else None
+
+async def wait_for_disconnect(request: Request):
+    """Return once the client has closed the connection (the body must be read already)"""
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+async def until_disconnect(request: Request, call: Awaitable):
+    """
+    Await a tool call, cancelling it if the client disconnects first
+
+    A cancelled call returns a CANCELLED error that is never delivered; what
+    matters is that the tool stops running and its admission slot is freed.
+    """
+    if not config.CANCEL_ON_DISCONNECT:
+        return await call
     
-    # Return error response with appropriate HTTP status
-    if isinstance(result, ErrorResponse):
-        status_code = 400 if result.error_type == "VALIDATION_ERROR" else 500
-        return JSONResponse(status_code=status_code, content=result.dict())
+    task = asyncio.ensure_future(call)
+    watcher = asyncio.ensure_future(wait_for_disconnect(request))
+    try:
+        await asyncio.wait((task, watcher), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+        if not task.done():
+            # Client gone (or this request itself cancelled): stop the call
+            task.cancel()
+    try:
+        return await task
+    except asyncio.CancelledError:
+        return ErrorResponse(error="Client disconnected", error_type="CANCELLED")
+
+@app.get(f"{config.API_PREFIX}/admission")
+async def admission_stats(request: Request):
+    """Concurrency, queue depth and rejection counts of every admission limit"""
+    return render(
+        {
+            "success": True,
+            "admission": registry.admission_stats()
+        },
+        response_type(request)
+    )
+
+@app.post(
+    f"{config.API_PREFIX}/tools:batch",
+    openapi_extra=json_body({
+        "type": "object",
+        "properties": {"calls": {"type": "array", "items": {"type": "object"}}},
+        "required": ["calls"]
+    })
+)
+async def call_tools_batch(request: Request) -> Union[BatchResponse, ErrorResponse]:
+    """Execute a list of tool calls in one round trip, returning results in order"""
+    media_type = response_type(request)
+    try:
+        body = decode_body(await request.body(), request.headers.get("content-type"))
+    except UnsupportedMediaType as e:
+        return render(unsupported_media_type(e), media_type, status_code=415)
+    except ValueError:
+        body = None
+    calls = body.get("calls") if isinstance(body, dict) else None
+    
+    if not isinstance(calls, list):
+        error = ErrorResponse(
+            error="Invalid batch request",
+            error_type="VALIDATION_ERROR",
+            details={"message": "Request body must contain a 'calls' list"}
+        )
+        return render(error, media_type, status_code=400)
     
-    return result
+    if len(calls) > config.MAX_BATCH_SIZE:
+        error = ErrorResponse(
+            error="Batch too large",
+            error_type="VALIDATION_ERROR",
+            details={"max_batch_size": config.MAX_BATCH_SIZE, "received": len(calls)}
+        )
+        return render(error, media_type, status_code=400)
+    
+    results = await until_disconnect(request, registry.execute_batch_async(calls, client_timeout(request)))
+    if isinstance(results, ErrorResponse):
+        return render(results, media_type, status_code=error_status(results))
+    return render(BatchResponse(results=results, count=len(results)), media_type)
+
+def begin_trace(tool_name: str, request: Request) -> Optional[Trace]:
+    """Start the phase trace of a tool call (None when tracing is disabled)"""
+    route = request.scope.get("route")
+    path = route.path if route is not None else request.url.path
+    trace = start_trace(f"{request.method} {path}", request.headers.get("traceparent"))
+    if trace is not None:
+        trace.attributes.update({
+            "http.request.method": request.method,
+            "http.route": path,
+            "mcp.tool.name": tool_name
+        })
+    return trace
 
-@app.post(f"{config.API_PREFIX}/tools/dummy_tool")
-async def call_dummy_tool() -> Union[ToolResponse, ErrorResponse]:
-    """Execute the dummy_tool"""
-    result = registry.execute_tool("dummy_tool", {})
+async def execute_body(tool_name: str, request: Request) -> Union[ToolResponse, ErrorResponse]:
+    """Run a tool with the arguments in the request body, within the client's deadline"""
+    start = time.perf_counter()
+    raw_body = await request.body()
+    content_type = request.headers.get("content-type")
+    timeout = client_timeout(request)
+    trace = current_trace()
+    if not is_msgpack(content_type):
+        # Validate the raw JSON straight into the tool's request model; its
+        # parsing is part of the validation phase
+        if trace is not None:
+            trace.add_phase("parse", time.perf_counter() - start)
+        return await until_disconnect(request, registry.execute_tool_json(tool_name, raw_body, timeout))
+    
+    try:
+        arguments = decode_body(raw_body, content_type)
+    except UnsupportedMediaType as e:
+        return unsupported_media_type(e)
+    except ValueError as e:
+        return invalid_body(e)
+    if trace is not None:
+        trace.add_phase("parse", time.perf_counter() - start)
+    return await until_disconnect(request, registry.execute_tool_async(tool_name, arguments, timeout))
+
+def tool_response(tool_name: str, result: Union[ToolResponse, ErrorResponse], media_type: str) -> Response:
+    """Encode a tool result with the negotiated serializer, recording the serialization time"""
+    start = time.perf_counter()
     
     # Return error response with appropriate HTTP status
-    if isinstance(result, ErrorResponse):
-        return JSONResponse(status_code=500, content=result.dict())
+    status_code = error_status(result) if isinstance(result, ErrorResponse) else 200
+    headers = None
+    if status_code == 503:
+        # Shed load: tell clients when to come back instead of letting them retry at once
+        headers = {"Retry-After": str(result.details["retry_after"])}
+    response = render(result, media_type, status_code=status_code, headers=headers)
     
-    return result
+    serialization_seconds = time.perf_counter() - start
+    label = UNKNOWN_TOOL if result.error_type == "TOOL_NOT_FOUND" else tool_name
+    registry.metrics.record_phase(label, "serialization", serialization_seconds)
+    
+    trace = current_trace()
+    if trace is not None:
+        trace.add_phase("serialization", serialization_seconds)
+        trace.attributes["http.response.status_code"] = status_code
+        if result.error_type:
+            trace.attributes["error.type"] = result.error_type
+        response.headers["Server-Timing"] = trace.server_timing()
+        finish_trace(trace, error=status_code >= 500)
+    return response
 
-@app.post(f"{config.API_PREFIX}/tools/{{tool_name}}")
-async def call_generic_tool(tool_name: str, request: Dict[str, Any] = None):
-    """Generic endpoint for calling any tool by name"""
-    if request is None:
-        request = {}
+def job_not_found(job_id: str) -> ErrorResponse:
+    """Error for an unknown, expired or evicted job id"""
+    return ErrorResponse(
+        error=f"Job '{job_id}' not found",
+        error_type="JOB_NOT_FOUND",
+        details={"message": "Unknown id, or its result expired or was evicted"}
+    )
+
+@app.get(f"{config.API_PREFIX}/jobs")
+async def job_stats(request: Request):
+    """Size, limits and eviction counters of the job result store"""
+    return render({"success": True, "jobs": jobs.stats()}, response_type(request))
+
+@app.post(
+    f"{config.API_PREFIX}/jobs/{{tool_name}}",
+    status_code=202,
+    openapi_extra=json_body({"type": "object"}, required=False)
+)
+async def submit_job(tool_name: str, request: Request):
+    """Start a tool call in the background and return its job id right away"""
+    media_type = response_type(request)
+    if not config.JOBS_ENABLED:
+        error = ErrorResponse(
+            error="Async jobs are disabled",
+            error_type="JOBS_DISABLED",
+            details={"message": "Jobs are kept per worker; set JOBS_ENABLED when polls reach the worker that accepted the job"}
+        )
+        return render(error, media_type, status_code=501)
+    if not registry.tool_exists(tool_name):
+        error = ErrorResponse(
+            error=f"Tool '{tool_name}' not found",
+            error_type="TOOL_NOT_FOUND",
+            details={"available_tools": list(registry.list_tools())}
+        )
+        return render(error, media_type, status_code=404)
     
-    result = registry.execute_tool(tool_name, request)
+    raw_body = await request.body()
+    content_type = request.headers.get("content-type")
+    timeout = client_timeout(request)
+    if is_msgpack(content_type):
+        try:
+            arguments = decode_body(raw_body, content_type)
+        except UnsupportedMediaType as e:
+            return render(unsupported_media_type(e), media_type, status_code=415)
+        except ValueError as e:
+            return render(invalid_body(e), media_type, status_code=400)
+        call = registry.execute_tool_async(tool_name, arguments, timeout)
+    else:
+        call = registry.execute_tool_json(tool_name, raw_body, timeout)
     
-    # Return error response with appropriate HTTP status
-    if isinstance(result, ErrorResponse):
-        if result.error_type == "TOOL_NOT_FOUND":
-            status_code = 404
-        elif result.error_type == "VALIDATION_ERROR":
-            status_code = 400
-        else:
-            status_code = 500
-        
-        return JSONResponse(status_code=status_code, content=result.dict())
+    try:
+        job = jobs.submit(tool_name, call)
+    except TooManyJobs as e:
+        error = ErrorResponse(
+            error=str(e),
+            error_type="OVERLOADED",
+            details={"max_pending": jobs.max_pending, "retry_after": config.OVERLOAD_RETRY_AFTER}
+        )
+        return render(error, media_type, status_code=503, headers={"Retry-After": str(config.OVERLOAD_RETRY_AFTER)})
     
-    return result
+    location = f"{config.API_PREFIX}/jobs/{job.id}"
+    return render(
+        {"success": True, "job": await jobs.describe(job), "location": location},
+        media_type,
+        status_code=202,
+        headers={"Location": location}
+    )
+
+@app.get(f"{config.API_PREFIX}/jobs/{{job_id}}")
+async def get_job(job_id: str, request: Request, wait: float = 0.0):
+    """
+    Status of a job, with its result once finished
+
+    With ``wait``, the request is held until the job finishes or that many
+    seconds pass (at most JOB_MAX_WAIT), so clients need not poll in a loop.
+    """
+    media_type = response_type(request)
+    job = jobs.store.get(job_id)
+    if job is None:
+        return render(job_not_found(job_id), media_type, status_code=404)
+    if not math.isfinite(wait):
+        wait = 0.0
+    await jobs.wait(job, min(max(0.0, wait), config.JOB_MAX_WAIT))
+    return render({"success": True, "job": await jobs.describe(job)}, media_type)
+
+@app.delete(f"{config.API_PREFIX}/jobs/{{job_id}}")
+async def delete_job(job_id: str, request: Request):
+    """Cancel a job if it is still running and discard it"""
+    media_type = response_type(request)
+    job = jobs.cancel(job_id)
+    if job is None:
+        return render(job_not_found(job_id), media_type, status_code=404)
+    return render({"success": True, "job": {"id": job.id, "status": job.status}}, media_type)
+
+async def stream_body(tool_name: str, request: Request):
+    """Start streaming a generator tool with the arguments in the request body"""
+    start = time.perf_counter()
+    raw_body = await request.body()
+    content_type = request.headers.get("content-type")
+    if is_msgpack(content_type):
+        # Streams validate JSON; MessagePack arguments are small, so transcode them
+        try:
+            raw_body = encode_json(decode_body(raw_body, content_type))
+        except UnsupportedMediaType as e:
+            return unsupported_media_type(e)
+        except ValueError as e:
+            return invalid_body(e)
+    trace = current_trace()
+    if trace is not None:
+        trace.add_phase("parse", time.perf_counter() - start)
+    # A queued stream gives up its place if the client leaves before admission
+    return await until_disconnect(request, registry.stream_tool_json(tool_name, raw_body, client_timeout(request)))
+
+async def close_frames(frames: AsyncIterator[Tuple[str, Any]]):
+    """Close a stream's frames, which frees its admission slot if the body was never read"""
+    # A coroutine function: BackgroundTask would run a bound aclose on a thread and never await it
+    await frames.aclose()
+
+async def call_tool(tool_name: str, request: Request) -> Response:
+    """Call a tool with the request body as arguments, streaming generator tools when asked to"""
+    trace = begin_trace(tool_name, request)
+    # Generator tools stream their chunks when the client accepts NDJSON or SSE
+    stream_format = negotiate_stream_format(request.headers.get("accept"))
+    if stream_format is not None and registry.is_streaming(tool_name):
+        result = await stream_body(tool_name, request)
+        if not isinstance(result, ErrorResponse):
+            headers = {"Cache-Control": "no-cache"}
+            if trace is not None:
+                # Headers go out before the first chunk: only the phases up to admission
+                headers["Server-Timing"] = trace.server_timing()
+                trace.attributes["http.response.status_code"] = 200
+                finish_trace(trace)
+            return StreamingResponse(
+                STREAM_ENCODERS[stream_format](result),
+                media_type=stream_format,
+                headers=headers,
+                # Frees the admission slot if the client left before the body was read
+                background=BackgroundTask(close_frames, result)
+            )
+    else:
+        result = await execute_body(tool_name, request)
+    
+    return tool_response(tool_name, result, response_type(request))
+
+# One typed route per tool, regenerated whenever the tools change (hot reload)
+tool_routes = ToolRoutes(f"{config.API_PREFIX}/tools", call_tool)
+registry.on_publish(tool_routes.build)
+tool_routes.build(registry.snapshot)
+app.router.routes.append(tool_routes)
+
+@app.post(
+    f"{config.API_PREFIX}/tools/{{tool_name}}",
+    openapi_extra=json_body({"type": "object"}, required=False)
+)
+async def call_generic_tool(tool_name: str, request: Request):
+    """Generic endpoint for calling any tool by name"""
+    return await call_tool(tool_name, request)
+
+def openapi_key() -> str:
+    """Fingerprint of everything the OpenAPI document depends on, the current tools included"""
+    _, catalog_etag = registry.catalog()
+    parts = (app.version, fastapi.__version__, source_fingerprint(), ",".join(DECODERS), catalog_etag)
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+def build_openapi() -> Dict[str, Any]:
+    """OpenAPI document of the app, with the generated route of every tool"""
+    routes = [
+        documented
+        for route in app.routes
+        for documented in (tool_routes.routes if route is tool_routes else (route,))
+    ]
+    document = get_openapi(title=app.title, version=app.version, description=app.description, routes=routes)
+    schemas = document.setdefault("components", {}).setdefault("schemas", {})
+    for name, schema in tool_routes.components.items():
+        schemas.setdefault(name, schema)
+    return document
+
+openapi_cache = OpenApiCache(build_openapi, openapi_key, config.OPENAPI_CACHE_DIR)
+
+@app.get("/openapi.json", include_in_schema=False)
+async def openapi(request: Request):
+    """The OpenAPI document, built once per version of the tools"""
+    # The first build of a large document should not stall the event loop
+    body, etag = await asyncio.to_thread(openapi_cache.get)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.get("/docs", include_in_schema=False)
+async def swagger_ui():
+    return get_swagger_ui_html(openapi_url="/openapi.json", title=f"{app.title} - Swagger UI")
+
+@app.get("/redoc", include_in_schema=False)
+async def redoc():
+    return get_redoc_html(openapi_url="/openapi.json", title=f"{app.title} - ReDoc")
+
+@app.websocket("/mcp/ws")
+async def mcp_websocket(websocket: WebSocket):
+    """Persistent MCP JSON-RPC 2.0 connection with pipelined requests"""
+    await websocket.accept()
+    
+    async def receive() -> str:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        if message.get("text") is None:
+            raise JsonRpcError(
+                INVALID_REQUEST, "Invalid Request", {"message": "Binary frames are not supported; send JSON as text"}
+            )
+        return message["text"]
+    
+    try:
+        await dispatcher.serve(receive, websocket.send_text)
+    except WebSocketDisconnect:
+        pass
 
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Root endpoint with basic server info"""
-    return {
+    return render({
         "message": "MCP Test Server",
         "version": "1.0.0",
         "status": "operational",
         "endpoints": {
+            # Tools first, so a tool cannot shadow a server endpoint's entry
+            **{name: tool_routes.path(name) for name in sorted(registry.list_tools())},
             "health_check": "/health",
+            "metrics": "/metrics",
             "api_docs": "/docs",
             "list_tools": f"{config.API_PREFIX}/tools",
-            "add_numbers": f"{config.API_PREFIX}/tools/add_numbers",
-            "dummy_tool": f"{config.API_PREFIX}/tools/dummy_tool"
+            "batch": f"{config.API_PREFIX}/tools:batch",
+            "admission": f"{config.API_PREFIX}/admission",
+            "jobs": f"{config.API_PREFIX}/jobs",
+            "mcp_websocket": "/mcp/ws"
         }
-    }
+    }, response_type(request))
 
 if __name__ == "__main__":
     # Run the server when executed directly
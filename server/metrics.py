@@ -0,0 +1,312 @@
+# Metrics - per-tool counters and latency histograms in Prometheus format
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+
+# Upper bounds in seconds; tool calls are often only a few microseconds
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# name -> (type, help, label names)
+FAMILIES = {
+    "mcp_tool_calls_total": (
+        "counter", "Tool calls by outcome (success or error_type)", ("tool", "outcome")
+    ),
+    "mcp_tool_phase_seconds": (
+        "histogram", "Time spent in each phase of a tool call", ("tool", "phase")
+    ),
+    "mcp_http_requests_total": (
+        "counter", "HTTP requests by handler, method and status", ("handler", "method", "status")
+    ),
+    "mcp_http_request_duration_seconds": (
+        "histogram", "HTTP request duration by handler", ("handler",)
+    ),
+    "mcp_admission_active": (
+        "gauge", "Tool calls holding an admission slot", ("scope",)
+    ),
+    "mcp_admission_queued": (
+        "gauge", "Tool calls waiting for an admission slot", ("scope",)
+    ),
+    "mcp_admission_rejected_total": (
+        "counter", "Tool calls rejected because the wait queue was full", ("scope",)
+    )
+}
+
+# A collector returns (family name, label values, value) samples read at collection time
+Collector = Callable[[], Iterable[Tuple[str, Tuple[str, ...], float]]]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Label used for calls to tools that do not exist, to keep label cardinality bounded
+UNKNOWN_TOOL = "__unknown__"
+
+class Metrics:
+    """
+    Low-overhead counters and histograms
+
+    Each thread records into its own shard, so the hot path never takes a
+    lock; shards are only summed when metrics are read. With ``directory``
+    set, every worker process also writes its totals to a file there and
+    ``render`` adds up the files of the workers still running, so a scrape of
+    any worker returns server-wide numbers. A worker removes its file when it
+    stops; the files of workers that died or of earlier runs are skipped, and
+    Prometheus sees their counters go away as a counter reset.
+    """
+
+    def __init__(self, enabled: bool = True, directory: Optional[str] = None, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.directory = directory
+        self.buckets = buckets
+        self._local = threading.local()
+        self._shards: List[Dict[str, dict]] = []
+        self._shards_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._stop_flusher = threading.Event()
+        self._collectors: List[Collector] = []
+
+    def _shard(self) -> Dict[str, dict]:
+        """The calling thread's shard, created on first use"""
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = {"counters": {}, "histograms": {}}
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def inc(self, name: str, labels: Tuple[str, ...], value: float = 1):
+        """Increase a counter"""
+        if not self.enabled:
+            return
+        counters = self._shard()["counters"]
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name: str, labels: Tuple[str, ...], seconds: float):
+        """Record a duration in a histogram"""
+        if not self.enabled:
+            return
+        histograms = self._shard()["histograms"]
+        key = (name, labels)
+        histogram = histograms.get(key)
+        if histogram is None:
+            # One slot per bucket plus +Inf, then sum and count
+            histogram = histograms[key] = [0] * (len(self.buckets) + 3)
+        histogram[bisect.bisect_left(self.buckets, seconds)] += 1
+        histogram[-2] += seconds
+        histogram[-1] += 1
+
+    def record_call(self, tool_name: str, outcome: str):
+        """Count a finished tool call by outcome"""
+        self.inc("mcp_tool_calls_total", (tool_name, outcome))
+
+    def record_phase(self, tool_name: str, phase: str, seconds: float):
+        """Record the time one phase (validation, execution, serialization) took"""
+        self.observe("mcp_tool_phase_seconds", (tool_name, phase), seconds)
+
+    def add_collector(self, collector: Collector):
+        """Read values kept elsewhere (such as current queue depths) whenever metrics are collected"""
+        self._collectors.append(collector)
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Totals recorded by this process, with labels encoded as JSON strings"""
+        counters: Dict[str, float] = {}
+        histograms: Dict[str, List[float]] = {}
+        gauges: Dict[str, float] = {}
+        with self._shards_lock:
+            shards = list(self._shards)
+
+        if self.enabled:
+            for collector in self._collectors:
+                for name, labels, value in collector():
+                    target = gauges if FAMILIES[name][0] == "gauge" else counters
+                    key = json.dumps([name, labels])
+                    target[key] = target.get(key, 0) + value
+
+        for shard in shards:
+            # Copies are taken in C without releasing the GIL, so concurrent writers are safe
+            for (name, labels), value in shard["counters"].copy().items():
+                key = json.dumps([name, labels])
+                counters[key] = counters.get(key, 0) + value
+            for (name, labels), histogram in shard["histograms"].copy().items():
+                key = json.dumps([name, labels])
+                _merge_histogram(histograms, key, list(histogram))
+
+        return {"counters": counters, "histograms": histograms, "gauges": gauges}
+
+    def reset(self):
+        """Drop everything recorded by this process"""
+        with self._shards_lock:
+            for shard in self._shards:
+                shard["counters"].clear()
+                shard["histograms"].clear()
+
+    def _worker_file(self) -> str:
+        return os.path.join(self.directory, f"metrics_{os.getpid()}.json")
+
+    def flush(self):
+        """Write this process's totals to the shared metrics directory"""
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._worker_file()
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as output:
+            json.dump(self.snapshot(), output)
+        os.replace(temporary, path)
+
+    def aggregate(self) -> Dict[str, dict]:
+        """Totals across every worker writing to the metrics directory"""
+        if not self.directory:
+            return self.snapshot()
+
+        self.flush()
+        counters: Dict[str, float] = {}
+        histograms: Dict[str, List[float]] = {}
+        gauges: Dict[str, float] = {}
+        for path in glob.glob(os.path.join(self.directory, "metrics_*.json")):
+            if not _worker_running(path):
+                continue
+            try:
+                with open(path) as source:
+                    data = json.load(source)
+            except (OSError, ValueError):
+                continue
+            for key, value in data["counters"].items():
+                counters[key] = counters.get(key, 0) + value
+            for key, histogram in data["histograms"].items():
+                _merge_histogram(histograms, key, histogram)
+            # Gauges add up too: queue depth across workers is the server's queue depth
+            for key, value in data.get("gauges", {}).items():
+                gauges[key] = gauges.get(key, 0) + value
+        return {"counters": counters, "histograms": histograms, "gauges": gauges}
+
+    def start_flusher(self, interval: float):
+        """Flush to the metrics directory every interval seconds on a daemon thread"""
+        if not self.directory or self._flusher is not None:
+            return
+
+        def run():
+            while not self._stop_flusher.wait(interval):
+                try:
+                    self.flush()
+                except OSError:
+                    pass
+
+        self._stop_flusher.clear()
+        self._flusher = threading.Thread(target=run, name="metrics-flusher", daemon=True)
+        self._flusher.start()
+
+    def stop_flusher(self):
+        """Stop the background flusher and remove this worker's file"""
+        if self._flusher is None:
+            return
+        self._stop_flusher.set()
+        self._flusher.join()
+        self._flusher = None
+        try:
+            os.remove(self._worker_file())
+        except OSError:
+            pass
+
+    def render(self) -> str:
+        """Prometheus text exposition of the aggregated metrics"""
+        data = self.aggregate()
+        samples: Dict[str, List[Tuple[Tuple[str, ...], Any]]] = {name: [] for name in FAMILIES}
+        for key, value in list(data["counters"].items()) + list(data["gauges"].items()):
+            name, labels = json.loads(key)
+            samples.setdefault(name, []).append((tuple(labels), value))
+        for key, histogram in data["histograms"].items():
+            name, labels = json.loads(key)
+            samples.setdefault(name, []).append((tuple(labels), histogram))
+
+        lines = []
+        for name, (kind, help_text, label_names) in FAMILIES.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(samples[name]):
+                label_text = _format_labels(zip(label_names, labels))
+                if kind in ("counter", "gauge"):
+                    lines.append(f"{name}{{{label_text}}} {_format_value(value)}")
+                    continue
+                cumulative = 0
+                bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, value[:-2]):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {_format_value(cumulative)}')
+                lines.append(f"{name}_sum{{{label_text}}} {_format_value(value[-2])}")
+                lines.append(f"{name}_count{{{label_text}}} {_format_value(value[-1])}")
+        return "\n".join(lines) + "\n"
+
+def _worker_running(path: str) -> bool:
+    """Whether the process that wrote a metrics_<pid>.json file is still alive"""
+    try:
+        pid = int(os.path.basename(path)[len("metrics_"):-len(".json")])
+    except ValueError:
+        return False
+    if pid == os.getpid() or os.name == "nt":
+        # Signals cannot probe processes on Windows, where os.kill terminates them
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Alive, but owned by another user
+        return True
+    return True
+
+def _merge_histogram(histograms: Dict[str, List[float]], key: str, histogram: List[float]):
+    """Add one histogram's slots into another"""
+    existing = histograms.get(key)
+    if existing is None:
+        histograms[key] = histogram
+    else:
+        for index, value in enumerate(histogram):
+            existing[index] += value
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+
+def _format_value(value: float) -> str:
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+class MetricsMiddleware:
+    """ASGI middleware counting HTTP requests and their duration per handler"""
+
+    def __init__(self, app, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Label by endpoint function, not path, so tool names in URLs cannot blow up cardinality
+            endpoint = scope.get("endpoint")
+            handler = getattr(endpoint, "__name__", "unmatched")
+            self.metrics.inc("mcp_http_requests_total", (handler, scope["method"], str(status)))
+            self.metrics.observe("mcp_http_request_duration_seconds", (handler,), time.perf_counter() - start)
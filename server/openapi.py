@@ -0,0 +1,96 @@
+# OpenAPI document - built once per version of the tools, cached as bytes and optionally on disk
+from typing import Any, Callable, Dict, Optional, Tuple
+import functools
+import hashlib
+import os
+import tempfile
+import threading
+
+from .serialization import encode_json
+
+@functools.lru_cache(maxsize=None)
+def source_fingerprint() -> str:
+    """Fingerprint of the server's own source files, so cached documents do not outlive a deploy"""
+    digest = hashlib.sha256()
+    root = os.path.dirname(os.path.abspath(__file__))
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories[:] = sorted(name for name in subdirectories if name != "__pycache__")
+        for name in sorted(files):
+            if name.endswith(".py"):
+                stat = os.stat(os.path.join(directory, name))
+                digest.update(f"{os.path.relpath(directory, root)}/{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+class OpenApiCache:
+    """
+    The app's OpenAPI document, encoded once and served as bytes
+
+    ``key`` fingerprints everything the document depends on; ``build`` is only
+    called when it changes. With a ``directory``, every document built is also
+    written there under its key, and a process whose key matches a file loads
+    the file instead of building the document (workers, restarts, or a copy
+    made at build time with ``python -m server.openapi``).
+    """
+
+    def __init__(self, build: Callable[[], Dict[str, Any]], key: Callable[[], str], directory: Optional[str] = None):
+        self.directory = directory
+        self.builds = 0
+        self.key = key
+        self._build = build
+        self._cached: Optional[Tuple[str, bytes, str]] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Tuple[bytes, str]:
+        """The encoded document and its strong ETag"""
+        key = self.key()
+        cached = self._cached
+        if cached is None or cached[0] != key:
+            with self._lock:
+                cached = self._cached
+                if cached is None or cached[0] != key:
+                    body = self._load(key)
+                    if body is None:
+                        body = encode_json(self._build())
+                        self.builds += 1
+                        self._store(key, body)
+                    cached = (key, body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+                    self._cached = cached
+        return cached[1], cached[2]
+
+    def path(self, key: str) -> Optional[str]:
+        """File the document of ``key`` is cached in, if caching to disk"""
+        return None if not self.directory else os.path.join(self.directory, f"openapi-{key[:32]}.json")
+
+    def _load(self, key: str) -> Optional[bytes]:
+        path = self.path(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as cached:
+                return cached.read()
+        except OSError:
+            return None
+
+    def _store(self, key: str, body: bytes):
+        """Write a document atomically, so concurrent workers never read half a file"""
+        path = self.path(key)
+        if path is None:
+            return
+        temporary = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(descriptor, "wb") as output:
+                output.write(body)
+            os.replace(temporary, path)
+        except OSError:
+            # The disk cache is an optimization; serving from memory still works
+            if temporary is not None and os.path.exists(temporary):
+                os.remove(temporary)
+
+if __name__ == "__main__":
+    # Prebuild the document, e.g. while building an image: python -m server.openapi
+    from .main import openapi_cache
+    body, _ = openapi_cache.get()
+    where = openapi_cache.path(openapi_cache.key())
+    print(f"OpenAPI document: {len(body)} bytes" + (f", cached in {where}" if where else " (set OPENAPI_CACHE_DIR to keep it)"))
@@ -0,0 +1,227 @@
+# Process pool backend - runs CPU-bound tools on warm worker processes
+from concurrent.futures import Future, InvalidStateError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import asyncio
+import importlib
+import multiprocessing
+import os
+import threading
+
+from pydantic import BaseModel
+
+from .schemas.tool_schema import ToolResponse
+
+class SharedBlock:
+    """Reference to bytes placed in a shared memory block instead of being pickled"""
+
+    __slots__ = ("name", "size")
+
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = size
+
+    def __getstate__(self):
+        return self.name, self.size
+
+    def __setstate__(self, state):
+        self.name, self.size = state
+
+def _export(value: Any, threshold: int, blocks: List[shared_memory.SharedMemory]) -> Any:
+    """Move a large bytes-like value into shared memory; anything else is returned as is"""
+    if not isinstance(value, (bytes, bytearray, memoryview)):
+        return value
+    size = value.nbytes if isinstance(value, memoryview) else len(value)
+    if size < max(threshold, 1):
+        return value
+    block = shared_memory.SharedMemory(create=True, size=size)
+    block.buf[:size] = value
+    blocks.append(block)
+    return SharedBlock(block.name, size)
+
+def _load(value: Any, unlink: bool = False) -> Any:
+    """Read the bytes behind a SharedBlock, optionally freeing the block"""
+    if not isinstance(value, SharedBlock):
+        return value
+    block = shared_memory.SharedMemory(name=value.name)
+    try:
+        return bytes(block.buf[:value.size])
+    finally:
+        block.close()
+        if unlink:
+            block.unlink()
+
+def _export_fields(request_obj: BaseModel, threshold: int, blocks: List[shared_memory.SharedMemory]) -> BaseModel:
+    """Copy of a request with its large bytes fields moved to shared memory"""
+    update = {}
+    for field, value in request_obj:
+        exported = _export(value, threshold, blocks)
+        if exported is not value:
+            update[field] = exported
+    return request_obj.model_copy(update=update) if update else request_obj
+
+def _export_result(result: Any, threshold: int) -> Any:
+    """Move large bytes in a ToolResponse result (or directly inside a dict result) to shared memory"""
+    if not isinstance(result, ToolResponse):
+        return result
+    blocks: List[shared_memory.SharedMemory] = []
+    value = result.result
+    if isinstance(value, dict):
+        value = {key: _export(item, threshold, blocks) for key, item in value.items()}
+    else:
+        value = _export(value, threshold, blocks)
+    for block in blocks:
+        # The parent process reads and unlinks them
+        block.close()
+    return result.model_copy(update={"result": value}) if blocks else result
+
+def _load_result(result: Any) -> Any:
+    """Replace SharedBlocks in a worker's result with their bytes, freeing the blocks"""
+    if not isinstance(result, ToolResponse):
+        return result
+    value = result.result
+    if isinstance(value, SharedBlock):
+        return result.model_copy(update={"result": _load(value, unlink=True)})
+    if isinstance(value, dict) and any(isinstance(item, SharedBlock) for item in value.values()):
+        value = {key: _load(item, unlink=True) for key, item in value.items()}
+        return result.model_copy(update={"result": value})
+    return result
+
+def _init_worker(modules: Iterable[str]):
+    """Import the tool modules once when a worker process starts"""
+    for module in modules:
+        importlib.import_module(module)
+
+def _ping() -> int:
+    return os.getpid()
+
+def _call(function: Callable, request_obj: BaseModel, threshold: int) -> Any:
+    """Body of a tool call inside a worker process"""
+    update = {field: _load(value) for field, value in request_obj if isinstance(value, SharedBlock)}
+    if update:
+        request_obj = request_obj.model_copy(update=update)
+    return _export_result(function(request_obj), threshold)
+
+class ProcessToolPool:
+    """
+    Warm pool of worker processes for CPU-bound tools
+
+    Workers import the given tool modules as they start, and ``start`` brings
+    every worker up front, so the first calls do not pay for process start-up
+    or imports. Calls run their tool's function in a worker and bypass the
+    GIL of the serving process. Request fields and results holding at least
+    ``shm_threshold`` bytes travel through shared memory instead of being
+    pickled through the pool's pipe.
+
+    If a worker dies, the pool is replaced with a fresh one: the calls that
+    were in flight fail with BrokenProcessPool and later calls run normally.
+    """
+
+    def __init__(self, max_workers: int, modules: Iterable[str] = (), start_method: Optional[str] = None, shm_threshold: int = 64 * 1024):
+        self.max_workers = max_workers
+        self.modules = tuple(modules)
+        self.shm_threshold = shm_threshold
+        self.restarts = 0
+        if start_method is None and "forkserver" in multiprocessing.get_all_start_methods():
+            # Forking the threaded server process directly can deadlock the children
+            start_method = "forkserver"
+        self._context = multiprocessing.get_context(start_method)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=self._context,
+            initializer=_init_worker,
+            initargs=(self.modules,)
+        )
+
+    def _current(self) -> ProcessPoolExecutor:
+        executor = self._executor
+        if executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = self._new_executor()
+                executor = self._executor
+        return executor
+
+    def _replace(self, broken: ProcessPoolExecutor):
+        """Swap a broken executor for a new one (once, however many calls notice)"""
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = self._new_executor()
+            self.restarts += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def start(self) -> List[int]:
+        """Start every worker and wait until each has imported the tool modules"""
+        executor = self._current()
+        return [future.result() for future in [executor.submit(_ping) for _ in range(self.max_workers)]]
+
+    def submit(self, function: Callable, request_obj: BaseModel) -> Future:
+        """
+        Run ``function(request_obj)`` in a worker
+
+        Returns:
+            Future of the tool's result. Cancelling it drops the call if no
+            worker has picked it up yet.
+        """
+        blocks: List[shared_memory.SharedMemory] = []
+        request_obj = _export_fields(request_obj, self.shm_threshold, blocks)
+        outer: Future = Future()
+
+        executor = self._current()
+        try:
+            inner = executor.submit(_call, function, request_obj, self.shm_threshold)
+        except BrokenProcessPool:
+            # A worker died since the last call; retry once on a fresh pool
+            self._replace(executor)
+            executor = self._current()
+            inner = executor.submit(_call, function, request_obj, self.shm_threshold)
+
+        def complete(done: Future):
+            for block in blocks:
+                block.close()
+                block.unlink()
+            if done.cancelled():
+                outer.cancel()
+                return
+            error = done.exception()
+            try:
+                if error is not None:
+                    if isinstance(error, BrokenProcessPool):
+                        self._replace(executor)
+                    outer.set_exception(error)
+                else:
+                    # Always read the result, even if nobody waits for it, so its blocks are freed
+                    outer.set_result(_load_result(done.result()))
+            except InvalidStateError:
+                # The caller cancelled in the meantime
+                pass
+
+        outer.add_done_callback(lambda future: future.cancelled() and inner.cancel())
+        inner.add_done_callback(complete)
+        return outer
+
+    async def run(self, function: Callable, request_obj: BaseModel) -> Any:
+        """Await a tool call in a worker without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(function, request_obj))
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool size, start method and restart count"""
+        return {
+            "max_workers": self.max_workers,
+            "start_method": self._context.get_start_method(),
+            "restarts": self.restarts,
+            "running": self._executor is not None
+        }
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = True):
+        """Stop the worker processes, dropping queued calls unless ``cancel_futures`` is False"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=cancel_futures)
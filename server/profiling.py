@@ -0,0 +1,118 @@
+# Profiling - on-demand sampled CPU stacks and tracemalloc allocation profiles
+from collections import Counter
+from typing import Any, Dict, List
+import sys
+import threading
+import time
+import tracemalloc
+
+class ProfileInProgress(Exception):
+    """Raised when a profile is requested while another one is running"""
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+def _collapse(frame, thread_name: str) -> str:
+    """Stack of a frame, root first, as a semicolon-separated line (flamegraph collapsed format)"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(thread_name)
+    labels.reverse()
+    return ";".join(labels)
+
+def sample_stacks(seconds: float, interval: float) -> Counter:
+    """
+    Sample the Python stacks of every other thread for ``seconds``
+
+    Returns:
+        Counter of collapsed stacks to the number of samples they were seen in
+    """
+    me = threading.get_ident()
+    stacks: Counter = Counter()
+    deadline = time.perf_counter() + seconds
+    while True:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident != me:
+                stacks[_collapse(frame, names.get(ident, f"thread-{ident}"))] += 1
+        if time.perf_counter() + interval > deadline:
+            return stacks
+        time.sleep(interval)
+
+def top_allocations(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, limit: int) -> List[Dict[str, Any]]:
+    """Lines that allocated the most memory between two snapshots"""
+    ignored = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, __file__)
+    )
+    stats = after.filter_traces(ignored).compare_to(before.filter_traces(ignored), "lineno")
+    return [
+        {
+            "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "size_bytes": stat.size,
+            "size_diff_bytes": stat.size_diff,
+            "count": stat.count,
+            "count_diff": stat.count_diff
+        }
+        for stat in stats[:limit]
+    ]
+
+class Profiler:
+    """
+    Records a CPU and allocation profile of this process on demand
+
+    Nothing is sampled or traced between profiles. While one runs, a thread
+    samples every other thread's stack each ``interval`` seconds and
+    tracemalloc records allocations (unless it was already tracing, in which
+    case it is left running afterwards). Only one profile runs at a time.
+    """
+
+    def __init__(self, traceback_frames: int = 1):
+        self.traceback_frames = traceback_frames
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """Whether a profile is being recorded"""
+        return self._lock.locked()
+
+    def profile(self, seconds: float, interval: float = 0.005, top: int = 25) -> Dict[str, Any]:
+        """
+        Record a profile; blocks for ``seconds``
+
+        Returns:
+            Sample count, collapsed stacks (``stack count`` per line) and the
+            top allocating lines
+
+        Raises:
+            ProfileInProgress: Another profile is running
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfileInProgress("A profile is already running")
+        try:
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start(self.traceback_frames)
+            try:
+                before = tracemalloc.take_snapshot()
+                stacks = sample_stacks(seconds, interval)
+                after = tracemalloc.take_snapshot()
+            finally:
+                if started_tracing:
+                    tracemalloc.stop()
+        finally:
+            self._lock.release()
+
+        return {
+            "seconds": seconds,
+            "interval": interval,
+            "samples": sum(stacks.values()),
+            "collapsed": "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()),
+            "allocations": top_allocations(before, after, top)
+        }
+
+profiler = Profiler()
@@ -1,9 +1,33 @@
 # Tool registry - manages available tools and their metadata
-from typing import Dict, Callable, Any, Union
-from pydantic import ValidationError
-from .tools.add_numbers import add_numbers
-from .tools.dummy_tool import dummy_tool
-from .schemas.tool_schema import AddNumbersRequest, DummyToolRequest, ToolResponse, ErrorResponse
+from typing import Dict, Callable, Any, AsyncIterator, Awaitable, List, Optional, Tuple, Type, Union
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from types import MappingProxyType
+import asyncio
+import functools
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from pydantic import TypeAdapter, ValidationError
+from .config import config
+from .admission import AdmissionController, Overloaded
+from .batching import MicroBatcher
+from .cache import ResultCache
+from .metrics import Metrics, UNKNOWN_TOOL
+from .discovery import LazyCallable, discover_tools, tool_sources
+from .process_pool import ProcessToolPool
+from .serialization import ENCODERS, JSON_MEDIA_TYPE
+from .tracing import current_trace
+from .schemas.tool_schema import ToolRequest, ToolResponse, ErrorResponse
+
+@functools.lru_cache(maxsize=None)
+def model_json_schema(request_model: Type[ToolRequest]) -> Dict[str, Any]:
+    """JSON Schema of a request model, generated once per model class"""
+    return request_model.model_json_schema()
 
 class ToolNotFoundError(Exception):
     """Raised when a requested tool is not found"""
@@ -13,103 +37,1154 @@ class ToolExecutionError(Exception):
     """Raised when tool execution fails"""
     pass
 
+class ToolSnapshot:
+    """
+    One immutable version of the registered tools
+
+    The registry never changes a published snapshot: registering, removing
+    or reloading tools builds a new one and swaps it in with a single
+    assignment. A call looks its tool up in the snapshot current when it
+    starts and keeps that tool's metadata until it finishes. The encoded
+    catalog is built at most once per snapshot.
+    """
+
+    __slots__ = ("version", "tools", "_catalogs")
+
+    def __init__(self, tools: Dict[str, Dict[str, Any]], version: int):
+        self.version = version
+        self.tools = MappingProxyType(dict(tools))
+        self._catalogs: Dict[str, Tuple[bytes, str]] = {}
+
+    def catalog(self, media_type: str = JSON_MEDIA_TYPE) -> Tuple[bytes, str]:
+        """Encoded catalog of these tools and its strong ETag"""
+        catalog = self._catalogs.get(media_type)
+        if catalog is None:
+            tools = {}
+            for name, tool in self.tools.items():
+                entry = {
+                    "description": tool["description"],
+                    "parameters": model_json_schema(tool["request_model"])
+                }
+                if tool.get("deterministic"):
+                    # Same input, same result: clients and gateways may cache or shard by arguments
+                    entry["deterministic"] = True
+                tools[name] = entry
+            body = ENCODERS[media_type]({"success": True, "tools": tools, "count": len(tools)})
+            catalog = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+            self._catalogs[media_type] = catalog
+        return catalog
+
 class ToolRegistry:
     """Registry for managing MCP tools"""
-    
-    def __init__(self):
-        self._tools: Dict[str, Dict[str, Any]] = {}
+
+    def __init__(self, packages: Optional[List[str]] = None, entry_point_group: Optional[str] = None):
+        # Current tools; readers take it without locking, writers swap it under _swap_lock
+        self._snapshot = ToolSnapshot({}, 0)
+        self._swap_lock = threading.Lock()
+        # Tools registered in code rather than found by discovery; reloads keep them
+        self._registered: set = set()
+        # Called with every snapshot published after they are added
+        self._listeners: List[Callable[[ToolSnapshot], None]] = []
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._executor_lock = threading.Lock()
+        # Worker processes for tools registered with "executor": "process"
+        self._process_pool: Optional[ProcessToolPool] = None
+        # Results of deterministic tools, plus the calls currently computing one
+        self._cache = ResultCache(config.RESULT_CACHE_MAX_ENTRIES, config.RESULT_CACHE_TTL_SECONDS)
+        self._inflight: Dict[Tuple[str, str], list] = {}
+        # Open micro-batches of tools registered with "micro_batch": True
+        self._batchers: Dict[str, MicroBatcher] = {}
+        self.metrics = Metrics(enabled=config.METRICS_ENABLED, directory=config.METRICS_DIR)
+        # Concurrency limits, global and per tool ("max_concurrency" metadata)
+        self.admission = AdmissionController(config.MAX_CONCURRENT_CALLS, config.MAX_QUEUED_CALLS)
+        self.metrics.add_collector(self._admission_samples)
+        self._packages = packages if packages is not None else config.TOOL_PACKAGES
+        self._entry_point_group = entry_point_group if entry_point_group is not None else config.TOOL_ENTRY_POINT_GROUP
         self._register_tools()
-    
+
     def _register_tools(self):
-        """Register all available tools with their metadata"""
-        
-        # Register add_numbers tool
-        self._tools["add_numbers"] = {
-            "function": add_numbers,
-            "request_model": AddNumbersRequest,
-            "description": "Adds two integers together",
-            "parameters": {
-                "a": {"type": "integer", "description": "First number"},
-                "b": {"type": "integer", "description": "Second number"}
-            }
+        """
+        Register every tool found by discovery
+
+        Tools are ``@tool`` functions in the configured packages and in modules
+        advertised under the entry point group. Metadata and request models are
+        loaded now; each implementation module is imported on the tool's first
+        call (or by ``warm_up``).
+        """
+        with self._swap_lock:
+            self._publish(self._discover())
+
+    def _discover(self) -> Dict[str, Dict[str, Any]]:
+        """Metadata of every tool found by discovery, by name"""
+        tools = {}
+        for spec in discover_tools(self._packages, self._entry_point_group):
+            flags = {key: spec[key] for key in ("is_async", "streaming") if spec[key] is not None}
+            if spec["batch_function"] is not None:
+                flags["batch_function"] = spec["batch_function"]
+            tools[spec["name"]] = self._build_tool(
+                spec["name"],
+                function=spec["function"],
+                request_model=spec["request_model"],
+                description=spec["description"],
+                parameters=spec["parameters"],
+                module=spec["module"],
+                **flags,
+                **spec["options"]
+            )
+        return tools
+
+    def sources(self) -> List[str]:
+        """Source files of the configured tool packages, as watched for hot reload"""
+        return tool_sources(self._packages, self._entry_point_group)
+
+    @property
+    def snapshot(self) -> ToolSnapshot:
+        """The current version of the tools"""
+        return self._snapshot
+
+    def _publish(self, tools: Dict[str, Dict[str, Any]], prebuild: bool = False) -> ToolSnapshot:
+        """
+        Swap in a new snapshot of ``tools`` (the caller holds _swap_lock)
+
+        Admission limits follow the new tools. With ``prebuild`` the catalogs
+        are encoded before the swap, so no request pays for them.
+        """
+        previous = self._snapshot
+        for name, tool in tools.items():
+            self.admission.configure_tool(
+                name, tool.get("max_concurrency"), tool.get("max_queue", config.TOOL_MAX_QUEUE)
+            )
+        for name in previous.tools.keys() - tools.keys():
+            self.admission.configure_tool(name, None, 0)
+
+        snapshot = ToolSnapshot(tools, previous.version + 1)
+        if prebuild:
+            for media_type in ENCODERS:
+                snapshot.catalog(media_type)
+        self._snapshot = snapshot
+        for listener in self._listeners:
+            listener(snapshot)
+        return snapshot
+
+    def on_publish(self, listener: Callable[[ToolSnapshot], None]):
+        """
+        Call ``listener`` with each new snapshot right after it is swapped in
+
+        Listeners run under the swap lock, so they see snapshots one at a time
+        and in order.
+        """
+        with self._swap_lock:
+            self._listeners.append(listener)
+
+    def register_tool(
+        self,
+        name: str,
+        function: Callable,
+        request_model: Type[ToolRequest],
+        description: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        **options: Any
+    ) -> Dict[str, Any]:
+        """
+        Register a tool with its metadata
+
+        Args:
+            name: Name the tool is called by
+            function: Tool implementation: a plain or ``async def`` function, or a
+                sync or async generator yielding result chunks
+            request_model: Pydantic model used to validate the tool's input
+            description: Human readable description of the tool
+            parameters: Parameter descriptions shown to clients, derived from the
+                request model when omitted
+            **options: Optional metadata such as ``batch_function``, ``max_workers``,
+                ``deterministic`` (same input always gives the same result,
+                so results may be cached and identical concurrent calls shared)
+                ``max_concurrency`` and ``max_queue`` (admission limits),
+                ``timeout`` (seconds a call may take, overriding TOOL_TIMEOUT),
+                ``micro_batch`` (gather concurrent calls into batches for
+                ``batch_function``, tuned by ``batch_window_ms`` and
+                ``batch_max_size``) or ``executor`` ("thread", the default, or "process" to run a
+                CPU-bound synchronous tool on the process pool)
+
+        Returns:
+            The stored tool metadata
+        """
+        tool = self._build_tool(name, function, request_model, description, parameters, **options)
+        with self._swap_lock:
+            tools = dict(self._snapshot.tools)
+            tools[name] = tool
+            self._registered.add(name)
+            self._publish(tools)
+        return tool
+
+    def _build_tool(
+        self,
+        name: str,
+        function: Callable,
+        request_model: Type[ToolRequest],
+        description: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        **options: Any
+    ) -> Dict[str, Any]:
+        """Check a tool's options and build its metadata, compiling its validator"""
+        if parameters is None:
+            parameters = model_json_schema(request_model).get("properties", {})
+
+        executor = options.get("executor", "thread")
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor '{executor}' for tool '{name}'")
+        if executor == "process" and (
+            inspect.iscoroutinefunction(function) or inspect.isgeneratorfunction(function)
+            or inspect.isasyncgenfunction(function)
+        ):
+            raise ValueError(f"Tool '{name}' must be a plain function to run on the process pool")
+        if options.get("micro_batch") and options.get("batch_function") is None:
+            raise ValueError(f"Tool '{name}' needs a batch_function to be micro-batched")
+
+        tool = {
+            "function": function,
+            "request_model": request_model,
+            # Validator compiled once here and reused for every call
+            "validator": TypeAdapter(request_model),
+            "description": description,
+            "parameters": parameters,
+            "is_async": inspect.iscoroutinefunction(function) or inspect.isasyncgenfunction(function),
+            # Generator tools produce their result as a sequence of chunks
+            "streaming": inspect.isgeneratorfunction(function) or inspect.isasyncgenfunction(function),
+            **options
         }
-        
-        # Register dummy_tool
-        self._tools["dummy_tool"] = {
-            "function": dummy_tool,
-            "request_model": DummyToolRequest,
-            "description": "A dummy tool for testing server functionality",
-            "parameters": {}
+        if tool["is_async"] and (options.get("batch_function") is not None or options.get("micro_batch")):
+            # Batches run on worker threads, which cannot await async tools
+            raise ValueError(f"Tool '{name}' is async and cannot have a batch_function or be micro-batched")
+        return tool
+
+    def unregister_tool(self, name: str) -> bool:
+        """Remove a tool; returns False if it was not registered"""
+        with self._swap_lock:
+            self._registered.discard(name)
+            if name not in self._snapshot.tools:
+                return False
+            tools = dict(self._snapshot.tools)
+            del tools[name]
+            self._publish(tools)
+        return True
+
+    def reload(self) -> Dict[str, Any]:
+        """
+        Rediscover the tools and atomically swap in the new set
+
+        Tool modules that are already imported are re-executed first, so
+        code changes take effect. Everything is built (validators, catalogs
+        and, with TOOL_WARMUP, imports) before the swap; if any step fails
+        the current tools stay in place. Calls already running finish with
+        the version they started with, and tools registered in code are
+        carried over. Cached results are dropped and process pool workers
+        are replaced once their current calls finish.
+
+        Returns:
+            The new version, the tools added and removed, and the tool count
+        """
+        with self._swap_lock:
+            previous = self._snapshot
+            importlib.invalidate_caches()
+            modules = {
+                tool.get("module") for name, tool in previous.tools.items() if name not in self._registered
+            }
+            for module in sorted(module for module in modules if module in sys.modules):
+                source = getattr(sys.modules[module], "__file__", None)
+                if source and not os.path.exists(source):
+                    # Deleted: forget it rather than fail to re-execute it
+                    del sys.modules[module]
+                else:
+                    importlib.reload(sys.modules[module])
+
+            tools = self._discover()
+            for name in self._registered:
+                tools[name] = previous.tools[name]
+            if config.TOOL_WARMUP:
+                self._import_tools(tools.values())
+            snapshot = self._publish(tools, prebuild=True)
+
+            self._cache.clear()
+            with self._executor_lock:
+                pool, self._process_pool = self._process_pool, None
+        if pool is not None:
+            # Running and queued calls complete on the old workers
+            pool.shutdown(wait=False, cancel_futures=False)
+            self.start_process_pool()
+
+        return {
+            "version": snapshot.version,
+            "added": sorted(snapshot.tools.keys() - previous.tools.keys()),
+            "removed": sorted(previous.tools.keys() - snapshot.tools.keys()),
+            "count": len(snapshot.tools)
         }
-    
+
     def get_tool(self, tool_name: str) -> Dict[str, Any]:
         """Get tool metadata by name"""
-        return self._tools.get(tool_name)
-    
+        return self._snapshot.tools.get(tool_name)
+
     def list_tools(self) -> Dict[str, Dict[str, Any]]:
         """Get all registered tools"""
-        return self._tools.copy()
-    
+        return dict(self._snapshot.tools)
+
+    def catalog(self, media_type: str = JSON_MEDIA_TYPE) -> Tuple[bytes, str]:
+        """
+        Get the tool catalog served by ``GET /tools``, already encoded
+
+        Each tool is listed with its description and the JSON Schema of its
+        request model. The bytes and their strong ETag are built once per
+        media type and snapshot, and reused until the tools change.
+
+        Args:
+            media_type: JSON_MEDIA_TYPE or MSGPACK_MEDIA_TYPE
+
+        Returns:
+            (encoded bytes, quoted ETag)
+        """
+        return self._snapshot.catalog(media_type)
+
     def tool_exists(self, tool_name: str) -> bool:
         """Check if a tool exists in the registry"""
-        return tool_name in self._tools
-    
-    def execute_tool(self, tool_name: str, request_data: dict) -> Union[ToolResponse, ErrorResponse]:
+        return tool_name in self._snapshot.tools
+
+    def warm_up(self, background: bool = False) -> Optional[threading.Thread]:
         """
-        Execute a tool with the given request data
-        
+        Import every lazily loaded tool implementation ahead of its first call
+
         Args:
-            tool_name: Name of the tool to execute
-            request_data: Dictionary containing tool parameters
-            
+            background: Import on a daemon thread instead of blocking the caller
+
         Returns:
-            ToolResponse on success, ErrorResponse on failure
+            The warm-up thread when running in the background
         """
-        # Check if tool exists
-        if not self.tool_exists(tool_name):
+        if background:
+            thread = threading.Thread(target=self.warm_up, name="tool-warm-up", daemon=True)
+            thread.start()
+            return thread
+
+        self._import_tools(self._snapshot.tools.values())
+        return None
+
+    @staticmethod
+    def _import_tools(tools):
+        """Resolve the lazily loaded functions of some tools"""
+        for tool in tools:
+            for key in ("function", "batch_function"):
+                function = tool.get(key)
+                if isinstance(function, LazyCallable):
+                    try:
+                        function.resolve()
+                    except Exception:
+                        # Left for the first call to report as EXECUTION_ERROR
+                        pass
+
+    def get_executor(self, tool_name: str) -> ThreadPoolExecutor:
+        """
+        Get the thread pool a synchronous tool runs on
+
+        Tools that set ``max_workers`` in their metadata get a dedicated pool of
+        that size, so a slow tool cannot starve the others. All remaining tools
+        share a pool sized by ``TOOL_THREAD_POOL_SIZE``.
+        """
+        tool = self.get_tool(tool_name) or {}
+        max_workers = tool.get("max_workers")
+        key = tool_name if max_workers else "__default__"
+
+        executor = self._executors.get(key)
+        if executor is None:
+            with self._executor_lock:
+                executor = self._executors.get(key)
+                if executor is None:
+                    executor = ThreadPoolExecutor(
+                        max_workers=max_workers or config.TOOL_THREAD_POOL_SIZE,
+                        thread_name_prefix=f"tool-{key}"
+                    )
+                    self._executors[key] = executor
+        return executor
+
+    def get_process_pool(self) -> ProcessToolPool:
+        """
+        Get the process pool CPU-bound tools run on, creating it if needed
+
+        Its workers import the modules of every tool registered with
+        ``"executor": "process"`` as they start.
+        """
+        pool = self._process_pool
+        if pool is None:
+            with self._executor_lock:
+                pool = self._process_pool
+                if pool is None:
+                    modules = {
+                        tool.get("module") or getattr(tool["function"], "__module__", None)
+                        for tool in self._snapshot.tools.values() if tool.get("executor") == "process"
+                    }
+                    pool = ProcessToolPool(
+                        max_workers=config.PROCESS_POOL_SIZE,
+                        modules=sorted(module for module in modules if module),
+                        start_method=config.PROCESS_POOL_START_METHOD,
+                        shm_threshold=config.SHARED_MEMORY_THRESHOLD
+                    )
+                    self._process_pool = pool
+        return pool
+
+    def start_process_pool(self) -> Optional[ProcessToolPool]:
+        """Start the process pool's workers now if any tool uses it; returns the pool"""
+        if not any(tool.get("executor") == "process" for tool in self._snapshot.tools.values()):
+            return None
+        pool = self.get_process_pool()
+        pool.start()
+        return pool
+
+    def shutdown(self, wait: bool = True):
+        """Shut down the thread pools used for synchronous tools and the process pool"""
+        with self._executor_lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+            pool, self._process_pool = self._process_pool, None
+        for executor in executors:
+            executor.shutdown(wait=wait)
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters of the deterministic-tool result cache"""
+        return self._cache.stats()
+
+    def admission_stats(self) -> Dict[str, Any]:
+        """Load, queue depth and rejection counts of every admission limit"""
+        return self.admission.stats()
+
+    def _admission_samples(self):
+        """Admission gauges and counters for the metrics endpoint"""
+        for scope, limiter in self.admission.limiters().items():
+            yield "mcp_admission_active", (scope,), limiter.active
+            yield "mcp_admission_queued", (scope,), limiter.queued
+            yield "mcp_admission_rejected_total", (scope,), limiter.rejected
+
+    def clear_cache(self):
+        """Drop every cached tool result"""
+        self._cache.clear()
+
+    def _cache_key(self, tool_name: str, tool: Dict[str, Any], request_obj: ToolRequest) -> Optional[Tuple[str, str]]:
+        """
+        Cache key for a validated call, or None if the call is not cacheable
+
+        Keys use the validated model rather than the raw input, so requests that
+        differ only in key order, extra fields or coercible types share an entry.
+        """
+        if not tool.get("deterministic") or tool["streaming"] or not self._cache.enabled:
+            return None
+        arguments = request_obj.model_dump(mode="json")
+        return tool_name, json.dumps(arguments, sort_keys=True, separators=(",", ":"))
+
+    def _tool_not_found(self, tool_name: str) -> ErrorResponse:
+        """Build the error returned for an unknown tool name"""
+        return ErrorResponse(
+            error=f"Tool '{tool_name}' not found",
+            error_type="TOOL_NOT_FOUND",
+            details={"available_tools": list(self._snapshot.tools.keys())}
+        )
+
+    def _validation_error(self, tool: Dict[str, Any], error: ValidationError) -> ErrorResponse:
+        """Build the error returned when request data fails schema validation"""
+        return ErrorResponse(
+            error="Invalid input parameters",
+            error_type="VALIDATION_ERROR",
+            details={
+                "validation_errors": [
+                    {"field": err["loc"][-1] if err["loc"] else "__root__", "message": err["msg"]}
+                    for err in error.errors()
+                ],
+                "expected_parameters": tool["parameters"]
+            }
+        )
+
+    def _check_result(self, tool_name: str, result: Any) -> Union[ToolResponse, ErrorResponse]:
+        """Ensure a tool returned a ToolResponse"""
+        if not isinstance(result, ToolResponse):
             return ErrorResponse(
-                error=f"Tool '{tool_name}' not found",
-                error_type="TOOL_NOT_FOUND",
-                details={"available_tools": list(self._tools.keys())}
+                error="Tool returned invalid response format",
+                error_type="INVALID_RESPONSE",
+                details={"tool_name": tool_name}
             )
-        
+        return result
+
+    def _execution_error(self, tool_name: str, error: Exception) -> ErrorResponse:
+        """Build the error returned when a tool raises"""
+        return ErrorResponse(
+            error=f"Tool execution failed: {str(error)}",
+            error_type="EXECUTION_ERROR",
+            details={"tool_name": tool_name}
+        )
+
+    def _overloaded(self, tool_name: str, error: Overloaded) -> ErrorResponse:
+        """Error for a call shed by admission control"""
+        return ErrorResponse(
+            error=f"Tool '{tool_name}' is overloaded, retry later",
+            error_type="OVERLOADED",
+            details={
+                "scope": error.scope,
+                "max_concurrency": error.max_concurrency,
+                "max_queue": error.max_queue,
+                "retry_after": config.OVERLOAD_RETRY_AFTER
+            }
+        )
+
+    def _timed_out(self, tool_name: str, timeout: float) -> ErrorResponse:
+        """Error for a call that missed its deadline"""
+        return ErrorResponse(
+            error=f"Tool '{tool_name}' did not finish within {timeout:g} seconds",
+            error_type="TIMEOUT",
+            details={"timeout": timeout}
+        )
+
+    def _cancelled(self, tool_name: str) -> ErrorResponse:
+        """Error for a call abandoned by its caller"""
+        return ErrorResponse(
+            error=f"Call to tool '{tool_name}' was cancelled",
+            error_type="CANCELLED"
+        )
+
+    @staticmethod
+    def _timeout(tool: Dict[str, Any], timeout: Optional[float]) -> Optional[float]:
+        """
+        Effective time limit of a call in seconds, or None for no limit
+
+        The tool's ``timeout`` metadata (or TOOL_TIMEOUT) is the default; a
+        caller-supplied timeout can only shorten it.
+        """
+        limit = tool.get("timeout", config.TOOL_TIMEOUT) or None
+        if timeout is None:
+            return limit
+        return timeout if limit is None else min(limit, timeout)
+
+    async def _admit(self, tool_name: str) -> Union[tuple, ErrorResponse]:
+        """Wait for admission; returns a permit, or an OVERLOADED error if shed"""
+        start = time.perf_counter()
+        try:
+            permit = await self.admission.acquire(tool_name)
+        except Overloaded as e:
+            return self._overloaded(tool_name, e)
+        if permit:
+            waited = time.perf_counter() - start
+            self.metrics.record_phase(tool_name, "queue", waited)
+            trace = current_trace()
+            if trace is not None:
+                trace.add_phase("queue", waited)
+        return permit
+
+    def _validate(self, tool_name: str, request_data: dict) -> Tuple[Optional[Dict[str, Any]], Any]:
+        """
+        Look up a tool and validate request data against its schema
+
+        Returns:
+            (tool, request object) on success, (None, ErrorResponse) on failure
+        """
+        # Check if tool exists
         tool = self.get_tool(tool_name)
-        
+        if tool is None:
+            return None, self._tool_not_found(tool_name)
+
         try:
             # Validate request data against tool's schema
-            request_obj = tool["request_model"](**request_data)
-            
+            return tool, tool["validator"].validate_python(request_data)
+        except ValidationError as e:
+            return None, self._validation_error(tool, e)
+        except Exception as e:
+            return None, self._execution_error(tool_name, e)
+
+    def _validate_json(self, tool_name: str, raw_body: bytes) -> Tuple[Optional[Dict[str, Any]], Any]:
+        """
+        Look up a tool and validate a raw JSON body straight into its request model
+
+        The bytes are parsed and validated in one pass by the tool's compiled
+        validator, without building an intermediate dict. An empty body is
+        treated as an empty object.
+
+        Returns:
+            (tool, request object) on success, (None, ErrorResponse) on failure
+        """
+        tool = self.get_tool(tool_name)
+        if tool is None:
+            return None, self._tool_not_found(tool_name)
+
+        try:
+            return tool, tool["validator"].validate_json(raw_body or b"{}")
+        except ValidationError as e:
+            return None, self._validation_error(tool, e)
+        except Exception as e:
+            return None, self._execution_error(tool_name, e)
+
+    def execute_tool(self, tool_name: str, request_data: dict, timeout: Optional[float] = None) -> Union[ToolResponse, ErrorResponse]:
+        """
+        Execute a tool with the given request data
+
+        Runs the tool on the calling thread. ``async def`` tools are driven to
+        completion with their own event loop, so this must not be called from
+        inside a running loop; use ``execute_tool_async`` there instead.
+
+        A call with a time limit runs on the tool's thread pool instead, and
+        the caller stops waiting when the limit passes. A call still queued
+        for a pool thread by then is dropped; one already running cannot be
+        interrupted and finishes in the background.
+
+        Args:
+            tool_name: Name of the tool to execute
+            request_data: Dictionary containing tool parameters
+            timeout: Seconds the caller is willing to wait (can only shorten
+                the tool's own timeout)
+
+        Returns:
+            ToolResponse on success, ErrorResponse on failure
+        """
+        start = time.perf_counter()
+        tool, request_obj = self._validate(tool_name, request_data)
+        validated = time.perf_counter()
+        if tool is None:
+            self._record(tool_name, request_obj, validated - start)
+            return request_obj
+
+        cache_key = self._cache_key(tool_name, tool, request_obj)
+        result = self._cache.get(cache_key) if cache_key is not None else None
+        if result is None:
+            timeout = self._timeout(tool, timeout)
+            if timeout is None:
+                result = self._run_sync(tool_name, tool, request_obj)
+            else:
+                future = self.get_executor(tool_name).submit(self._run_sync, tool_name, tool, request_obj)
+                try:
+                    result = future.result(max(0.0, timeout - (time.perf_counter() - start)))
+                except FutureTimeoutError:
+                    future.cancel()
+                    result = self._timed_out(tool_name, timeout)
+            if cache_key is not None and isinstance(result, ToolResponse):
+                self._cache.set(cache_key, result)
+
+        self._record(tool_name, result, validated - start, time.perf_counter() - validated)
+        return result
+
+    def _run_sync(self, tool_name: str, tool: Dict[str, Any], request_obj: ToolRequest) -> Union[ToolResponse, ErrorResponse]:
+        """Run a validated request on the calling thread"""
+        try:
             # Execute the tool function
-            result = tool["function"](request_obj)
-            
+            if tool["streaming"] and tool["is_async"]:
+                result = self._collected(asyncio.run(self._collect(tool["function"](request_obj))))
+            elif tool["streaming"]:
+                result = self._collected(list(tool["function"](request_obj)))
+            elif tool["is_async"]:
+                result = asyncio.run(tool["function"](request_obj))
+            elif tool.get("executor") == "process":
+                result = self.get_process_pool().submit(tool["function"], request_obj).result()
+            else:
+                result = tool["function"](request_obj)
+
             # Ensure result is a ToolResponse
-            if not isinstance(result, ToolResponse):
-                return ErrorResponse(
-                    error="Tool returned invalid response format",
-                    error_type="INVALID_RESPONSE",
-                    details={"tool_name": tool_name}
-                )
-            
-            return result
-            
-        except ValidationError as e:
-            return ErrorResponse(
-                error="Invalid input parameters",
-                error_type="VALIDATION_ERROR",
-                details={
-                    "validation_errors": [
-                        {"field": err["loc"][-1], "message": err["msg"]} 
-                        for err in e.errors()
-                    ],
-                    "expected_parameters": tool["parameters"]
-                }
+            return self._check_result(tool_name, result)
+
+        except Exception as e:
+            return self._execution_error(tool_name, e)
+
+    async def execute_tool_async(self, tool_name: str, request_data: dict, timeout: Optional[float] = None) -> Union[ToolResponse, ErrorResponse]:
+        """
+        Execute a tool without blocking the event loop
+
+        ``async def`` tools are awaited directly. Synchronous tools run on the
+        tool's thread pool (see ``get_executor``) while the loop keeps serving
+        other requests.
+
+        When the call's time limit passes (measured from this call, queueing
+        included) a TIMEOUT error is returned at once: ``async def`` tools are
+        cancelled, and work on the thread pool is dropped if it has not
+        started or otherwise left to finish unobserved. Either way the call's
+        admission slot is freed immediately. Cancelling the awaiting task
+        cancels the tool the same way.
+
+        Args:
+            tool_name: Name of the tool to execute
+            request_data: Dictionary containing tool parameters
+            timeout: Seconds the caller is willing to wait (can only shorten
+                the tool's own timeout)
+
+        Returns:
+            ToolResponse on success, ErrorResponse on failure
+        """
+        start = time.perf_counter()
+        tool, request_obj = self._validate(tool_name, request_data)
+        return await self._execute_validated(tool_name, tool, request_obj, start, timeout)
+
+    async def execute_tool_json(self, tool_name: str, raw_body: bytes, timeout: Optional[float] = None) -> Union[ToolResponse, ErrorResponse]:
+        """
+        Execute a tool from a raw JSON request body
+
+        Same as ``execute_tool_async`` but skips the intermediate dict: the
+        body is validated directly into the tool's request model. Validation
+        errors have the same format as on the dict path.
+
+        Args:
+            tool_name: Name of the tool to execute
+            raw_body: JSON-encoded tool parameters as received
+            timeout: Seconds the caller is willing to wait
+
+        Returns:
+            ToolResponse on success, ErrorResponse on failure
+        """
+        start = time.perf_counter()
+        tool, request_obj = self._validate_json(tool_name, raw_body)
+        return await self._execute_validated(tool_name, tool, request_obj, start, timeout)
+
+    async def _execute_validated(self, tool_name: str, tool: Optional[Dict[str, Any]], request_obj: Any, start: float, timeout: Optional[float] = None) -> Union[ToolResponse, ErrorResponse]:
+        """Execute the outcome of a validation step within its time limit and record its metrics"""
+        validated = time.perf_counter()
+        if tool is None:
+            self._record(tool_name, request_obj, validated - start)
+            return request_obj
+
+        timeout = self._timeout(tool, timeout)
+        try:
+            if timeout is None:
+                result = await self._execute_async(tool_name, tool, request_obj)
+            else:
+                remaining = max(0.0, timeout - (validated - start))
+                result = await asyncio.wait_for(self._execute_async(tool_name, tool, request_obj), remaining)
+        except asyncio.TimeoutError:
+            result = self._timed_out(tool_name, timeout)
+        except asyncio.CancelledError:
+            self._record(tool_name, self._cancelled(tool_name), validated - start, time.perf_counter() - validated)
+            raise
+
+        self._record(tool_name, result, validated - start, time.perf_counter() - validated)
+        return result
+
+    def _record(self, tool_name: str, result: Union[ToolResponse, ErrorResponse], validation_seconds: Optional[float] = None, execution_seconds: Optional[float] = None):
+        """Record phase timings and the outcome of one tool call"""
+        trace = current_trace()
+        if trace is not None:
+            # Both phases have just ended, execution after validation
+            end = time.perf_counter()
+            if validation_seconds is not None:
+                trace.add_phase("validation", validation_seconds, end - (execution_seconds or 0.0))
+            if execution_seconds is not None:
+                trace.add_phase("execution", execution_seconds, end)
+        
+        metrics = self.metrics
+        if not metrics.enabled:
+            return
+        if result.error_type == "TOOL_NOT_FOUND":
+            tool_name = UNKNOWN_TOOL
+        if validation_seconds is not None:
+            metrics.record_phase(tool_name, "validation", validation_seconds)
+        if execution_seconds is not None:
+            metrics.record_phase(tool_name, "execution", execution_seconds)
+        metrics.record_call(tool_name, result.error_type or ("success" if result.success else "failure"))
+
+    async def _execute_async(self, tool_name: str, tool: Dict[str, Any], request_obj: ToolRequest) -> Union[ToolResponse, ErrorResponse]:
+        """
+        Run a validated request, serving deterministic tools from the result cache
+
+        Identical concurrent calls to a deterministic tool are collapsed into a
+        single execution (single-flight): later callers wait on the call
+        already in progress instead of starting their own. The execution is
+        cancelled, freeing its admission slot, once every caller waiting on it
+        has timed out or been cancelled.
+        """
+        cache_key = self._cache_key(tool_name, tool, request_obj)
+        if cache_key is None:
+            return await self._run_call(tool_name, tool, request_obj)
+
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        # [shared task, number of callers waiting on it]
+        entry = self._inflight.get(cache_key)
+        if entry is not None and entry[0].get_loop() is loop:
+            self._cache.record_coalesced()
+        else:
+            task = loop.create_task(self._run_call(tool_name, tool, request_obj))
+            entry = self._inflight[cache_key] = [task, 0]
+            task.add_done_callback(lambda done: self._finish_inflight(cache_key, done))
+
+        task = entry[0]
+        entry[1] += 1
+        try:
+            # Shield the shared execution so one caller giving up does not cancel it for the rest
+            return await asyncio.shield(task)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and not task.done():
+                # The last caller gave up: stop the execution; later calls start their own
+                if self._inflight.get(cache_key) is entry:
+                    del self._inflight[cache_key]
+                task.cancel()
+                await asyncio.wait((task,))
+
+    def _finish_inflight(self, cache_key: Tuple[str, str], task: asyncio.Task):
+        """Cache the outcome of a single-flight execution and stop sharing it"""
+        entry = self._inflight.get(cache_key)
+        if entry is not None and entry[0] is task:
+            del self._inflight[cache_key]
+        if not task.cancelled() and isinstance(task.result(), ToolResponse):
+            self._cache.set(cache_key, task.result())
+
+    def _run_call(self, tool_name: str, tool: Dict[str, Any], request_obj: ToolRequest) -> Awaitable[Union[ToolResponse, ErrorResponse]]:
+        """Run a validated request on its own, or in a micro-batch if the tool opts in"""
+        if not tool.get("micro_batch"):
+            return self._run_admitted(tool_name, tool, request_obj)
+
+        loop = asyncio.get_running_loop()
+        batcher = self._batchers.get(tool_name)
+        if batcher is None or batcher.tool is not tool or batcher.loop is not loop:
+            # A reloaded tool starts new batches; its old ones still finish on the old code
+            batcher = MicroBatcher(
+                tool,
+                functools.partial(self._run_batch_admitted, tool_name, tool, record=False),
+                tool.get("batch_window_ms", config.MICRO_BATCH_WINDOW_MS) / 1000,
+                tool.get("batch_max_size", config.MICRO_BATCH_MAX_SIZE)
             )
+            self._batchers[tool_name] = batcher
+        return batcher.submit(request_obj)
+
+    async def _run_admitted(self, tool_name: str, tool: Dict[str, Any], request_obj: ToolRequest) -> Union[ToolResponse, ErrorResponse]:
+        """Run a validated request once admission control lets it in"""
+        permit = await self._admit(tool_name)
+        if isinstance(permit, ErrorResponse):
+            return permit
+        try:
+            return await self._run_async(tool_name, tool, request_obj)
+        finally:
+            self.admission.release(permit)
+
+    async def _run_async(self, tool_name: str, tool: Dict[str, Any], request_obj: ToolRequest) -> Union[ToolResponse, ErrorResponse]:
+        """Run a validated request on the event loop, the tool's thread pool or the process pool"""
+        try:
+            if tool["streaming"]:
+                result = self._collected(await self._collect(self._iter_chunks(tool_name, tool, request_obj)))
+            elif tool["is_async"]:
+                result = await tool["function"](request_obj)
+            elif tool.get("executor") == "process":
+                result = await self.get_process_pool().run(tool["function"], request_obj)
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    self.get_executor(tool_name), tool["function"], request_obj
+                )
+
+            return self._check_result(tool_name, result)
+
         except Exception as e:
-            return ErrorResponse(
-                error=f"Tool execution failed: {str(e)}",
-                error_type="EXECUTION_ERROR",
-                details={"tool_name": tool_name}
+            return self._execution_error(tool_name, e)
+
+    def is_streaming(self, tool_name: str) -> bool:
+        """Check if a tool produces its result as a stream of chunks"""
+        tool = self.get_tool(tool_name)
+        return tool is not None and tool["streaming"]
+
+    async def stream_tool_json(self, tool_name: str, raw_body: bytes, timeout: Optional[float] = None) -> Union[AsyncIterator[Tuple[str, Any]], ErrorResponse]:
+        """
+        Start a streaming call to a generator tool from a raw JSON body
+
+        Lookup, validation and admission happen up front, so those errors are
+        returned as an ErrorResponse before anything is streamed. Otherwise the returned
+        iterator yields ``("chunk", value)`` for every chunk as the tool produces
+        it, followed by exactly one ``("summary", response)`` frame: a
+        ToolResponse on success, or an EXECUTION_ERROR or TIMEOUT ErrorResponse
+        if the tool failed or ran out of time part way through. The iterator
+        holds the admission slot until it finishes or is closed with
+        ``aclose()``, even if it is never read.
+
+        Args:
+            tool_name: Name of the tool to execute
+            raw_body: JSON-encoded tool parameters as received
+            timeout: Seconds the whole stream may take
+
+        Returns:
+            Frame iterator, or ErrorResponse if the call cannot start
+        """
+        start = time.perf_counter()
+        tool, request_obj = self._validate_json(tool_name, raw_body)
+        if tool is None:
+            self._record(tool_name, request_obj, time.perf_counter() - start)
+            return request_obj
+        validation_seconds = time.perf_counter() - start
+        self.metrics.record_phase(tool_name, "validation", validation_seconds)
+        trace = current_trace()
+        if trace is not None:
+            trace.add_phase("validation", validation_seconds)
+
+        timeout = self._timeout(tool, timeout)
+        deadline = None if timeout is None else start + timeout
+        frames = self._stream_frames(tool_name, tool, request_obj, deadline, timeout)
+        # The first frame reports admission; from then on closing the frames frees the slot
+        kind, shed = await frames.__anext__()
+        if kind == "error":
+            await frames.aclose()
+            return shed
+        return frames
+
+    async def _stream_frames(self, tool_name: str, tool: Dict[str, Any], request_obj: ToolRequest, deadline: Optional[float] = None, timeout: Optional[float] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Wait for admission, then yield chunk frames followed by a summary frame
+
+        The first frame is ``("admitted", None)``, or ``("error", response)`` if
+        the call was shed. The permit is taken inside the generator, so once
+        the first frame is out, ``aclose()`` releases it whether or not any
+        chunk was read (closing a generator that never started runs nothing).
+        """
+        permit = await self._admit(tool_name)
+        if isinstance(permit, ErrorResponse):
+            self._record(tool_name, permit)
+            yield "error", permit
+            return
+
+        start = time.perf_counter()
+        count = 0
+        chunks = self._iter_chunks(tool_name, tool, request_obj)
+        try:
+            yield "admitted", None
+            while True:
+                try:
+                    if deadline is None:
+                        chunk = await chunks.__anext__()
+                    else:
+                        remaining = max(0.0, deadline - time.perf_counter())
+                        chunk = await asyncio.wait_for(chunks.__anext__(), remaining)
+                except StopAsyncIteration:
+                    break
+                count += 1
+                yield "chunk", chunk
+        except asyncio.TimeoutError:
+            summary = self._timed_out(tool_name, timeout)
+        except Exception as e:
+            summary = self._execution_error(tool_name, e)
+        else:
+            summary = ToolResponse(
+                success=True,
+                result={"chunks": count},
+                message=f"Streamed {count} chunks"
             )
+        finally:
+            # Also runs when the client goes away mid-stream and the frames are closed
+            self.admission.release(permit)
+            await chunks.aclose()
+
+        # Execution time of a stream includes the time spent sending it
+        self._record(tool_name, summary, execution_seconds=time.perf_counter() - start)
+        yield "summary", summary
+
+    async def _iter_chunks(self, tool_name: str, tool: Dict[str, Any], request_obj: ToolRequest) -> AsyncIterator[Any]:
+        """Iterate a generator tool without blocking the event loop"""
+        if tool["is_async"]:
+            async for chunk in tool["function"](request_obj):
+                yield chunk
+            return
+
+        # Advance synchronous generators on the tool's thread pool, one chunk at a time
+        loop = asyncio.get_running_loop()
+        executor = self.get_executor(tool_name)
+        iterator = iter(tool["function"](request_obj))
+        done = object()
+        try:
+            while True:
+                chunk = await loop.run_in_executor(executor, next, iterator, done)
+                if chunk is done:
+                    return
+                yield chunk
+        finally:
+            try:
+                iterator.close()
+            except ValueError:
+                # Still running on a worker thread after cancellation
+                pass
+
+    @staticmethod
+    async def _collect(chunks: AsyncIterator[Any]) -> List[Any]:
+        """Gather every chunk of an async iterator into a list"""
+        return [chunk async for chunk in chunks]
+
+    @staticmethod
+    def _collected(chunks: List[Any]) -> ToolResponse:
+        """Response for a generator tool called without streaming"""
+        return ToolResponse(
+            success=True,
+            result=chunks,
+            message=f"Collected {len(chunks)} streamed chunks"
+        )
+
+    def _plan_batch(self, calls: List[Dict[str, Any]]) -> Tuple[list, list, Dict[str, tuple]]:
+        """
+        Split a batch into finished results, scalar calls and vectorized groups
+
+        Returns:
+            (results with errors filled in, [(index, tool_name, arguments)],
+            {tool_name: ([indexes], [request objects], tool)})
+        """
+        results: List[Union[ToolResponse, ErrorResponse, None]] = [None] * len(calls)
+        scalar: List[Tuple[int, str, dict]] = []
+        vectorized: Dict[str, tuple] = {}
+        tools = self._snapshot.tools
+
+        for index, call in enumerate(calls):
+            # Only a missing or null "arguments" means no arguments
+            arguments = call.get("arguments") if isinstance(call, dict) else None
+            if arguments is None:
+                arguments = {}
+            if not isinstance(call, dict) or not isinstance(call.get("tool_name"), str) \
+                    or not isinstance(arguments, dict):
+                results[index] = ErrorResponse(
+                    error="Invalid batch entry",
+                    error_type="VALIDATION_ERROR",
+                    details={
+                        "index": index,
+                        "message": "Each call needs a 'tool_name' string and an 'arguments' object"
+                    }
+                )
+                continue
+
+            tool_name = call["tool_name"]
+            tool = tools.get(tool_name)
+
+            if tool is None or tool.get("batch_function") is None:
+                scalar.append((index, tool_name, arguments))
+                continue
+
+            try:
+                request_obj = tool["validator"].validate_python(arguments)
+            except ValidationError as e:
+                results[index] = self._validation_error(tool, e)
+                self._record(tool_name, results[index])
+                continue
+
+            cache_key = self._cache_key(tool_name, tool, request_obj)
+            if cache_key is not None:
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    results[index] = cached
+                    self._record(tool_name, cached)
+                    continue
+
+            positions, requests, _ = vectorized.setdefault(tool_name, ([], [], tool))
+            positions.append(index)
+            requests.append(request_obj)
+
+        return results, scalar, vectorized
+
+    def execute_batch(self, calls: List[Dict[str, Any]]) -> List[Union[ToolResponse, ErrorResponse]]:
+        """
+        Execute a list of tool calls, each succeeding or failing on its own
+
+        Calls are validated individually. Valid calls to a tool that registers
+        a ``batch_function`` are grouped and handed to it in a single
+        invocation; every other call goes through the regular scalar path.
+
+        Args:
+            calls: List of dictionaries with ``tool_name`` and ``arguments`` keys
+
+        Returns:
+            One ToolResponse or ErrorResponse per call, in the order given
+        """
+        results, scalar, vectorized = self._plan_batch(calls)
+
+        for index, tool_name, arguments in scalar:
+            results[index] = self.execute_tool(tool_name, arguments)
+
+        for tool_name, (positions, requests, tool) in vectorized.items():
+            for index, result in zip(positions, self._run_batch_function(tool_name, tool, requests)):
+                results[index] = result
+
+        return results
+
+    async def execute_batch_async(self, calls: List[Dict[str, Any]], timeout: Optional[float] = None) -> List[Union[ToolResponse, ErrorResponse]]:
+        """
+        Async counterpart of ``execute_batch`` that keeps the event loop free
+
+        ``timeout`` applies to every call in the batch, each also bounded by
+        its tool's own timeout.
+        """
+        results, scalar, vectorized = self._plan_batch(calls)
+
+        scalar_results = asyncio.gather(*(
+            self.execute_tool_async(tool_name, arguments, timeout)
+            for _, tool_name, arguments in scalar
+        ))
+        vectorized_results = asyncio.gather(*(
+            self._run_batch_admitted(tool_name, tool, requests, timeout)
+            for tool_name, (_, requests, tool) in vectorized.items()
+        ))
+
+        for (index, _, _), result in zip(scalar, await scalar_results):
+            results[index] = result
+        for (positions, _, _), group in zip(vectorized.values(), await vectorized_results):
+            for index, result in zip(positions, group):
+                results[index] = result
+
+        return results
+
+    async def _run_batch_admitted(self, tool_name: str, tool: Dict[str, Any], requests: List[ToolRequest], timeout: Optional[float] = None, record: bool = True) -> List[Union[ToolResponse, ErrorResponse]]:
+        """
+        Run a vectorized group on the tool's pool; the group takes one admission slot and shares one deadline
+
+        With ``record`` off the results are not counted here, for callers that record each call themselves.
+        """
+        timeout = self._timeout(tool, timeout)
+
+        async def run():
+            permit = await self._admit(tool_name)
+            if isinstance(permit, ErrorResponse):
+                return self._failed_group(tool_name, permit, len(requests), record)
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    self.get_executor(tool_name), self._run_batch_function, tool_name, tool, requests, record
+                )
+            finally:
+                self.admission.release(permit)
+
+        if timeout is None:
+            return await run()
+        try:
+            return await asyncio.wait_for(run(), timeout)
+        except asyncio.TimeoutError:
+            return self._failed_group(tool_name, self._timed_out(tool_name, timeout), len(requests), record)
+
+    def _failed_group(self, tool_name: str, error: ErrorResponse, size: int, record: bool = True) -> List[ErrorResponse]:
+        """The same error for every call of a vectorized group that never ran"""
+        if record:
+            for _ in range(size):
+                self._record(tool_name, error)
+        return [error] * size
+
+    def _run_batch_function(self, tool_name: str, tool: Dict[str, Any], requests: List[ToolRequest], record: bool = True) -> List[Union[ToolResponse, ErrorResponse]]:
+        """Run a tool's vectorized implementation, falling back to per-call execution"""
+        try:
+            results = tool["batch_function"](requests)
+        except Exception:
+            results = None
+
+        if results is None or len(results) != len(requests):
+            # Vectorized path failed as a whole; run each call on its own so
+            # every caller gets its own precise result or error
+            results = []
+            for request_obj in requests:
+                try:
+                    results.append(tool["function"](request_obj))
+                except Exception as e:
+                    results.append(self._execution_error(tool_name, e))
+
+        results = [
+            result if isinstance(result, ErrorResponse) else self._check_result(tool_name, result)
+            for result in results
+        ]
+
+        for request_obj, result in zip(requests, results):
+            cache_key = self._cache_key(tool_name, tool, request_obj)
+            if cache_key is not None and isinstance(result, ToolResponse):
+                self._cache.set(cache_key, result)
+            if record:
+                self._record(tool_name, result)
+
+        return results
 
 # Global registry instance
-registry = ToolRegistry()
\ No newline at end of file
+registry = ToolRegistry()
@@ -0,0 +1,70 @@
+# Hot reload triggers - tool source watcher and background reloads
+from typing import Callable, Dict, Iterable, Optional
+import os
+import threading
+import traceback
+
+def reload_in_background(registry, reason: str) -> threading.Thread:
+    """Reload a registry's tools on a daemon thread, reporting the outcome"""
+    def run():
+        try:
+            summary = registry.reload()
+        except Exception:
+            print(f"Tool reload ({reason}) failed; keeping the current tools")
+            traceback.print_exc()
+            return
+        print(f"Tools reloaded ({reason}): version {summary['version']}, "
+              f"{summary['count']} tools, added {summary['added']}, removed {summary['removed']}")
+
+    thread = threading.Thread(target=run, name="tool-reload", daemon=True)
+    thread.start()
+    return thread
+
+class SourceWatcher:
+    """
+    Polls source files and calls back when any is added, removed or modified
+
+    Polling the modification times needs no extra dependency and costs one
+    ``stat`` per file each ``interval`` seconds.
+    """
+
+    def __init__(self, sources: Callable[[], Iterable[str]], on_change: Callable[[], None], interval: float = 1.0):
+        self.sources = sources
+        self.on_change = on_change
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _stamps(self) -> Dict[str, int]:
+        stamps = {}
+        for path in self.sources():
+            try:
+                stamps[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                pass
+        return stamps
+
+    def _run(self, stamps: Dict[str, int]):
+        while not self._stop.wait(self.interval):
+            try:
+                current = self._stamps()
+            except Exception:
+                # A package vanished mid-edit; look again next time
+                continue
+            if current != stamps:
+                stamps = current
+                self.on_change()
+
+    def start(self):
+        """Start watching on a daemon thread; changes from now on are reported"""
+        self._thread = threading.Thread(
+            target=self._run, args=(self._stamps(),), name="tool-source-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,111 @@
+# Tool routes - one typed route per registered tool, generated from registry metadata
+from typing import Any, Awaitable, Callable, Dict, List
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import BaseRoute, Match, NoMatchFound
+from starlette.types import Receive, Scope, Send
+
+from .registry import ToolSnapshot
+from .serialization import DECODERS
+from .schemas.tool_schema import ErrorResponse, ToolResponse
+
+# Nested models of request schemas go to the document's components
+REF_TEMPLATE = "#/components/schemas/{model}"
+
+# Error statuses a tool call can answer with (see main.error_status)
+ERROR_RESPONSES: Dict[int, Dict[str, Any]] = {
+    status: {"model": ErrorResponse, "description": description}
+    for status, description in (
+        (400, "Invalid arguments"),
+        (404, "Unknown tool"),
+        (415, "Unsupported body format"),
+        (500, "Tool failed"),
+        (503, "Overloaded, retry after the Retry-After header"),
+        (504, "Timed out")
+    )
+}
+
+def json_body(schema: Dict[str, Any], required: bool = True) -> Dict[str, Any]:
+    """OpenAPI requestBody for routes that read and decode the raw body themselves"""
+    return {
+        "requestBody": {
+            "required": required,
+            "content": {media_type: {"schema": schema} for media_type in DECODERS}
+        }
+    }
+
+class ToolRoutes(BaseRoute):
+    """
+    The routes of every tool under ``prefix``, matched with one dict lookup
+
+    Each tool gets its own APIRoute, named ``call_<tool>`` and documented with
+    its request model, so it shows up typed in the OpenAPI document. Starlette
+    tries routes one by one; keeping the tool routes in this single container
+    makes matching a call cost the same with hundreds of tools as with two.
+    ``build`` swaps in the routes of a new snapshot with one assignment.
+    """
+
+    def __init__(self, prefix: str, handler: Callable[[str, Request], Awaitable[Response]]):
+        self.prefix = prefix.rstrip("/") + "/"
+        # Models nested in request schemas, by component name
+        self.components: Dict[str, Any] = {}
+        self._handler = handler
+        self._routes: Dict[str, APIRoute] = {}
+
+    @property
+    def routes(self) -> List[APIRoute]:
+        """The current tool routes, sorted by tool name"""
+        return [route for _, route in sorted(self._routes.items())]
+
+    def path(self, tool_name: str) -> str:
+        return self.prefix + tool_name
+
+    def build(self, snapshot: ToolSnapshot):
+        """Generate the routes of a snapshot's tools and swap them in"""
+        routes, components = {}, {}
+        for name, tool in snapshot.tools.items():
+            routes[name] = self._route(name, tool, components)
+        self._routes, self.components = routes, components
+
+    def _route(self, tool_name: str, tool: Dict[str, Any], components: Dict[str, Any]) -> APIRoute:
+        """The typed route of one tool"""
+        schema = tool["request_model"].model_json_schema(ref_template=REF_TEMPLATE)
+        components.update(schema.pop("$defs", {}))
+        handler = self._handler
+
+        async def endpoint(request: Request) -> Response:
+            return await handler(tool_name, request)
+
+        # Metrics label requests by endpoint name
+        endpoint.__name__ = f"call_{tool_name}"
+        return APIRoute(
+            self.path(tool_name),
+            endpoint,
+            methods=["POST"],
+            name=endpoint.__name__,
+            summary=f"Call {tool_name}",
+            description=tool["description"],
+            response_model=ToolResponse,
+            responses=ERROR_RESPONSES,
+            openapi_extra=json_body(schema, required=bool(schema.get("required")))
+        )
+
+    def matches(self, scope: Scope):
+        if scope["type"] == "http" and scope["path"].startswith(self.prefix):
+            route = self._routes.get(scope["path"][len(self.prefix):])
+            if route is not None:
+                return route.matches(scope)
+        return Match.NONE, {}
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send):
+        # matches() put the tool's own route in the scope
+        await scope["route"].handle(scope, receive, send)
+
+    def url_path_for(self, name: str, **path_params: Any):
+        for route in self._routes.values():
+            try:
+                return route.url_path_for(name, **path_params)
+            except NoMatchFound:
+                pass
+        raise NoMatchFound(name, path_params)
@@ -1,6 +1,6 @@
 # Pydantic schemas for tool requests and responses
 from pydantic import BaseModel, Field
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Union
 
 class ToolRequest(BaseModel):
     """Base request model for tool calls"""
@@ -15,6 +15,15 @@ class DummyToolRequest(ToolRequest):
     """Request schema for dummy_tool (no parameters needed)"""
     pass
 
+class SyntheticWorkloadRequest(ToolRequest):
+    """Request schema for synthetic_workload (every phase defaults to off)"""
+    cpu_ms: float = Field(0, ge=0, le=60000, description="CPU time to burn, in milliseconds")
+    async_io_ms: float = Field(0, ge=0, le=60000, description="Non-blocking wait, in milliseconds")
+    blocking_io_ms: float = Field(0, ge=0, le=60000, description="Blocking wait, in milliseconds")
+    payload_bytes: int = Field(0, ge=0, le=16 * 1024 * 1024, description="Size of the returned payload")
+    failure_rate: float = Field(0, ge=0, le=1, description="Probability that the call raises")
+    block_event_loop: bool = Field(False, description="Run the CPU and blocking phases on the event loop itself")
+
 class ToolResponse(BaseModel):
     """Standard response model for all tools"""
     success: bool
@@ -29,6 +38,12 @@ class ErrorResponse(BaseModel):
     error_type: str
     details: Optional[Dict[str, Any]] = None
 
+class BatchResponse(BaseModel):
+    """Response model for batched tool calls"""
+    success: bool = True
+    results: List[Union[ToolResponse, ErrorResponse]]
+    count: int
+
 class HealthResponse(BaseModel):
     """Health check response"""
     status: str
@@ -0,0 +1,153 @@
+# Serializers - fast JSON (orjson when installed) and MessagePack bodies
+from typing import Any, Callable, Dict, Mapping, Optional
+import json
+
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the environment
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+# Spellings of the MessagePack media type seen in the wild
+MSGPACK_ALIASES = {MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack"}
+
+class UnsupportedMediaType(Exception):
+    """Raised when a body uses a format this server cannot decode"""
+
+def encode_json(value: Any) -> bytes:
+    """
+    Encode a value to compact JSON bytes
+
+    Pydantic models are serialized by their compiled serializer straight to
+    bytes; other values use orjson when it is installed and the standard
+    library otherwise. Both produce the same compact, UTF-8 output as
+    Starlette's JSONResponse.
+    """
+    if isinstance(value, BaseModel):
+        return value.__pydantic_serializer__.to_json(value)
+    if orjson is not None:
+        return orjson.dumps(value, default=to_jsonable_python)
+    return json.dumps(
+        value, ensure_ascii=False, separators=(",", ":"), default=to_jsonable_python
+    ).encode()
+
+def decode_json(raw: bytes) -> Any:
+    """Decode JSON bytes"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def encode_msgpack(value: Any) -> bytes:
+    """Encode a value to MessagePack with the same structure as its JSON form"""
+    if isinstance(value, BaseModel):
+        value = value.model_dump(mode="json")
+    return msgpack.packb(value, default=to_jsonable_python)
+
+def decode_msgpack(raw: bytes) -> Any:
+    """Decode MessagePack bytes"""
+    return msgpack.unpackb(raw)
+
+# media type -> encoder / decoder; MessagePack only when the package is installed
+ENCODERS: Dict[str, Callable[[Any], bytes]] = {JSON_MEDIA_TYPE: encode_json}
+DECODERS: Dict[str, Callable[[bytes], Any]] = {JSON_MEDIA_TYPE: decode_json}
+if msgpack is not None:
+    ENCODERS[MSGPACK_MEDIA_TYPE] = encode_msgpack
+    DECODERS[MSGPACK_MEDIA_TYPE] = decode_msgpack
+
+def _media_type(header_value: str) -> str:
+    """Media type of a header element, lower-cased and without parameters"""
+    media_type = header_value.split(";", 1)[0].strip().lower()
+    return MSGPACK_MEDIA_TYPE if media_type in MSGPACK_ALIASES else media_type
+
+def negotiate_response_type(accept: Optional[str]) -> str:
+    """
+    Pick the response media type from an Accept header
+
+    MessagePack is only chosen when the client asks for it with a higher
+    quality than JSON (or without listing JSON) and it is installed;
+    everything else gets JSON.
+
+    Returns:
+        JSON_MEDIA_TYPE or MSGPACK_MEDIA_TYPE
+    """
+    if not accept or MSGPACK_MEDIA_TYPE not in ENCODERS:
+        return JSON_MEDIA_TYPE
+
+    best, best_quality = JSON_MEDIA_TYPE, -1.0
+    for part in accept.split(","):
+        media_type = _media_type(part)
+        if media_type not in ENCODERS:
+            continue
+        quality = 1.0
+        for parameter in part.split(";")[1:]:
+            key, _, value = parameter.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > best_quality:
+            best, best_quality = media_type, quality
+    return best if best_quality > 0 else JSON_MEDIA_TYPE
+
+def is_msgpack(content_type: Optional[str]) -> bool:
+    """Check whether a Content-Type header names MessagePack"""
+    return bool(content_type) and _media_type(content_type) == MSGPACK_MEDIA_TYPE
+
+def decode_body(raw: bytes, content_type: Optional[str]) -> Any:
+    """
+    Decode a request body according to its Content-Type
+
+    Anything that is not MessagePack is treated as JSON, as before content
+    negotiation existed. An empty body decodes to an empty object.
+
+    Raises:
+        UnsupportedMediaType: MessagePack body but msgpack is not installed
+        ValueError: The body is malformed
+    """
+    if not is_msgpack(content_type):
+        return decode_json(raw or b"{}")
+    if MSGPACK_MEDIA_TYPE not in DECODERS:
+        raise UnsupportedMediaType("application/msgpack bodies need the msgpack package")
+    if not raw:
+        return {}
+    try:
+        return decode_msgpack(raw)
+    except Exception as e:
+        # msgpack reports malformed input with several unrelated exception types
+        raise ValueError(f"Invalid MessagePack body: {e}") from e
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, RFC 9110)"""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in candidates)
+
+def render(
+    content: Any,
+    media_type: str = JSON_MEDIA_TYPE,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None
+) -> Response:
+    """Encode content with the negotiated serializer into a ready-made Response"""
+    response = Response(
+        content=ENCODERS[media_type](content),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers
+    )
+    # The body depends on Accept, so shared caches must key on it
+    response.headers["Vary"] = "Accept"
+    return response
@@ -0,0 +1,180 @@
+# Production serving - pre-forked uvicorn workers sharing one listening socket
+from typing import Dict, Optional
+import gc
+import importlib.util
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+import uvicorn
+
+from .config import config
+
+def fast_loop() -> str:
+    """uvloop when installed, otherwise the standard asyncio loop"""
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+def fast_http() -> str:
+    """httptools when installed, otherwise the pure-Python h11 parser"""
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    """Create the listening socket every worker accepts from"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+def worker_config(app) -> uvicorn.Config:
+    """uvicorn settings shared by all production workers"""
+    return uvicorn.Config(
+        app,
+        loop=fast_loop(),
+        http=fast_http(),
+        backlog=config.BACKLOG,
+        timeout_keep_alive=config.KEEPALIVE_TIMEOUT,
+        timeout_graceful_shutdown=config.GRACEFUL_TIMEOUT,
+        limit_concurrency=config.LIMIT_CONCURRENCY,
+        access_log=config.ACCESS_LOG,
+        log_level="info"
+    )
+
+def _run_worker(app, sock: socket.socket):
+    """Body of a forked worker process; never returns"""
+    # Drop the supervisor's handlers; uvicorn installs its own for graceful shutdown
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    if hasattr(signal, "SIGHUP"):
+        # Ignored until the app installs its tool reload handler at startup
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    exit_code = 0
+    try:
+        uvicorn.Server(worker_config(app)).run(sockets=[sock])
+    except BaseException:
+        exit_code = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(exit_code)
+
+def serve_production(workers: Optional[int] = None):
+    """
+    Run the app on pre-forked worker processes
+
+    The app, the registry and every tool module are imported once in this
+    supervisor process before forking, so workers share that memory
+    copy-on-write and start serving immediately. All workers accept from
+    one listening socket. SIGTERM/SIGINT are forwarded to the workers, which
+    stop accepting and drain open connections for up to GRACEFUL_TIMEOUT
+    seconds; workers that die unexpectedly are replaced. SIGHUP makes every
+    worker hot-reload its tools, and the supervisor reloads its own copy so
+    replacement workers start with the same tools.
+
+    Args:
+        workers: Number of worker processes, defaults to config.WORKERS
+    """
+    workers = workers or config.WORKERS
+
+    if not hasattr(os, "fork"):
+        # No fork (Windows): fall back to uvicorn's own spawn-based workers
+        uvicorn.run(
+            "server.main:app", host=config.HOST, port=config.PORT, workers=workers,
+            loop=fast_loop(), http=fast_http(), backlog=config.BACKLOG,
+            timeout_keep_alive=config.KEEPALIVE_TIMEOUT,
+            timeout_graceful_shutdown=config.GRACEFUL_TIMEOUT,
+            limit_concurrency=config.LIMIT_CONCURRENCY, access_log=config.ACCESS_LOG
+        )
+        return
+
+    # Preload: import the app and the tool implementations before forking
+    from .main import app, openapi_cache
+    from .registry import registry
+    registry.warm_up()
+    # Build (or load) the OpenAPI document once for all workers
+    openapi_cache.get()
+
+    if registry.metrics.directory is None and workers > 1:
+        # Give the workers a shared place to publish metrics so /metrics covers all of them
+        registry.metrics.directory = tempfile.mkdtemp(prefix="mcp-metrics-")
+
+    sock = bind_socket(config.HOST, config.PORT, config.BACKLOG)
+    print(f"Serving on {config.HOST}:{config.PORT} with {workers} workers "
+          f"(loop={fast_loop()}, http={fast_http()})")
+
+    # Keep the preloaded objects out of the collector so it does not touch
+    # (and un-share) their pages in the workers
+    gc.collect()
+    gc.freeze()
+
+    children: Dict[int, float] = {}
+    stopping = False
+    stop_deadline = 0.0
+
+    def spawn():
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(app, sock)
+        children[pid] = time.monotonic()
+
+    def request_stop(signum, frame):
+        nonlocal stopping, stop_deadline
+        if stopping:
+            return
+        stopping = True
+        stop_deadline = time.monotonic() + config.GRACEFUL_TIMEOUT + 5
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def forward(signum, frame):
+        # SIGHUP reloads tools: every worker reloads its own registry
+        for pid in list(children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+        try:
+            registry.reload()
+        except Exception as e:
+            print(f"Tool reload failed in the supervisor: {e}")
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, forward)
+
+    for _ in range(workers):
+        spawn()
+
+    try:
+        while children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                if stopping and time.monotonic() > stop_deadline:
+                    # Drain took too long; stop waiting for the stragglers
+                    for straggler in list(children):
+                        os.kill(straggler, signal.SIGKILL)
+                time.sleep(0.1)
+                continue
+
+            started = children.pop(pid, None)
+            if started is None or stopping:
+                continue
+
+            print(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}; restarting")
+            if time.monotonic() - started < 1:
+                # Crashing on startup: avoid a tight fork loop
+                time.sleep(1)
+            spawn()
+    finally:
+        sock.close()
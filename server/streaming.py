@@ -0,0 +1,53 @@
+# Streaming encoders for generator tools (NDJSON and Server-Sent Events)
+from typing import Any, AsyncIterator, Optional, Tuple
+
+from pydantic import BaseModel
+
+from .serialization import encode_json
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+def negotiate_stream_format(accept: Optional[str]) -> Optional[str]:
+    """
+    Pick a streaming media type from an Accept header
+
+    Returns:
+        NDJSON_MEDIA_TYPE or SSE_MEDIA_TYPE, or None if the client did not
+        ask for a stream
+    """
+    if not accept:
+        return None
+    for part in accept.split(","):
+        media_type = part.split(";", 1)[0].strip().lower()
+        if media_type in (NDJSON_MEDIA_TYPE, "application/jsonl"):
+            return NDJSON_MEDIA_TYPE
+        if media_type == SSE_MEDIA_TYPE:
+            return SSE_MEDIA_TYPE
+    return None
+
+def _frame_payload(kind: str, value: Any, index: int) -> bytes:
+    """JSON bytes for one frame"""
+    if kind == "summary":
+        payload = value.model_dump() if isinstance(value, BaseModel) else value
+        return encode_json({"type": "summary", **payload})
+    return encode_json({"type": "chunk", "index": index, "data": value})
+
+async def encode_ndjson(frames: AsyncIterator[Tuple[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode frames as newline-delimited JSON, one frame per line"""
+    index = 0
+    async for kind, value in frames:
+        yield _frame_payload(kind, value, index) + b"\n"
+        index += kind == "chunk"
+
+async def encode_sse(frames: AsyncIterator[Tuple[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode frames as Server-Sent Events named ``chunk`` and ``summary``"""
+    index = 0
+    async for kind, value in frames:
+        yield b"event: " + kind.encode() + b"\ndata: " + _frame_payload(kind, value, index) + b"\n\n"
+        index += kind == "chunk"
+
+ENCODERS = {
+    NDJSON_MEDIA_TYPE: encode_ndjson,
+    SSE_MEDIA_TYPE: encode_sse
+}
@@ -0,0 +1,15 @@
+# Shared fixtures for the server tests
+from typing import Callable
+import pytest
+
+def _sample(text: str, line_prefix: str) -> float:
+    """Value of the first exposition line starting with line_prefix"""
+    for line in text.splitlines():
+        if line.startswith(line_prefix):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"No sample starting with {line_prefix}")
+
+@pytest.fixture
+def sample() -> Callable[[str, str], float]:
+    """Reads one sample from Prometheus text exposition: sample(text, line_prefix)"""
+    return _sample
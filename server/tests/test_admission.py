@@ -0,0 +1,141 @@
+# Tests for admission control and load shedding
+import asyncio
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from server.admission import AdmissionController, ConcurrencyLimiter, GLOBAL_SCOPE, Overloaded
+from server.config import config
+from server.main import app
+from server.registry import registry, ToolRegistry
+from server.schemas.tool_schema import AddNumbersRequest, ErrorResponse, ToolResponse
+
+async def slow_add(request: AddNumbersRequest) -> ToolResponse:
+    """Add after a short pause so calls overlap"""
+    await asyncio.sleep(0.05)
+    return ToolResponse(success=True, result=request.a + request.b)
+
+class TestConcurrencyLimiter:
+    """Test cases for the concurrency limiter"""
+    
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_is_full(self):
+        """Test calls beyond slots plus queue are shed immediately"""
+        limiter = ConcurrencyLimiter("t", max_concurrency=1, max_queue=1)
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        
+        with pytest.raises(Overloaded):
+            await limiter.acquire()
+        assert limiter.stats()["queued"] == 1
+        assert limiter.stats()["rejected"] == 1
+        
+        limiter.release()
+        await waiter
+        limiter.release()
+        assert limiter.active == 0
+    
+    @pytest.mark.asyncio
+    async def test_waiters_are_admitted_in_order(self):
+        """Test queued calls get slots first in, first out"""
+        limiter = ConcurrencyLimiter("t", max_concurrency=1, max_queue=5)
+        order = []
+        
+        async def call(number):
+            await limiter.acquire()
+            order.append(number)
+            await asyncio.sleep(0.01)
+            limiter.release()
+        
+        await asyncio.gather(*(call(number) for number in range(4)))
+        assert order == [0, 1, 2, 3]
+        assert limiter.active == 0
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_frees_its_place(self):
+        """Test a cancelled waiter leaves the queue without leaking a slot"""
+        limiter = ConcurrencyLimiter("t", max_concurrency=1, max_queue=1)
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        
+        assert limiter.queued == 0
+        limiter.release()
+        assert limiter.active == 0
+
+class TestAdmissionControl:
+    """Test cases for tool and global limits in the registry"""
+    
+    @pytest.mark.asyncio
+    async def test_tool_limit_sheds_excess_calls(self):
+        """Test a tool's max_concurrency and max_queue bound concurrent calls"""
+        local_registry = ToolRegistry()
+        local_registry.register_tool(
+            "slow_add", function=slow_add, request_model=AddNumbersRequest,
+            description="Slow add", max_concurrency=1, max_queue=1
+        )
+        
+        results = await asyncio.gather(*(
+            local_registry.execute_tool_async("slow_add", {"a": number, "b": 0}) for number in range(3)
+        ))
+        
+        overloaded = [result for result in results if isinstance(result, ErrorResponse)]
+        assert len(overloaded) == 1
+        assert overloaded[0].error_type == "OVERLOADED"
+        assert overloaded[0].details["scope"] == "slow_add"
+        assert sum(result.success for result in results) == 2
+        
+        stats = local_registry.admission_stats()["slow_add"]
+        assert stats == {**stats, "active": 0, "queued": 0, "admitted": 2, "rejected": 1}
+        # Tools without limits are not tracked
+        assert "add_numbers" not in local_registry.admission_stats()
+    
+    @pytest.mark.asyncio
+    async def test_global_limit_applies_to_every_tool(self):
+        """Test the global limiter sheds calls across tools"""
+        local_registry = ToolRegistry()
+        local_registry.admission = AdmissionController(max_concurrency=1, max_queue=0)
+        local_registry.register_tool(
+            "slow_add", function=slow_add, request_model=AddNumbersRequest, description="Slow add"
+        )
+        
+        results = await asyncio.gather(
+            local_registry.execute_tool_async("slow_add", {"a": 1, "b": 1}),
+            local_registry.execute_tool_async("slow_add", {"a": 2, "b": 2})
+        )
+        
+        assert results[0].success is True
+        assert results[1].error_type == "OVERLOADED"
+        assert results[1].details["scope"] == GLOBAL_SCOPE
+    
+    def test_overloaded_http_response(self):
+        """Test shed calls get 503 with Retry-After and are visible in metrics"""
+        registry.register_tool(
+            "slow_add", function=slow_add, request_model=AddNumbersRequest,
+            description="Slow add", max_concurrency=1, max_queue=0
+        )
+        try:
+            client = TestClient(app)
+            
+            async def burst():
+                # Overlapping calls through the ASGI app on one event loop
+                async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+                    return await asyncio.gather(*(
+                        http.post(f"{config.API_PREFIX}/tools/slow_add", json={"a": 1, "b": 2}) for _ in range(2)
+                    ))
+            
+            responses = asyncio.run(burst())
+            statuses = sorted(response.status_code for response in responses)
+            assert statuses == [200, 503]
+            
+            rejected = next(response for response in responses if response.status_code == 503)
+            assert rejected.headers["retry-after"] == str(config.OVERLOAD_RETRY_AFTER)
+            assert rejected.json()["error_type"] == "OVERLOADED"
+            
+            stats = client.get(f"{config.API_PREFIX}/admission").json()["admission"]["slow_add"]
+            assert stats["rejected"] >= 1
+            assert 'mcp_admission_queued{scope="slow_add"} 0' in client.get("/metrics").text
+        finally:
+            registry.unregister_tool("slow_add")
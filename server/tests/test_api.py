@@ -0,0 +1,154 @@
+# Tests for the HTTP layer of the MCP server
+import pytest
+from fastapi.testclient import TestClient
+from server.main import app
+from server.config import config
+from server.registry import ToolRegistry
+from server.schemas.tool_schema import DummyToolRequest
+
+@pytest.fixture
+def client():
+    """FastAPI test client bound to the server app"""
+    return TestClient(app)
+
+class TestBatchEndpoint:
+    """Test cases for the batch tool-call endpoint"""
+    
+    def test_batch_endpoint_returns_results_in_order(self, client):
+        """Test the batch endpoint executes every call and keeps order"""
+        response = client.post(f"{config.API_PREFIX}/tools:batch", json={
+            "calls": [
+                {"tool_name": "add_numbers", "arguments": {"a": 1, "b": 1}},
+                {"tool_name": "nonexistent_tool", "arguments": {}},
+                {"tool_name": "add_numbers", "arguments": {"a": 2, "b": 2}},
+            ]
+        })
+        
+        assert response.status_code == 200
+        body = response.json()
+        assert body["count"] == 3
+        assert body["results"][0]["result"] == 2
+        assert body["results"][1]["error_type"] == "TOOL_NOT_FOUND"
+        assert body["results"][2]["result"] == 4
+    
+    def test_batch_entry_arguments_must_be_an_object(self, client):
+        """Test only missing or null arguments mean none; other non-objects are rejected per entry"""
+        calls = [{"tool_name": "dummy_tool"}, {"tool_name": "dummy_tool", "arguments": None}]
+        calls += [{"tool_name": "dummy_tool", "arguments": value} for value in ([], 0, "", False)]
+        response = client.post(f"{config.API_PREFIX}/tools:batch", json={"calls": calls})
+        
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [result["success"] for result in results[:2]] == [True, True]
+        for result in results[2:]:
+            assert result["error_type"] == "VALIDATION_ERROR"
+            assert result["details"]["message"].endswith("an 'arguments' object")
+    
+    def test_batch_endpoint_rejects_missing_calls(self, client):
+        """Test the batch endpoint rejects a body without a calls list"""
+        response = client.post(f"{config.API_PREFIX}/tools:batch", json={"calls": "nope"})
+        
+        assert response.status_code == 400
+        assert response.json()["error_type"] == "VALIDATION_ERROR"
+    
+    def test_batch_endpoint_rejects_oversized_batch(self, client, monkeypatch):
+        """Test the batch endpoint enforces MAX_BATCH_SIZE"""
+        monkeypatch.setattr(config, "MAX_BATCH_SIZE", 2)
+        response = client.post(f"{config.API_PREFIX}/tools:batch", json={
+            "calls": [{"tool_name": "dummy_tool", "arguments": {}}] * 3
+        })
+        
+        assert response.status_code == 400
+        assert response.json()["details"]["max_batch_size"] == 2
+
+class TestToolEndpoints:
+    """Test cases for the tool-call endpoints"""
+    
+    def test_add_numbers_endpoint(self, client):
+        """Test the dedicated add_numbers route"""
+        response = client.post(f"{config.API_PREFIX}/tools/add_numbers", json={"a": 4, "b": 5})
+        
+        assert response.status_code == 200
+        assert response.json()["result"] == 9
+    
+    def test_generic_endpoint_without_body(self, client):
+        """Test the generic route accepts a call without a body"""
+        response = client.post(f"{config.API_PREFIX}/tools/dummy_tool")
+        
+        assert response.status_code == 200
+        assert response.json()["success"] is True
+    
+    def test_generic_endpoint_malformed_json(self, client):
+        """Test malformed JSON returns a 400 validation error"""
+        response = client.post(
+            f"{config.API_PREFIX}/tools/add_numbers",
+            content=b'{"a": ',
+            headers={"Content-Type": "application/json"}
+        )
+        
+        assert response.status_code == 400
+        assert response.json()["error_type"] == "VALIDATION_ERROR"
+    
+    def test_generic_endpoint_unknown_tool(self, client):
+        """Test an unknown tool returns 404"""
+        response = client.post(f"{config.API_PREFIX}/tools/nonexistent_tool", json={})
+        
+        assert response.status_code == 404
+        assert response.json()["error_type"] == "TOOL_NOT_FOUND"
+
+class TestCacheEndpoint:
+    """Test cases for the cache statistics endpoint"""
+    
+    def test_cache_stats_endpoint(self, client):
+        """Test cache counters are exposed"""
+        client.post(f"{config.API_PREFIX}/tools/add_numbers", json={"a": 100, "b": 200})
+        client.post(f"{config.API_PREFIX}/tools/add_numbers", json={"a": 100, "b": 200})
+        response = client.get(f"{config.API_PREFIX}/cache")
+        
+        assert response.status_code == 200
+        stats = response.json()["cache"]
+        assert stats["hits"] >= 1
+        assert {"misses", "evictions", "size", "coalesced"} <= set(stats)
+
+class TestToolCatalog:
+    """Test cases for the pre-serialized tool catalog"""
+    
+    def test_list_tools_schema_and_etag(self, client):
+        """Test the catalog lists JSON Schemas and carries an ETag"""
+        response = client.get(f"{config.API_PREFIX}/tools")
+        
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('"')
+        body = response.json()
+        assert body["success"] is True
+        assert body["count"] == len(body["tools"])
+        schema = body["tools"]["add_numbers"]["parameters"]
+        assert schema["properties"]["a"]["type"] == "integer"
+        assert schema["required"] == ["a", "b"]
+    
+    def test_list_tools_conditional_get(self, client):
+        """Test a matching If-None-Match returns 304 with no body"""
+        etag = client.get(f"{config.API_PREFIX}/tools").headers["etag"]
+        
+        for header in (etag, f"W/{etag}", f'"stale", {etag}', "*"):
+            response = client.get(f"{config.API_PREFIX}/tools", headers={"If-None-Match": header})
+            assert response.status_code == 304
+            assert response.content == b""
+        
+        stale = client.get(f"{config.API_PREFIX}/tools", headers={"If-None-Match": '"stale"'})
+        assert stale.status_code == 200
+    
+    def test_catalog_is_cached_until_tools_change(self):
+        """Test the encoded catalog is reused and rebuilt after registration"""
+        local_registry = ToolRegistry()
+        first = local_registry.catalog()
+        
+        assert local_registry.catalog() is first
+        local_registry.register_tool(
+            "extra", function=lambda request: None, request_model=DummyToolRequest,
+            description="Extra", parameters={}
+        )
+        second = local_registry.catalog()
+        assert second is not first
+        assert second[1] != first[1]
+        assert b'"extra"' in second[0]
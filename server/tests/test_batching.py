@@ -0,0 +1,130 @@
+# Tests for micro-batching of concurrent calls to one tool
+import asyncio
+import pytest
+from server.batching import MicroBatcher
+from server.registry import ToolRegistry
+from server.schemas.tool_schema import AddNumbersRequest, ToolResponse
+
+class BatchedAdd:
+    """An add tool with a batch_function that records the size of every batch"""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, request: AddNumbersRequest) -> ToolResponse:
+        return ToolResponse(success=True, result=request.a + request.b)
+
+    def batch(self, requests):
+        self.batches.append(len(requests))
+        return [ToolResponse(success=True, result=request.a + request.b) for request in requests]
+
+@pytest.fixture
+def batched():
+    """A registry with one micro-batched tool, and that tool"""
+    local_registry = ToolRegistry(packages=[], entry_point_group="")
+    add = BatchedAdd()
+    local_registry.register_tool(
+        "add", function=add, request_model=AddNumbersRequest, description="Add",
+        batch_function=add.batch, micro_batch=True, batch_window_ms=20, batch_max_size=8
+    )
+    yield local_registry, add
+    local_registry.shutdown(wait=False)
+
+class TestMicroBatching:
+    """Test cases for micro-batched tool calls"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_batch(self, batched):
+        """Test concurrent calls run as a single batch_function call and each gets its own result"""
+        local_registry, add = batched
+        results = await asyncio.gather(*(
+            local_registry.execute_tool_async("add", {"a": a, "b": 1}) for a in range(5)
+        ))
+
+        assert [result.result for result in results] == [1, 2, 3, 4, 5]
+        assert add.batches == [5]
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_sent_before_the_window_ends(self, batched):
+        """Test reaching batch_max_size sends the batch at once, and the rest form the next one"""
+        local_registry, add = batched
+        local_registry.get_tool("add")["batch_window_ms"] = 10000
+        calls = [asyncio.ensure_future(local_registry.execute_tool_async("add", {"a": a, "b": 0})) for a in range(10)]
+
+        done, _ = await asyncio.wait(calls[:8], timeout=2)
+        assert len(done) == 8 and add.batches == [8]
+        for call in calls[8:]:
+            call.cancel()
+
+    @pytest.mark.asyncio
+    async def test_invalid_calls_do_not_join(self, batched):
+        """Test a call failing validation gets its own error without breaking the batch"""
+        local_registry, add = batched
+        good, bad = await asyncio.gather(
+            local_registry.execute_tool_async("add", {"a": 1, "b": 1}),
+            local_registry.execute_tool_async("add", {"a": "x"})
+        )
+        assert good.result == 2
+        assert bad.error_type == "VALIDATION_ERROR"
+        assert add.batches == [1]
+
+    @pytest.mark.asyncio
+    async def test_each_call_is_recorded_once(self, batched, sample):
+        """Test metrics count every batched call once"""
+        local_registry, _ = batched
+        await asyncio.gather(*(local_registry.execute_tool_async("add", {"a": a, "b": 0}) for a in range(3)))
+        text = local_registry.metrics.render()
+        assert sample(text, 'mcp_tool_calls_total{tool="add",outcome="success"}') == 3
+
+    def test_requires_batch_function(self):
+        """Test opting in to micro-batching without a batch_function is refused"""
+        local_registry = ToolRegistry(packages=[], entry_point_group="")
+        with pytest.raises(ValueError):
+            local_registry.register_tool(
+                "add", function=BatchedAdd(), request_model=AddNumbersRequest,
+                description="Add", micro_batch=True
+            )
+
+    def test_async_tools_cannot_be_batched(self):
+        """Test a batch_function or micro-batching on an async tool is refused"""
+        async def add(request: AddNumbersRequest) -> ToolResponse:
+            return ToolResponse(success=True, result=request.a + request.b)
+
+        local_registry = ToolRegistry(packages=[], entry_point_group="")
+        for options in ({"batch_function": BatchedAdd().batch}, {"batch_function": BatchedAdd().batch, "micro_batch": True}):
+            with pytest.raises(ValueError):
+                local_registry.register_tool(
+                    "add", function=add, request_model=AddNumbersRequest, description="Add", **options
+                )
+        assert not local_registry.tool_exists("add")
+
+class TestMicroBatcher:
+    """Test cases for the MicroBatcher itself"""
+
+    @pytest.mark.asyncio
+    async def test_caller_that_gave_up_is_left_out(self):
+        """Test a caller cancelled while its batch is open is not sent"""
+        sent = []
+
+        async def run(requests):
+            sent.append(list(requests))
+            return requests
+
+        batcher = MicroBatcher(None, run, window=0.05, max_size=10)
+        kept = asyncio.ensure_future(batcher.submit("kept"))
+        dropped = asyncio.ensure_future(batcher.submit("dropped"))
+        await asyncio.sleep(0)
+        dropped.cancel()
+
+        assert await kept == "kept"
+        assert sent == [["kept"]]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_reaches_every_caller(self):
+        """Test an exception from the batch run is raised in each waiting caller"""
+        async def run(requests):
+            raise RuntimeError("boom")
+
+        batcher = MicroBatcher(None, run, window=0.001, max_size=10)
+        results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,71 @@
+# Tests for the benchmark suite helpers
+import asyncio
+from benchmarks import load, profiles
+from server.registry import registry
+
+class TestBenchmarkSuite:
+    """Test cases for the load benchmark suite"""
+    
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        values = list(range(1, 101))
+        
+        assert load.percentile(values, 0.50) == 50
+        assert load.percentile(values, 0.99) == 99
+        assert load.percentile([], 0.5) == 0.0
+    
+    def test_compare_flags_regressions(self):
+        """Test throughput drops and p99 rises beyond the threshold are reported"""
+        baseline = {"health@c1": {"rps": 1000, "p99_ms": 1.0}}
+        
+        assert load.compare({"health@c1": {"rps": 950, "p99_ms": 1.05}}, baseline, 0.1) == []
+        regressions = load.compare({"health@c1": {"rps": 800, "p99_ms": 1.5}}, baseline, 0.1)
+        assert len(regressions) == 2
+        assert load.compare({"other@c1": {"rps": 1, "p99_ms": 99}}, baseline, 0.1) == []
+    
+    def test_in_process_run(self):
+        """Test a short in-process run covers every scenario without errors"""
+        try:
+            results = asyncio.run(load.run_suite(
+                load.in_process_client, list(load.SCENARIOS), [2], requests=10, warmup=2, measure_allocations=True
+            ))
+        finally:
+            registry.unregister_tool(load.RUNTIME_BENCH_TOOL)
+            registry.unregister_tool(load.SYNTHETIC_TOOL)
+        
+        assert set(results) == {f"{scenario}@c2" for scenario in load.SCENARIOS}
+        for stats in results.values():
+            assert stats["requests"] == 10
+            assert stats["errors"] == 0
+            assert stats["alloc_kib_per_request"] > 0
+
+    def test_profile_run(self):
+        """Test a short load profile runs every stage and reports loop stalls and failures"""
+        stages = [
+            profiles.stage("io", 4, 20, (1, {"async_io_ms": 1})),
+            profiles.stage("mixed", 4, 20, (1, {"cpu_ms": 1}), (1, {"failure_rate": 1}))
+        ]
+        try:
+            results = asyncio.run(profiles.run_profile(load.in_process_client, stages, pid=None, scale=0.5))
+        finally:
+            registry.unregister_tool(load.RUNTIME_BENCH_TOOL)
+            registry.unregister_tool(load.SYNTHETIC_TOOL)
+
+        assert list(results) == ["io", "mixed"]
+        assert results["io"]["requests"] == 10 and results["io"]["errors"] == 0
+        assert 0 < results["mixed"]["errors"] < 10
+        assert results["io"]["probe_p99_ms"] > 0
+        assert profiles.format_table(results).count("\n") == 3
+
+    def test_profile_run_without_probe(self):
+        """Test the stall columns are left empty when the probe is off (in-process runs)"""
+        stages = [profiles.stage("io", 2, 4, (1, {"async_io_ms": 1}))]
+        try:
+            results = asyncio.run(profiles.run_profile(load.in_process_client, stages, probe=False))
+        finally:
+            registry.unregister_tool(load.RUNTIME_BENCH_TOOL)
+            registry.unregister_tool(load.SYNTHETIC_TOOL)
+
+        assert results["io"]["requests"] == 4
+        assert results["io"]["probe_p99_ms"] is None and results["io"]["probe_max_ms"] is None
+        assert profiles.format_table(results).splitlines()[2].split()[4:6] == ["-", "-"]
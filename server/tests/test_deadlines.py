@@ -0,0 +1,192 @@
+# Tests for per-call deadlines, timeouts and cancellation
+import asyncio
+import time
+import pytest
+from fastapi.testclient import TestClient
+from server.config import config
+from server.main import app
+from server.registry import registry, ToolRegistry
+from server.schemas.tool_schema import AddNumbersRequest, ToolResponse
+
+class SlowTools:
+    """Tools that sleep for ``a`` milliseconds and note whether they were cancelled"""
+    
+    def __init__(self):
+        self.cancelled = asyncio.Event()
+    
+    async def sleep_async(self, request: AddNumbersRequest) -> ToolResponse:
+        try:
+            await asyncio.sleep(request.a / 1000)
+        except asyncio.CancelledError:
+            self.cancelled.set()
+            raise
+        return ToolResponse(success=True, result=request.a)
+    
+    def sleep_sync(self, request: AddNumbersRequest) -> ToolResponse:
+        time.sleep(request.a / 1000)
+        return ToolResponse(success=True, result=request.a)
+
+@pytest.fixture
+def tools():
+    """A registry with slow tools limited to one call at a time"""
+    slow = SlowTools()
+    local_registry = ToolRegistry()
+    for name, function, timeout in (
+        ("sleep_async", slow.sleep_async, 0.05),
+        ("sleep_sync", slow.sleep_sync, 0.05),
+        ("sleep_unbounded", slow.sleep_async, None)
+    ):
+        options = {"timeout": timeout} if timeout else {}
+        local_registry.register_tool(
+            name, function=function, request_model=AddNumbersRequest, description=name,
+            max_concurrency=1, max_queue=4, **options
+        )
+    local_registry.register_tool(
+        "sleep_deterministic", function=slow.sleep_async, request_model=AddNumbersRequest,
+        description="sleep_deterministic", max_concurrency=1, max_queue=4, timeout=0.05, deterministic=True
+    )
+    yield local_registry, slow
+    local_registry.shutdown(wait=False)
+
+class TestToolTimeouts:
+    """Test cases for tool timeouts and client deadlines"""
+    
+    @pytest.mark.asyncio
+    async def test_async_tool_is_cancelled_at_its_timeout(self, tools):
+        """Test an async tool past its timeout is cancelled and reported as TIMEOUT"""
+        local_registry, slow = tools
+        start = time.perf_counter()
+        result = await local_registry.execute_tool_async("sleep_async", {"a": 2000, "b": 0})
+        
+        assert result.error_type == "TIMEOUT"
+        assert result.details["timeout"] == 0.05
+        assert time.perf_counter() - start < 1
+        assert slow.cancelled.is_set()
+        assert local_registry.admission_stats()["sleep_async"]["active"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_deterministic_async_tool_is_cancelled_at_its_timeout(self, tools):
+        """Test a single-flight execution is cancelled once its only caller times out"""
+        local_registry, slow = tools
+        result = await local_registry.execute_tool_async("sleep_deterministic", {"a": 2000, "b": 0})
+        
+        assert result.error_type == "TIMEOUT"
+        assert slow.cancelled.is_set()
+        assert local_registry.admission_stats()["sleep_deterministic"]["active"] == 0
+        again = await local_registry.execute_tool_async("sleep_deterministic", {"a": 1, "b": 0})
+        assert again.success is True
+    
+    @pytest.mark.asyncio
+    async def test_shared_execution_outlives_one_caller(self, tools):
+        """Test a coalesced execution keeps running while another caller still waits on it"""
+        local_registry, slow = tools
+        arguments = {"a": 30, "b": 0}
+        first = asyncio.ensure_future(local_registry.execute_tool_async("sleep_deterministic", arguments))
+        second = asyncio.ensure_future(local_registry.execute_tool_async("sleep_deterministic", arguments))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        
+        result = await second
+        assert result.success is True and result.result == 30
+        assert not slow.cancelled.is_set()
+        assert local_registry.admission_stats()["sleep_deterministic"]["active"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_thread_pool_work_is_abandoned(self, tools):
+        """Test a sync tool past its timeout frees the caller and its admission slot"""
+        local_registry, _ = tools
+        start = time.perf_counter()
+        result = await local_registry.execute_tool_async("sleep_sync", {"a": 500, "b": 0})
+        
+        assert result.error_type == "TIMEOUT"
+        assert time.perf_counter() - start < 0.4
+        assert local_registry.admission_stats()["sleep_sync"]["active"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_client_timeout_only_shortens(self, tools):
+        """Test a caller's timeout can shorten but never extend the tool's"""
+        local_registry, _ = tools
+        
+        shortened = await local_registry.execute_tool_async("sleep_unbounded", {"a": 2000, "b": 0}, timeout=0.02)
+        assert shortened.error_type == "TIMEOUT"
+        assert shortened.details["timeout"] == 0.02
+        
+        capped = await local_registry.execute_tool_async("sleep_async", {"a": 2000, "b": 0}, timeout=10)
+        assert capped.details["timeout"] == 0.05
+        
+        in_time = await local_registry.execute_tool_async("sleep_unbounded", {"a": 1, "b": 0}, timeout=5)
+        assert in_time.success is True
+    
+    def test_sync_execute_tool_timeout(self, tools):
+        """Test execute_tool stops waiting when the deadline passes"""
+        local_registry, _ = tools
+        start = time.perf_counter()
+        result = local_registry.execute_tool("sleep_sync", {"a": 500, "b": 0})
+        
+        assert result.error_type == "TIMEOUT"
+        assert time.perf_counter() - start < 0.4
+    
+    @pytest.mark.asyncio
+    async def test_cancelling_the_caller_cancels_the_tool(self, tools):
+        """Test cancelling an awaiting caller cancels the tool and frees its slot"""
+        local_registry, slow = tools
+        call = asyncio.ensure_future(local_registry.execute_tool_async("sleep_unbounded", {"a": 2000, "b": 0}))
+        await asyncio.sleep(0.02)
+        call.cancel()
+        
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        assert slow.cancelled.is_set()
+        assert local_registry.admission_stats()["sleep_unbounded"]["active"] == 0
+
+class TestHttpDeadlines:
+    """Test cases for the deadline header and client disconnects"""
+    
+    @pytest.fixture
+    def slow(self):
+        """Register a slow async tool on the global registry for the duration of a test"""
+        slow = SlowTools()
+        registry.register_tool(
+            "sleep_async", function=slow.sleep_async, request_model=AddNumbersRequest, description="Sleep"
+        )
+        yield slow
+        registry.unregister_tool("sleep_async")
+    
+    def test_deadline_header_returns_504(self, slow):
+        """Test the deadline header turns a slow call into a 504 TIMEOUT"""
+        response = TestClient(app).post(
+            f"{config.API_PREFIX}/tools/sleep_async",
+            json={"a": 2000, "b": 0},
+            headers={config.DEADLINE_HEADER: "0.05"}
+        )
+        
+        assert response.status_code == 504
+        assert response.json()["error_type"] == "TIMEOUT"
+    
+    @pytest.mark.asyncio
+    async def test_client_disconnect_cancels_call(self, slow):
+        """Test a call is cancelled when its client disconnects mid-flight"""
+        body = b'{"a": 2000, "b": 0}'
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        sent = []
+        
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await asyncio.sleep(0.05)
+            return {"type": "http.disconnect"}
+        
+        async def send(message):
+            sent.append(message)
+        
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+            "scheme": "http", "path": f"{config.API_PREFIX}/tools/sleep_async", "raw_path": b"",
+            "query_string": b"", "root_path": "", "headers": [(b"content-type", b"application/json")],
+            "client": ("test", 1), "server": ("test", 80)
+        }
+        start = time.perf_counter()
+        await app(scope, receive, send)
+        
+        assert time.perf_counter() - start < 1
+        assert slow.cancelled.is_set()
@@ -0,0 +1,135 @@
+# Tests for decorator-based tool discovery and lazy loading
+import importlib.metadata
+import pickle
+import sys
+import textwrap
+import pytest
+from server.discovery import LazyCallable, _entry_point_packages, discover_tools, tool
+from server.registry import ToolRegistry
+from server.schemas.tool_schema import AddNumbersRequest, ToolResponse
+
+PLUGIN_SOURCE = textwrap.dedent('''
+    from server.discovery import tool
+    from server.schemas.tool_schema import AddNumbersRequest, DummyToolRequest, ToolResponse
+
+    IMPORTED = True
+
+    @tool(request_model=AddNumbersRequest, deterministic=True, max_workers=2)
+    def multiply(request):
+        """Multiplies two integers"""
+        return ToolResponse(success=True, result=request.a * request.b)
+
+    @tool(name="async_ping", request_model=DummyToolRequest)
+    async def ping(request):
+        """Replies pong"""
+        return ToolResponse(success=True, result="pong")
+
+    @tool(request_model=DummyToolRequest)
+    def ticks(request):
+        """Yields three ticks"""
+        for tick in range(3):
+            yield tick
+''')
+
+@pytest.fixture
+def plugin_package(tmp_path, monkeypatch):
+    """A throwaway tool package on sys.path"""
+    package = tmp_path / "plugin_tools"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "math_tools.py").write_text(PLUGIN_SOURCE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "plugin_tools"
+    for module in [name for name in sys.modules if name.startswith("plugin_tools")]:
+        del sys.modules[module]
+
+class TestDiscovery:
+    """Test cases for @tool discovery"""
+    
+    def test_builtin_tools_are_discovered(self):
+        """Test the bundled tools are found by scanning server.tools"""
+        names = [spec["name"] for spec in discover_tools(["server.tools"])]
+        
+        assert "add_numbers" in names
+        assert "dummy_tool" in names
+    
+    def test_discovery_reads_metadata_without_import(self, plugin_package):
+        """Test metadata comes from the source while the module stays unimported"""
+        specs = {spec["name"]: spec for spec in discover_tools([plugin_package])}
+        
+        assert set(specs) == {"multiply", "async_ping", "ticks"}
+        assert "plugin_tools.math_tools" not in sys.modules
+        assert specs["multiply"]["description"] == "Multiplies two integers"
+        assert specs["multiply"]["request_model"] is AddNumbersRequest
+        assert specs["multiply"]["options"] == {"deterministic": True, "max_workers": 2}
+        assert specs["async_ping"]["is_async"] is True
+        assert specs["ticks"]["streaming"] is True
+    
+    def test_registry_imports_on_first_call(self, plugin_package):
+        """Test a tool module is imported the first time the tool runs"""
+        local_registry = ToolRegistry(packages=[plugin_package], entry_point_group="")
+        
+        assert "plugin_tools.math_tools" not in sys.modules
+        result = local_registry.execute_tool("multiply", {"a": 6, "b": 7})
+        assert result.result == 42
+        assert "plugin_tools.math_tools" in sys.modules
+        assert local_registry.execute_tool("async_ping", {}).result == "pong"
+        assert local_registry.execute_tool("ticks", {}).result == [0, 1, 2]
+    
+    def test_warm_up_imports_in_background(self, plugin_package):
+        """Test warm_up loads every lazy implementation"""
+        local_registry = ToolRegistry(packages=[plugin_package], entry_point_group="")
+        local_registry.warm_up(background=True).join(timeout=5)
+        
+        assert local_registry.get_tool("multiply")["function"].loaded is True
+    
+    def test_non_literal_metadata_falls_back_to_import(self, tmp_path, monkeypatch):
+        """Test decorators that cannot be read statically still register"""
+        package = tmp_path / "dynamic_tools"
+        package.mkdir()
+        (package / "__init__.py").write_text("")
+        (package / "dynamic.py").write_text(textwrap.dedent('''
+            from server.discovery import tool
+            from server.schemas import tool_schema
+            from server.schemas.tool_schema import ToolResponse
+
+            @tool(description="Built " + "dynamically", request_model=tool_schema.DummyToolRequest)
+            def dynamic(request):
+                return ToolResponse(success=True, result="ok")
+        '''))
+        monkeypatch.syspath_prepend(str(tmp_path))
+        
+        specs = discover_tools(["dynamic_tools"])
+        
+        assert specs[0]["description"] == "Built dynamically"
+        assert specs[0]["function"](None).result == "ok"
+        del sys.modules["dynamic_tools.dynamic"], sys.modules["dynamic_tools"]
+
+    def test_entry_points_without_group_selection(self, monkeypatch):
+        """Test plugins are found with the dict API of Python 3.9's entry_points()"""
+        plugin = importlib.metadata.EntryPoint("plugin", "my_plugin.tools:register", "mcp_server.tools")
+        monkeypatch.setattr(importlib.metadata, "entry_points", lambda: {"mcp_server.tools": (plugin,)})
+
+        assert _entry_point_packages("mcp_server.tools") == ["my_plugin.tools"]
+        assert _entry_point_packages("other.group") == []
+
+class TestLazyCallable:
+    """Test cases for LazyCallable"""
+    
+    def test_lazy_callable_resolves_and_pickles(self):
+        """Test LazyCallable calls through and survives pickling"""
+        lazy = LazyCallable("server.tools.add_numbers", "add_numbers")
+        restored = pickle.loads(pickle.dumps(lazy))
+        
+        assert restored(AddNumbersRequest(a=1, b=2)).result == 3
+        assert restored.loaded is True
+    
+    def test_tool_decorator_records_metadata(self):
+        """Test the runtime decorator leaves the function callable"""
+        @tool(request_model=AddNumbersRequest, deterministic=True)
+        def plus(request):
+            return ToolResponse(success=True, result=request.a + request.b)
+        
+        assert plus.__tool_metadata__["name"] == "plus"
+        assert plus.__tool_metadata__["options"] == {"deterministic": True}
+        assert plus(AddNumbersRequest(a=1, b=1)).result == 2
@@ -0,0 +1,200 @@
+# Tests for gateway mode
+from collections import Counter
+import httpx
+import pytest
+import pytest_asyncio
+from server.config import config
+from server.gateway import Gateway, HashRing, Backend, create_app
+from server.main import app as backend_app
+
+URLS = [f"http://backend-{index}" for index in range(3)]
+TOOLS = f"{config.API_PREFIX}/tools"
+
+class BackendTransport(httpx.AsyncBaseTransport):
+    """An in-process backend instance that records its tool calls and can be taken down"""
+
+    def __init__(self):
+        self.inner = httpx.ASGITransport(app=backend_app)
+        self.calls = []
+        self.down = False
+        # Raised after a call was handled, as when the answer never arrives
+        self.error = None
+        # Replaces the catalog response when set
+        self.catalog = None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.down:
+            raise httpx.ConnectError("connection refused", request=request)
+        if self.catalog is not None and request.url.path == TOOLS:
+            return httpx.Response(200, json=self.catalog)
+        if request.method == "POST":
+            self.calls.append(request.url.path.rsplit("/", 1)[-1])
+        response = await self.inner.handle_async_request(request)
+        if self.error is not None and request.method == "POST":
+            raise self.error(self.error.__name__, request=request)
+        return response
+
+@pytest_asyncio.fixture
+async def cluster():
+    """A gateway over three backends, and a client talking to the gateway"""
+    transports = {url: BackendTransport() for url in URLS}
+    gateway = Gateway(URLS, transports=transports, health_interval=0)
+    await gateway.start()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app(gateway)), base_url="http://gateway")
+    yield gateway, transports, client
+    await client.aclose()
+    await gateway.stop()
+
+def served_by(transports) -> Counter:
+    return Counter({url: len(transport.calls) for url, transport in transports.items() if transport.calls})
+
+class TestGatewayRouting:
+    """Test cases for catalog merging and call routing"""
+
+    @pytest.mark.asyncio
+    async def test_merged_catalog(self, cluster):
+        """Test the catalog lists every backend tool, flagged when deterministic, with an ETag"""
+        _, _, client = cluster
+        response = await client.get(TOOLS)
+
+        assert response.status_code == 200
+        tools = response.json()["tools"]
+        assert {"add_numbers", "dummy_tool"} <= set(tools)
+        assert tools["add_numbers"]["deterministic"] is True
+        assert "deterministic" not in tools["dummy_tool"]
+
+        cached = await client.get(TOOLS, headers={"if-none-match": response.headers["etag"]})
+        assert cached.status_code == 304
+        weak = await client.get(TOOLS, headers={"if-none-match": f'"other", W/{response.headers["etag"]}'})
+        assert weak.status_code == 304
+
+    @pytest.mark.asyncio
+    async def test_deterministic_calls_are_sharded_by_arguments(self, cluster):
+        """Test equal arguments always reach the same backend and different ones spread out"""
+        _, transports, client = cluster
+        for body in ({"a": 1, "b": 2}, {"b": 2, "a": 1}, {"a": 1, "b": 2}):
+            response = await client.post(f"{TOOLS}/add_numbers", json=body)
+            assert response.json()["result"] == 3
+        assert len(served_by(transports)) == 1
+
+        for transport in transports.values():
+            transport.calls.clear()
+        for a in range(60):
+            await client.post(f"{TOOLS}/add_numbers", json={"a": a, "b": 0})
+        assert len(served_by(transports)) == 3
+
+    @pytest.mark.asyncio
+    async def test_other_calls_are_spread(self, cluster):
+        """Test calls to non-deterministic tools are balanced across backends"""
+        _, transports, client = cluster
+        for _ in range(6):
+            assert (await client.post(f"{TOOLS}/dummy_tool")).status_code == 200
+        assert sorted(served_by(transports).values()) == [2, 2, 2]
+
+    @pytest.mark.asyncio
+    async def test_backend_errors_are_relayed(self, cluster):
+        """Test a backend's error status and body reach the client unchanged"""
+        _, _, client = cluster
+        response = await client.post(f"{TOOLS}/add_numbers", json={"a": "x"})
+        assert response.status_code == 400
+        assert response.json()["error_type"] == "VALIDATION_ERROR"
+
+class TestGatewayFailover:
+    """Test cases for health checks and failover"""
+
+    @pytest.mark.asyncio
+    async def test_fails_over_to_next_backend(self, cluster):
+        """Test a call to a dead backend is retried elsewhere and the backend marked down"""
+        gateway, transports, client = cluster
+        await client.post(f"{TOOLS}/add_numbers", json={"a": 5, "b": 5})
+        (owner,) = served_by(transports)
+        transports[owner].down = True
+
+        response = await client.post(f"{TOOLS}/add_numbers", json={"a": 5, "b": 5})
+
+        assert response.json()["result"] == 10
+        backend = next(backend for backend in gateway.backends if backend.url == owner)
+        assert not backend.healthy and backend.failures == 1
+
+        transports[owner].down = False
+        await gateway.check_health()
+        assert backend.healthy
+
+    @pytest.mark.asyncio
+    async def test_no_backend_available(self, cluster):
+        """Test 503 when every backend is down, and 404 for tools no backend has"""
+        gateway, transports, client = cluster
+        assert (await client.post(f"{TOOLS}/no_such_tool")).status_code == 404
+
+        for transport in transports.values():
+            transport.down = True
+        await gateway.check_health()
+
+        response = await client.post(f"{TOOLS}/add_numbers", json={"a": 1, "b": 1})
+        assert response.status_code == 503
+        assert response.json()["error_type"] == "BACKEND_UNAVAILABLE"
+        assert (await client.get("/health")).status_code == 503
+
+    @pytest.mark.asyncio
+    async def test_read_timeout_is_not_retried(self, cluster):
+        """Test a call that reached a slow backend runs once, answers 504 and leaves it in rotation"""
+        gateway, transports, client = cluster
+        for transport in transports.values():
+            transport.error = httpx.ReadTimeout
+
+        response = await client.post(f"{TOOLS}/dummy_tool")
+
+        assert response.status_code == 504
+        assert response.json()["error_type"] == "TIMEOUT"
+        assert sum(len(transport.calls) for transport in transports.values()) == 1
+        assert all(backend.healthy for backend in gateway.backends)
+
+    @pytest.mark.asyncio
+    async def test_broken_connection_is_not_retried(self, cluster):
+        """Test a connection lost mid-response answers 502 without resending the call"""
+        _, transports, client = cluster
+        for transport in transports.values():
+            transport.error = httpx.ReadError
+
+        response = await client.post(f"{TOOLS}/dummy_tool")
+
+        assert response.status_code == 502
+        assert response.json()["error_type"] == "BACKEND_ERROR"
+        assert sum(len(transport.calls) for transport in transports.values()) == 1
+
+    @pytest.mark.asyncio
+    async def test_bad_catalog_marks_only_that_backend_down(self, cluster):
+        """Test a backend answering with a malformed catalog does not break the health checks"""
+        gateway, transports, _ = cluster
+        for index, catalog in enumerate(({"tools": ["not", "an", "object"]}, {"count": 0})):
+            transport = transports[URLS[index]]
+            transport.catalog = catalog
+            gateway.backends[index].etag = None
+
+            await gateway.check_health()
+
+            assert not gateway.backends[index].healthy
+            assert gateway.backends[2].healthy
+            transport.catalog = None
+            await gateway.check_health()
+
+class TestHashRing:
+    """Test cases for consistent hashing"""
+
+    def test_removing_a_backend_only_moves_its_keys(self):
+        """Test keys owned by the remaining backends keep their owner"""
+        backends = [Backend(url) for url in URLS]
+        full = HashRing(backends, 64)
+        reduced = HashRing(backends[:2], 64)
+
+        for index in range(200):
+            key = str(index).encode()
+            owner = full.preference(key)[0]
+            if owner is not backends[2]:
+                assert reduced.preference(key)[0] is owner
+
+    def test_preference_lists_every_backend_once(self):
+        """Test the failover order covers each backend exactly once"""
+        backends = [Backend(url) for url in URLS]
+        order = HashRing(backends, 16).preference(b"key")
+        assert sorted(backend.url for backend in order) == URLS
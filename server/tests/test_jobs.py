@@ -0,0 +1,183 @@
+# Tests for the async job API and its result store
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from server.config import config
+from server.jobs import FAILED, Job, JobManager, JobStore, SUCCEEDED
+from server.main import app, jobs
+from server.registry import registry
+from server.schemas.tool_schema import AddNumbersRequest, ToolResponse
+
+JOBS = f"{config.API_PREFIX}/jobs"
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def finished_job(store: JobStore, size: int, status: str = SUCCEEDED) -> Job:
+    """Add a job to a store and finish it with a result of ``size`` bytes"""
+    job = Job("test")
+    store.add(job)
+    store.finish(job, status, b'"' + b"x" * (size - 2) + b'"')
+    return job
+
+@pytest.fixture
+def client():
+    """A client whose event loop outlives single requests, so jobs keep running"""
+    with TestClient(app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def slow_tool():
+    """A tool that sleeps for ``a`` milliseconds, registered for one test"""
+    async def sleep(request: AddNumbersRequest) -> ToolResponse:
+        await asyncio.sleep(request.a / 1000)
+        return ToolResponse(success=True, result=request.a)
+
+    registry.register_tool("job_sleep", function=sleep, request_model=AddNumbersRequest, description="Sleep")
+    yield "job_sleep"
+    registry.unregister_tool("job_sleep")
+
+class TestJobStore:
+    """Test cases for JobStore limits"""
+
+    def test_results_expire(self):
+        """Test results are gone once their TTL has passed"""
+        clock = FakeClock()
+        store = JobStore(max_bytes=1000, ttl_seconds=10, clock=clock)
+        job = finished_job(store, 10)
+
+        clock.now = 9
+        assert store.get(job.id) is job
+        clock.now = 11
+        assert store.get(job.id) is None
+        assert store.stats()["expirations"] == 1
+
+    def test_evicts_least_recently_used_over_memory_limit(self):
+        """Test the least recently read result is dropped when memory runs out"""
+        store = JobStore(max_bytes=250, ttl_seconds=60)
+        first, second = finished_job(store, 100), finished_job(store, 100)
+        store.get(first.id)
+        third = finished_job(store, 100)
+
+        assert store.get(second.id) is None
+        assert store.get(first.id) is first and store.get(third.id) is third
+        assert store.stats()["memory_bytes"] == 200
+
+    def test_evicts_over_entry_limit(self):
+        """Test at most max_entries finished jobs are kept"""
+        store = JobStore(max_bytes=10 ** 6, ttl_seconds=60, max_entries=2)
+        first = finished_job(store, 10)
+        finished_job(store, 10)
+        finished_job(store, 10)
+        assert store.get(first.id) is None
+        assert store.stats()["finished"] == 2
+
+    def test_unfinished_jobs_are_never_evicted(self):
+        """Test running jobs stay however full the store is"""
+        store = JobStore(max_bytes=50, ttl_seconds=60, max_entries=1)
+        running = Job("test")
+        store.add(running)
+        finished_job(store, 40)
+        finished_job(store, 40)
+        assert store.get(running.id) is running
+
+    def test_spills_to_disk(self, tmp_path):
+        """Test results pushed out of memory are written to the spill directory and read back"""
+        store = JobStore(max_bytes=150, ttl_seconds=60, spill_dir=str(tmp_path), spill_max_bytes=10 ** 6)
+        first = finished_job(store, 100)
+        finished_job(store, 100)
+
+        assert first.spilled and first.result is None
+        assert store.result(store.get(first.id)) == "x" * 98
+        assert store.stats()["memory_bytes"] == 100
+
+        store.remove(first.id)
+        assert list(tmp_path.iterdir()) == []
+
+    def test_spill_directory_is_bounded(self, tmp_path):
+        """Test results are dropped once the spill directory is full"""
+        store = JobStore(max_bytes=100, ttl_seconds=60, spill_dir=str(tmp_path), spill_max_bytes=150)
+        first, second = finished_job(store, 100), finished_job(store, 100)
+        finished_job(store, 100)
+        assert first.spilled
+        assert store.get(second.id) is None
+
+    @pytest.mark.asyncio
+    async def test_describe_reads_spilled_result(self, tmp_path):
+        """Test a spilled result is read back from disk when the job is described"""
+        store = JobStore(max_bytes=100, ttl_seconds=60, spill_dir=str(tmp_path), spill_max_bytes=1000)
+        first = finished_job(store, 100)
+        finished_job(store, 100)
+        assert first.spilled
+
+        description = await JobManager(store, max_pending=1).describe(first)
+        assert description["result"] == "x" * 98
+
+class TestJobApi:
+    """Test cases for the /jobs endpoints"""
+
+    def test_submit_and_wait(self, client):
+        """Test a job is accepted with its location and its result can be long-polled"""
+        response = client.post(f"{JOBS}/add_numbers", json={"a": 1, "b": 2})
+
+        assert response.status_code == 202
+        job = response.json()["job"]
+        assert response.headers["location"] == f"{JOBS}/{job['id']}"
+
+        response = client.get(f"{response.headers['location']}?wait=5")
+        assert response.status_code == 200
+        job = response.json()["job"]
+        assert job["status"] == SUCCEEDED
+        assert job["result"]["result"] == 3
+
+    def test_long_poll_returns_on_completion(self, client, slow_tool):
+        """Test a long poll returns when the job finishes, not at the end of the wait"""
+        job_id = client.post(f"{JOBS}/{slow_tool}", json={"a": 200, "b": 0}).json()["job"]["id"]
+
+        assert client.get(f"{JOBS}/{job_id}").json()["job"]["status"] in ("pending", "running")
+        job = client.get(f"{JOBS}/{job_id}?wait=10", timeout=5).json()["job"]
+        assert job["status"] == SUCCEEDED and job["result"]["result"] == 200
+
+    def test_failed_job(self, client):
+        """Test a call that fails validation finishes as a failed job"""
+        job_id = client.post(f"{JOBS}/add_numbers", json={"a": "x"}).json()["job"]["id"]
+        job = client.get(f"{JOBS}/{job_id}?wait=5").json()["job"]
+        assert job["status"] == FAILED
+        assert job["result"]["error_type"] == "VALIDATION_ERROR"
+
+    def test_unknown_tool_and_job(self, client):
+        """Test unknown tools are refused up front and unknown job ids are 404"""
+        assert client.post(f"{JOBS}/missing_tool", json={}).status_code == 404
+        response = client.get(f"{JOBS}/not-a-job")
+        assert response.status_code == 404
+        assert response.json()["error_type"] == "JOB_NOT_FOUND"
+
+    def test_cancel(self, client, slow_tool):
+        """Test deleting a running job cancels it and forgets it"""
+        job_id = client.post(f"{JOBS}/{slow_tool}", json={"a": 10000, "b": 0}).json()["job"]["id"]
+
+        assert client.delete(f"{JOBS}/{job_id}").status_code == 200
+        assert client.get(f"{JOBS}/{job_id}").status_code == 404
+        assert jobs.stats()["running"] == 0
+
+    def test_too_many_jobs(self, client, slow_tool, monkeypatch):
+        """Test submissions beyond max_pending are shed with 503 and Retry-After"""
+        monkeypatch.setattr(jobs, "max_pending", 1)
+        first = client.post(f"{JOBS}/{slow_tool}", json={"a": 10000, "b": 0}).json()["job"]["id"]
+        try:
+            response = client.post(f"{JOBS}/{slow_tool}", json={"a": 1, "b": 0})
+            assert response.status_code == 503
+            assert "retry-after" in response.headers
+        finally:
+            client.delete(f"{JOBS}/{first}")
+
+    def test_disabled(self, client, monkeypatch):
+        """Test submissions are refused with 501 when jobs are disabled (several workers)"""
+        monkeypatch.setattr(config, "JOBS_ENABLED", False)
+        response = client.post(f"{JOBS}/add_numbers", json={"a": 1, "b": 2})
+        assert response.status_code == 501
+        assert response.json()["error_type"] == "JOBS_DISABLED"
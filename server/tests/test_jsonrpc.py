@@ -0,0 +1,183 @@
+# Tests for the MCP JSON-RPC 2.0 transport
+import asyncio
+import json
+import pytest
+from fastapi.testclient import TestClient
+from server.main import app
+from server.registry import registry, ToolRegistry
+from server.jsonrpc import JsonRpcDispatcher, INVALID_PARAMS, INVALID_REQUEST, METHOD_NOT_FOUND, PARSE_ERROR, line_receiver
+from server.schemas.tool_schema import AddNumbersRequest, ToolResponse
+
+def call(request_id, name, arguments):
+    """Build a tools/call request"""
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "tools/call",
+        "params": {"name": name, "arguments": arguments}
+    }
+
+class TestJsonRpcDispatcher:
+    """Test cases for JSON-RPC message handling"""
+    
+    @pytest.mark.asyncio
+    async def test_tools_list(self):
+        """Test tools/list returns every tool with an input schema"""
+        dispatcher = JsonRpcDispatcher(registry)
+        response = await dispatcher.handle_message({"jsonrpc": "2.0", "id": 1, "method": "tools/list"})
+        
+        tools = {tool["name"]: tool for tool in response["result"]["tools"]}
+        assert "add_numbers" in tools
+        assert "a" in tools["add_numbers"]["inputSchema"]["properties"]
+    
+    @pytest.mark.asyncio
+    async def test_tools_call(self):
+        """Test tools/call wraps the tool response as MCP content"""
+        dispatcher = JsonRpcDispatcher(registry)
+        response = await dispatcher.handle_message(call(7, "add_numbers", {"a": 2, "b": 3}))
+        
+        assert response["id"] == 7
+        assert response["result"]["isError"] is False
+        assert response["result"]["content"][0]["text"] == "5"
+        assert response["result"]["structuredContent"]["result"] == 5
+    
+    @pytest.mark.asyncio
+    async def test_tools_call_client_errors(self):
+        """Test unknown tools and bad arguments map to invalid params"""
+        dispatcher = JsonRpcDispatcher(registry)
+        missing = await dispatcher.handle_message(call(1, "nope", {}))
+        invalid = await dispatcher.handle_message(call(2, "add_numbers", {"a": "x"}))
+        
+        assert missing["error"]["code"] == INVALID_PARAMS
+        assert missing["error"]["data"]["error_type"] == "TOOL_NOT_FOUND"
+        assert invalid["error"]["data"]["error_type"] == "VALIDATION_ERROR"
+    
+    @pytest.mark.asyncio
+    async def test_arguments_must_be_an_object(self):
+        """Test only missing or null arguments mean none; other non-objects are invalid params"""
+        dispatcher = JsonRpcDispatcher(registry)
+        for arguments in (None, {}):
+            response = await dispatcher.handle_message(call(1, "dummy_tool", arguments))
+            assert response["result"]["isError"] is False
+        omitted = {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": "dummy_tool"}}
+        assert (await dispatcher.handle_message(omitted))["result"]["isError"] is False
+        
+        for arguments in ([], 0, "", False):
+            response = await dispatcher.handle_message(call(1, "dummy_tool", arguments))
+            assert response["error"]["code"] == INVALID_PARAMS
+    
+    @pytest.mark.asyncio
+    async def test_params_must_be_an_object(self):
+        """Test only missing or null params mean none; other non-objects are invalid params"""
+        dispatcher = JsonRpcDispatcher(registry)
+        for params in (None, {}):
+            response = await dispatcher.handle_message({"jsonrpc": "2.0", "id": 1, "method": "ping", "params": params})
+            assert response["result"] == {}
+        
+        for params in ([], 0, "", False):
+            response = await dispatcher.handle_message({"jsonrpc": "2.0", "id": 1, "method": "ping", "params": params})
+            assert response["error"]["code"] == INVALID_PARAMS
+    
+    @pytest.mark.asyncio
+    async def test_protocol_errors(self):
+        """Test parse errors and unknown methods"""
+        dispatcher = JsonRpcDispatcher(registry)
+        
+        assert (await dispatcher.handle_raw("{not json"))["error"]["code"] == PARSE_ERROR
+        unknown = await dispatcher.handle_message({"jsonrpc": "2.0", "id": 1, "method": "nope"})
+        assert unknown["error"]["code"] == METHOD_NOT_FOUND
+    
+    @pytest.mark.asyncio
+    async def test_batch_and_notifications(self):
+        """Test batch arrays answer every request and skip notifications"""
+        dispatcher = JsonRpcDispatcher(registry)
+        responses = await dispatcher.handle_message([
+            call(1, "add_numbers", {"a": 1, "b": 1}),
+            {"jsonrpc": "2.0", "method": "notifications/initialized"},
+            {"jsonrpc": "2.0", "id": 2, "method": "ping"},
+        ])
+        
+        assert [response["id"] for response in responses] == [1, 2]
+        assert await dispatcher.handle_message({"jsonrpc": "2.0", "method": "ping"}) is None
+    
+    @pytest.mark.asyncio
+    async def test_pipelined_responses_arrive_out_of_order(self):
+        """Test a fast request is answered before a slow one sent earlier"""
+        async def sleepy(request: AddNumbersRequest) -> ToolResponse:
+            await asyncio.sleep(request.a / 100)
+            return ToolResponse(success=True, result=request.a)
+        
+        local_registry = ToolRegistry()
+        local_registry.register_tool(
+            "sleepy", function=sleepy, request_model=AddNumbersRequest,
+            description="Sleeps a/100 seconds", parameters={}
+        )
+        dispatcher = JsonRpcDispatcher(local_registry)
+        
+        incoming = [
+            json.dumps(call(1, "sleepy", {"a": 10, "b": 0})),
+            json.dumps(call(2, "sleepy", {"a": 0, "b": 0})),
+        ]
+        sent = []
+        
+        async def receive():
+            return incoming.pop(0) if incoming else None
+        
+        async def send(message):
+            sent.append(json.loads(message)["id"])
+        
+        await dispatcher.serve(receive, send)
+        
+        assert sent == [2, 1]
+
+    @pytest.mark.asyncio
+    async def test_oversized_line_is_skipped(self):
+        """Test a line over the reader's limit is answered with an error and the session goes on"""
+        reader = asyncio.StreamReader(limit=256)
+        arguments = {"a": 1, "b": 2}
+        for line in (call(1, "add_numbers", arguments), call(2, "add_numbers", {**arguments, "pad": "x" * 1000}), call(3, "add_numbers", arguments)):
+            reader.feed_data(json.dumps(line).encode() + b"\n")
+        reader.feed_eof()
+        dispatcher = JsonRpcDispatcher(registry)
+        sent = []
+        
+        async def send(message):
+            sent.append(json.loads(message))
+        
+        await dispatcher.serve(line_receiver(reader), send)
+        
+        # Responses are pipelined, so they may arrive in any order
+        responses = {message["id"]: message for message in sent}
+        assert len(sent) == 3 and set(responses) == {1, 3, None}
+        assert responses[None]["error"]["code"] == INVALID_REQUEST
+        assert responses[1]["result"]["structuredContent"]["result"] == 3
+        assert responses[3]["result"]["structuredContent"]["result"] == 3
+
+class TestJsonRpcWebSocket:
+    """Test cases for the WebSocket transport"""
+    
+    def test_websocket_tools_call(self):
+        """Test a persistent connection serves several requests"""
+        client = TestClient(app)
+        with client.websocket_connect("/mcp/ws") as websocket:
+            for request_id in range(3):
+                websocket.send_text(json.dumps(call(request_id, "add_numbers", {"a": request_id, "b": 1})))
+            
+            responses = {}
+            for _ in range(3):
+                response = json.loads(websocket.receive_text())
+                responses[response["id"]] = response["result"]["structuredContent"]["result"]
+        
+        assert responses == {0: 1, 1: 2, 2: 3}
+    
+    def test_binary_frame_is_answered_with_error(self):
+        """Test a binary frame gets an Invalid Request error without closing the connection"""
+        client = TestClient(app)
+        with client.websocket_connect("/mcp/ws") as websocket:
+            websocket.send_bytes(json.dumps(call(1, "add_numbers", {"a": 1, "b": 2})).encode())
+            error = json.loads(websocket.receive_text())
+            websocket.send_text(json.dumps(call(2, "add_numbers", {"a": 1, "b": 2})))
+            response = json.loads(websocket.receive_text())
+        
+        assert error["error"]["code"] == INVALID_REQUEST
+        assert response["id"] == 2 and response["result"]["structuredContent"]["result"] == 3
@@ -0,0 +1,130 @@
+# Tests for per-tool metrics and the Prometheus endpoint
+import json
+import os
+import subprocess
+import sys
+import threading
+from fastapi.testclient import TestClient
+from server.main import app
+from server.config import config
+from server.metrics import Metrics, UNKNOWN_TOOL
+from server.registry import ToolRegistry
+
+class TestMetrics:
+    """Test cases for the Metrics collector"""
+    
+    def test_counters_and_histograms_render(self, sample):
+        """Test counters and histograms render in Prometheus text format"""
+        metrics = Metrics()
+        metrics.record_call("add_numbers", "success")
+        metrics.record_call("add_numbers", "success")
+        metrics.record_phase("add_numbers", "execution", 0.0002)
+        text = metrics.render()
+        
+        assert "# TYPE mcp_tool_calls_total counter" in text
+        assert sample(text, 'mcp_tool_calls_total{tool="add_numbers",outcome="success"}') == 2
+        prefix = 'mcp_tool_phase_seconds_bucket{tool="add_numbers",phase="execution",'
+        assert sample(text, prefix + 'le="0.0001"}') == 0
+        assert sample(text, prefix + 'le="0.00025"}') == 1
+        assert sample(text, prefix + 'le="+Inf"}') == 1
+        assert sample(text, 'mcp_tool_phase_seconds_count{tool="add_numbers",phase="execution"}') == 1
+    
+    def test_threads_record_into_separate_shards(self, sample):
+        """Test concurrent writers do not lose updates"""
+        metrics = Metrics()
+        
+        def work():
+            for _ in range(1000):
+                metrics.record_call("t", "success")
+        
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert sample(metrics.render(), 'mcp_tool_calls_total{tool="t",outcome="success"}') == 4000
+    
+    def test_disabled_metrics_record_nothing(self):
+        """Test a disabled collector is a no-op"""
+        metrics = Metrics(enabled=False)
+        metrics.record_call("t", "success")
+        
+        assert metrics.snapshot() == {"counters": {}, "histograms": {}, "gauges": {}}
+    
+    def test_aggregates_across_workers(self, tmp_path, sample):
+        """Test totals from other workers' files are summed in"""
+        other_worker = Metrics()
+        other_worker.record_call("add_numbers", "success")
+        other_worker.record_phase("add_numbers", "execution", 0.001)
+        # Any running process stands in for the other worker
+        other_file = f"metrics_{os.getppid()}.json"
+        (tmp_path / other_file).write_text(json.dumps(other_worker.snapshot()))
+        
+        metrics = Metrics(directory=str(tmp_path))
+        metrics.record_call("add_numbers", "success")
+        metrics.record_phase("add_numbers", "execution", 0.001)
+        text = metrics.render()
+        
+        assert sample(text, 'mcp_tool_calls_total{tool="add_numbers",outcome="success"}') == 2
+        assert sample(text, 'mcp_tool_phase_seconds_count{tool="add_numbers",phase="execution"}') == 2
+        assert any(path.name.startswith("metrics_") and path.name != other_file
+                   for path in tmp_path.iterdir())
+    
+    def test_skips_files_of_stopped_workers(self, tmp_path, sample):
+        """Test the file of a worker that is no longer running is left out of the totals"""
+        dead_worker = Metrics()
+        dead_worker.record_call("add_numbers", "success")
+        dead_worker.add_collector(lambda: [("mcp_admission_queued", ("global",), 5)])
+        process = subprocess.Popen([sys.executable, "-c", "pass"])
+        process.wait()
+        (tmp_path / f"metrics_{process.pid}.json").write_text(json.dumps(dead_worker.snapshot()))
+        
+        metrics = Metrics(directory=str(tmp_path))
+        metrics.record_call("add_numbers", "success")
+        text = metrics.render()
+        
+        assert sample(text, 'mcp_tool_calls_total{tool="add_numbers",outcome="success"}') == 1
+        assert "mcp_admission_queued{" not in text
+    
+    def test_stopping_removes_worker_file(self, tmp_path):
+        """Test a stopping worker deletes its file instead of leaving its totals behind"""
+        metrics = Metrics(directory=str(tmp_path))
+        metrics.record_call("add_numbers", "success")
+        metrics.start_flusher(60)
+        metrics.flush()
+        assert list(tmp_path.glob("metrics_*.json"))
+        
+        metrics.stop_flusher()
+        assert not list(tmp_path.glob("metrics_*.json"))
+
+class TestRegistryMetrics:
+    """Test cases for registry instrumentation"""
+    
+    def test_outcomes_are_counted_per_error_type(self, sample):
+        """Test every error_type gets its own outcome counter"""
+        local_registry = ToolRegistry()
+        local_registry.execute_tool("add_numbers", {"a": 1, "b": 2})
+        local_registry.execute_tool("add_numbers", {"a": "x", "b": 2})
+        local_registry.execute_tool("missing", {})
+        text = local_registry.metrics.render()
+        
+        assert sample(text, 'mcp_tool_calls_total{tool="add_numbers",outcome="success"}') == 1
+        assert sample(text, 'mcp_tool_calls_total{tool="add_numbers",outcome="VALIDATION_ERROR"}') == 1
+        assert sample(text, f'mcp_tool_calls_total{{tool="{UNKNOWN_TOOL}",outcome="TOOL_NOT_FOUND"}}') == 1
+        assert sample(text, 'mcp_tool_phase_seconds_count{tool="add_numbers",phase="validation"}') == 2
+        assert sample(text, 'mcp_tool_phase_seconds_count{tool="add_numbers",phase="execution"}') == 1
+
+class TestMetricsEndpoint:
+    """Test cases for the /metrics endpoint"""
+    
+    def test_metrics_endpoint(self, sample):
+        """Test HTTP and serialization metrics are exposed"""
+        client = TestClient(app)
+        client.post(f"{config.API_PREFIX}/tools/dummy_tool")
+        response = client.get("/metrics")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert sample(response.text, 'mcp_tool_phase_seconds_count{tool="dummy_tool",phase="serialization"}') >= 1
+        assert sample(response.text, 'mcp_http_requests_total{handler="call_dummy_tool",method="POST",status="200"}') >= 1
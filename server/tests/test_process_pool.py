@@ -0,0 +1,118 @@
+# Tests for the process pool execution backend
+import os
+import pytest
+from server.config import config
+from server.process_pool import ProcessToolPool
+from server.registry import ToolRegistry
+from server.schemas.tool_schema import AddNumbersRequest, ToolRequest, ToolResponse
+
+class BlobRequest(ToolRequest):
+    """Request carrying a bytes payload"""
+    data: bytes
+
+def worker_pid(request: AddNumbersRequest) -> ToolResponse:
+    """Sum a and b, reporting the process that did it"""
+    return ToolResponse(success=True, result={"sum": request.a + request.b, "pid": os.getpid()})
+
+def reverse_blob(request: BlobRequest) -> ToolResponse:
+    """Return the payload reversed"""
+    return ToolResponse(success=True, result={"data": request.data[::-1], "size": len(request.data)})
+
+def crash(request: AddNumbersRequest) -> ToolResponse:
+    """Kill the worker process"""
+    os._exit(1)
+
+def fail(request: AddNumbersRequest) -> ToolResponse:
+    """Raise inside the worker"""
+    raise RuntimeError("worker failure")
+
+def shared_memory_blocks() -> set:
+    """Names of the SharedMemory blocks currently allocated"""
+    if not os.path.isdir("/dev/shm"):
+        return set()
+    return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")}
+
+@pytest.fixture
+def process_registry(monkeypatch):
+    """Registry whose test tools run on a two-worker process pool"""
+    monkeypatch.setattr(config, "PROCESS_POOL_SIZE", 2)
+    local_registry = ToolRegistry()
+    for function, model in ((worker_pid, AddNumbersRequest), (reverse_blob, BlobRequest),
+                            (crash, AddNumbersRequest), (fail, AddNumbersRequest)):
+        local_registry.register_tool(
+            function.__name__, function=function, request_model=model,
+            description=function.__doc__, executor="process"
+        )
+    yield local_registry
+    local_registry.shutdown()
+
+class TestProcessPool:
+    """Test cases for running tools in worker processes"""
+    
+    def test_workers_import_tool_modules_at_start(self, process_registry):
+        """Test the pool starts warm with the tool modules imported"""
+        pool = process_registry.start_process_pool()
+        
+        assert __name__ in pool.modules
+        assert len(pool.start()) == 2
+    
+    @pytest.mark.asyncio
+    async def test_tool_runs_in_another_process(self, process_registry):
+        """Test a process tool runs outside the serving process on both call paths"""
+        async_result = await process_registry.execute_tool_async("worker_pid", {"a": 2, "b": 3})
+        sync_result = process_registry.execute_tool("worker_pid", {"a": 4, "b": 5})
+        
+        assert async_result.result["sum"] == 5
+        assert async_result.result["pid"] != os.getpid()
+        assert sync_result.result["sum"] == 9
+    
+    @pytest.mark.asyncio
+    async def test_large_bytes_use_shared_memory(self, process_registry):
+        """Test large payloads round-trip intact and leave no shared memory behind"""
+        payload = os.urandom(config.SHARED_MEMORY_THRESHOLD * 4)
+        before = shared_memory_blocks()
+        
+        result = await process_registry.execute_tool_async("reverse_blob", {"data": payload})
+        
+        assert result.success is True
+        assert result.result["data"] == payload[::-1]
+        assert result.result["size"] == len(payload)
+        assert shared_memory_blocks() <= before
+    
+    @pytest.mark.asyncio
+    async def test_crashed_worker_is_replaced(self, process_registry):
+        """Test a dying worker maps to EXECUTION_ERROR and the pool recovers"""
+        crashed = await process_registry.execute_tool_async("crash", {"a": 0, "b": 0})
+        
+        assert crashed.error_type == "EXECUTION_ERROR"
+        assert process_registry.get_process_pool().restarts == 1
+        
+        recovered = await process_registry.execute_tool_async("worker_pid", {"a": 1, "b": 1})
+        assert recovered.result["sum"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_tool_exception_maps_to_execution_error(self, process_registry):
+        """Test an exception raised in the worker keeps the usual error format"""
+        result = await process_registry.execute_tool_async("fail", {"a": 0, "b": 0})
+        
+        assert result.error_type == "EXECUTION_ERROR"
+        assert "worker failure" in result.error
+    
+    def test_only_plain_functions_can_use_processes(self):
+        """Test async and generator tools are refused by the process executor"""
+        async def async_tool(request: AddNumbersRequest) -> ToolResponse:
+            return ToolResponse(success=True)
+        
+        with pytest.raises(ValueError):
+            ToolRegistry().register_tool(
+                "async_tool", function=async_tool, request_model=AddNumbersRequest,
+                description="", executor="process"
+            )
+    
+    def test_pool_shutdown(self):
+        """Test a stopped pool reports that it is no longer running"""
+        pool = ProcessToolPool(max_workers=1)
+        pool.start()
+        assert pool.stats()["running"] is True
+        pool.shutdown()
+        assert pool.stats()["running"] is False
@@ -0,0 +1,109 @@
+# Tests for the on-demand profiling endpoint
+import threading
+import time
+import tracemalloc
+import pytest
+from fastapi.testclient import TestClient
+from server.config import config
+from server.main import app
+from server.profiling import Profiler, ProfileInProgress
+
+client = TestClient(app)
+ADMIN = {"Authorization": "Bearer secret"}
+
+@pytest.fixture
+def enabled(monkeypatch):
+    """Turn profiling on with a known admin token"""
+    monkeypatch.setattr(config, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "secret")
+
+def spin(stop: threading.Event):
+    """Burn CPU and allocate until stopped"""
+    kept = []
+    while not stop.is_set():
+        kept.append(bytearray(1024))
+        sum(range(1000))
+
+class TestProfileEndpoint:
+    """Test cases for /debug/profile"""
+
+    def test_disabled_by_default(self, monkeypatch):
+        """Test the endpoint does not exist unless enabled"""
+        monkeypatch.setattr(config, "ADMIN_TOKEN", "secret")
+        response = client.get("/debug/profile", headers=ADMIN)
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize("headers", [{}, {"Authorization": "Bearer wrong"}, {"Authorization": "secret"}])
+    def test_requires_admin_token(self, enabled, headers):
+        """Test requests without the right bearer token are refused"""
+        response = client.get("/debug/profile?seconds=0.01", headers=headers)
+        assert response.status_code == 401
+        assert response.json()["error_type"] == "UNAUTHORIZED"
+
+    def test_no_token_configured_refuses_everyone(self, monkeypatch):
+        """Test enabling profiling without a token keeps it closed"""
+        monkeypatch.setattr(config, "PROFILING_ENABLED", True)
+        monkeypatch.setattr(config, "ADMIN_TOKEN", None)
+        response = client.get("/debug/profile", headers={"Authorization": "Bearer "})
+        assert response.status_code == 401
+
+    def test_rejects_long_profiles(self, enabled):
+        """Test durations above PROFILE_MAX_SECONDS are rejected"""
+        response = client.get(f"/debug/profile?seconds={config.PROFILE_MAX_SECONDS + 1}", headers=ADMIN)
+        assert response.status_code == 400
+
+    def test_json_profile(self, enabled):
+        """Test a profile returns collapsed stacks of busy threads and top allocators"""
+        stop = threading.Event()
+        worker = threading.Thread(target=spin, args=(stop,), name="spinner")
+        worker.start()
+        try:
+            response = client.get("/debug/profile?seconds=0.2&top=5", headers=ADMIN)
+        finally:
+            stop.set()
+            worker.join()
+
+        assert response.status_code == 200
+        profile = response.json()["profile"]
+        assert profile["samples"] > 0
+        spinner = [line for line in profile["collapsed"].splitlines() if line.startswith("spinner;")]
+        assert any("spin (" in line for line in spinner)
+        assert int(spinner[0].rsplit(" ", 1)[1]) > 0
+        assert 0 < len(profile["allocations"]) <= 5
+        assert not tracemalloc.is_tracing()
+
+    def test_collapsed_format(self, enabled):
+        """Test format=collapsed returns plain text lines of 'stack count'"""
+        response = client.get("/debug/profile?seconds=0.05&format=collapsed", headers=ADMIN)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        for line in response.text.strip().splitlines():
+            stack, count = line.rsplit(" ", 1)
+            assert ";" in stack and int(count) > 0
+
+class TestProfiler:
+    """Test cases for the Profiler itself"""
+
+    def test_one_profile_at_a_time(self):
+        """Test a second concurrent profile is refused"""
+        profiler = Profiler()
+        thread = threading.Thread(target=profiler.profile, args=(0.3,))
+        thread.start()
+        try:
+            while not profiler.running:
+                time.sleep(0.01)
+            with pytest.raises(ProfileInProgress):
+                profiler.profile(0.01)
+        finally:
+            thread.join()
+        assert not profiler.running
+
+    def test_leaves_existing_tracemalloc_running(self):
+        """Test tracemalloc is not stopped if it was already tracing"""
+        tracemalloc.start()
+        try:
+            Profiler().profile(0.01)
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
@@ -0,0 +1,179 @@
+# Tests for atomic hot reload of the tool registry
+import asyncio
+import sys
+import textwrap
+import threading
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from server.config import config
+from server.main import app
+from server.registry import ToolRegistry
+from server.reload import SourceWatcher
+from server.schemas.tool_schema import AddNumbersRequest, ToolResponse
+from server.serialization import ENCODERS
+
+TOOL_SOURCE = '''
+import asyncio
+from server.discovery import tool
+from server.schemas.tool_schema import AddNumbersRequest, ToolResponse
+
+GATE = None
+
+@tool(request_model=AddNumbersRequest, {options})
+async def {name}(request: AddNumbersRequest) -> ToolResponse:
+    """Combine a and b"""
+    if GATE is not None:
+        await GATE.wait()
+    return ToolResponse(success=True, result={expression})
+'''
+
+class ToolPackage:
+    """A throwaway tool package whose source the tests rewrite"""
+
+    def __init__(self, root):
+        self.name = f"hot_tools_{uuid.uuid4().hex[:8]}"
+        self.path = root / self.name
+        self.path.mkdir()
+        (self.path / "__init__.py").write_text("")
+
+    def write(self, module: str, name: str, expression: str, options: str = ""):
+        source = TOOL_SOURCE.replace("{name}", name).replace("{expression}", expression)
+        (self.path / f"{module}.py").write_text(textwrap.dedent(source.replace("{options}", options)))
+
+    def remove(self, module: str):
+        (self.path / f"{module}.py").unlink()
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    # Rewrites can land within one mtime tick; never trust cached bytecode
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    package = ToolPackage(tmp_path)
+    package.write("combine", "combine", "request.a + request.b")
+    yield package
+    for module in [name for name in sys.modules if name.startswith(package.name)]:
+        del sys.modules[module]
+
+@pytest.fixture
+def hot_registry(package):
+    local_registry = ToolRegistry(packages=[package.name], entry_point_group="")
+    yield local_registry
+    local_registry.shutdown(wait=False)
+
+class TestReload:
+    """Test cases for ToolRegistry.reload"""
+
+    @pytest.mark.asyncio
+    async def test_picks_up_changed_code(self, package, hot_registry):
+        """Test a reload runs the new code of an already imported tool"""
+        assert (await hot_registry.execute_tool_async("combine", {"a": 2, "b": 3})).result == 5
+
+        package.write("combine", "combine", "request.a * request.b")
+        summary = hot_registry.reload()
+
+        assert summary == {"version": 2, "added": [], "removed": [], "count": 1}
+        assert (await hot_registry.execute_tool_async("combine", {"a": 2, "b": 3})).result == 6
+
+    def test_adds_and_removes_tools(self, package, hot_registry):
+        """Test new modules are discovered and deleted ones dropped"""
+        package.write("subtract", "subtract", "request.a - request.b")
+        assert hot_registry.reload()["added"] == ["subtract"]
+
+        package.remove("combine")
+        summary = hot_registry.reload()
+        assert summary["removed"] == ["combine"]
+        assert set(hot_registry.list_tools()) == {"subtract"}
+
+    @pytest.mark.asyncio
+    async def test_in_flight_call_finishes_on_its_version(self, package, hot_registry):
+        """Test a call started before a swap completes with the old code"""
+        gate = asyncio.Event()
+        __import__(f"{package.name}.combine", fromlist=["GATE"]).GATE = gate
+        call = asyncio.ensure_future(hot_registry.execute_tool_async("combine", {"a": 2, "b": 3}))
+        await asyncio.sleep(0.01)
+
+        package.write("combine", "combine", "request.a * request.b")
+        await asyncio.to_thread(hot_registry.reload)
+        gate.set()
+
+        assert (await call).result == 5
+        assert (await hot_registry.execute_tool_async("combine", {"a": 2, "b": 3})).result == 6
+
+    def test_failed_reload_keeps_current_tools(self, package, hot_registry):
+        """Test a broken tool module leaves the running version untouched"""
+        assert hot_registry.execute_tool("combine", {"a": 1, "b": 1}).result == 2
+        before = hot_registry.snapshot
+        (package.path / "combine.py").write_text("def broken(:\n")
+
+        with pytest.raises(SyntaxError):
+            hot_registry.reload()
+        assert hot_registry.snapshot is before
+        assert hot_registry.execute_tool("combine", {"a": 1, "b": 1}).result == 2
+
+    def test_catalog_is_built_once_per_swap(self, package, hot_registry):
+        """Test a reload encodes the catalog before the swap and requests reuse it"""
+        package.write("subtract", "subtract", "request.a - request.b")
+        hot_registry.reload()
+
+        snapshot = hot_registry.snapshot
+        assert set(snapshot._catalogs) == set(ENCODERS)
+        body, _ = hot_registry.catalog()
+        assert body is snapshot.catalog()[0]
+        assert b"subtract" in body
+
+    def test_snapshot_is_immutable(self, hot_registry):
+        """Test published snapshots cannot be modified in place"""
+        with pytest.raises(TypeError):
+            hot_registry.snapshot.tools["other"] = {}
+
+    def test_code_registered_tools_survive(self, hot_registry):
+        """Test tools registered in code are carried over by a reload"""
+        hot_registry.register_tool(
+            "manual", function=lambda request: ToolResponse(success=True, result=0),
+            request_model=AddNumbersRequest, description="Manual"
+        )
+        hot_registry.reload()
+        assert hot_registry.tool_exists("manual")
+
+    def test_unchanged_limits_keep_their_limiter(self, package, hot_registry):
+        """Test a reload does not reset the slots of an unchanged admission limit"""
+        package.write("combine", "combine", "request.a + request.b", options="max_concurrency=2")
+        hot_registry.reload()
+        limiter = hot_registry.admission.limiters()["combine"]
+
+        package.write("combine", "combine", "request.a - request.b", options="max_concurrency=2")
+        hot_registry.reload()
+        assert hot_registry.admission.limiters()["combine"] is limiter
+
+class TestReloadTriggers:
+    """Test cases for the admin endpoint and the source watcher"""
+
+    def test_admin_endpoint_requires_token(self, monkeypatch):
+        """Test the reload endpoint refuses requests without the admin token"""
+        monkeypatch.setattr(config, "ADMIN_TOKEN", "secret")
+        response = TestClient(app).post("/admin/reload")
+        assert response.status_code == 401
+
+    def test_admin_endpoint_reloads(self, monkeypatch):
+        """Test the reload endpoint swaps in a new version of the server's tools"""
+        from server.registry import registry
+        monkeypatch.setattr(config, "ADMIN_TOKEN", "secret")
+        version = registry.snapshot.version
+
+        response = TestClient(app).post("/admin/reload", headers={"Authorization": "Bearer secret"})
+
+        assert response.status_code == 200
+        assert response.json()["reload"]["version"] == version + 1
+        assert registry.tool_exists("add_numbers")
+
+    def test_watcher_notices_changes(self, package, hot_registry):
+        """Test the source watcher calls back when a tool file changes"""
+        changed = threading.Event()
+        watcher = SourceWatcher(hot_registry.sources, changed.set, interval=0.02)
+        watcher.start()
+        try:
+            package.write("subtract", "subtract", "request.a - request.b")
+            assert changed.wait(2)
+        finally:
+            watcher.stop()
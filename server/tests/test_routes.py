@@ -0,0 +1,89 @@
+# Tests for registry-driven tool routes and the cached OpenAPI document
+import pytest
+from fastapi.testclient import TestClient
+from server.config import config
+from server.main import app, openapi_cache
+from server.openapi import OpenApiCache
+from server.registry import registry
+from server.schemas.tool_schema import AddNumbersRequest, ToolResponse
+
+TOOLS = f"{config.API_PREFIX}/tools"
+client = TestClient(app)
+
+@pytest.fixture
+def runtime_tool():
+    """A tool registered after startup, removed after the test"""
+    registry.register_tool(
+        "route_multiply", function=lambda request: ToolResponse(success=True, result=request.a * request.b),
+        request_model=AddNumbersRequest, description="Multiply two integers"
+    )
+    yield "route_multiply"
+    registry.unregister_tool("route_multiply")
+
+class TestToolRoutes:
+    """Test cases for the generated per-tool routes"""
+
+    def test_every_tool_has_a_typed_route(self):
+        """Test each registered tool is documented with its own request model"""
+        paths = client.get("/openapi.json").json()["paths"]
+        for name in registry.list_tools():
+            operation = paths[f"{TOOLS}/{name}"]["post"]
+            assert operation["operationId"].startswith(f"call_{name}")
+        body = paths[f"{TOOLS}/add_numbers"]["post"]["requestBody"]
+        assert body["required"] is True
+        assert body["content"]["application/json"]["schema"]["required"] == ["a", "b"]
+
+    def test_runtime_tool_gets_a_route(self, runtime_tool):
+        """Test a tool registered later is routed and documented at once"""
+        response = client.post(f"{TOOLS}/{runtime_tool}", json={"a": 3, "b": 4})
+        assert response.json()["result"] == 12
+        assert f"{TOOLS}/{runtime_tool}" in client.get("/openapi.json").json()["paths"]
+
+    def test_route_goes_with_its_tool(self, runtime_tool):
+        """Test unregistering a tool removes its route and its documentation"""
+        registry.unregister_tool(runtime_tool)
+        assert client.post(f"{TOOLS}/{runtime_tool}", json={"a": 1, "b": 1}).status_code == 404
+        assert f"{TOOLS}/{runtime_tool}" not in client.get("/openapi.json").json()["paths"]
+
+    def test_wrong_method(self):
+        """Test a tool route only answers POST"""
+        assert client.get(f"{TOOLS}/add_numbers").status_code == 405
+
+    def test_root_lists_registered_tools(self, runtime_tool):
+        """Test the root endpoint lists tools from the registry"""
+        endpoints = client.get("/").json()["endpoints"]
+        assert endpoints[runtime_tool] == f"{TOOLS}/{runtime_tool}"
+        assert endpoints["add_numbers"] == f"{TOOLS}/add_numbers"
+
+class TestOpenApiCache:
+    """Test cases for caching the OpenAPI document"""
+
+    def test_built_once_per_version_of_the_tools(self, runtime_tool):
+        """Test repeated requests reuse the encoded document until the tools change"""
+        first = client.get("/openapi.json")
+        builds = openapi_cache.builds
+        assert client.get("/openapi.json").content == first.content
+        assert client.get("/openapi.json", headers={"if-none-match": first.headers["etag"]}).status_code == 304
+        assert openapi_cache.builds == builds
+
+        registry.unregister_tool(runtime_tool)
+        assert client.get("/openapi.json").headers["etag"] != first.headers["etag"]
+        assert openapi_cache.builds == builds + 1
+
+    def test_loads_from_disk(self, tmp_path):
+        """Test a cache whose key matches a stored document loads it instead of building"""
+        writer = OpenApiCache(lambda: {"openapi": "3.1.0"}, lambda: "k" * 64, str(tmp_path))
+        body, etag = writer.get()
+
+        def build():
+            raise AssertionError("built although cached on disk")
+
+        reader = OpenApiCache(build, lambda: "k" * 64, str(tmp_path))
+        assert reader.get() == (body, etag)
+        assert reader.builds == 0
+        assert [path.name for path in tmp_path.iterdir()] == [f"openapi-{'k' * 32}.json"]
+
+    def test_docs_pages(self):
+        """Test the documentation pages point at the cached document"""
+        assert "/openapi.json" in client.get("/docs").text
+        assert "/openapi.json" in client.get("/redoc").text
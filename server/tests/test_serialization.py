@@ -0,0 +1,95 @@
+# Tests for response serializers and content negotiation
+import json
+import pytest
+from fastapi.testclient import TestClient
+from server.main import app
+from server.config import config
+from server.schemas.tool_schema import ToolResponse
+from server.serialization import (
+    JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, decode_body, encode_json, negotiate_response_type
+)
+
+msgpack = pytest.importorskip("msgpack")
+
+@pytest.fixture
+def client():
+    """FastAPI test client bound to the server app"""
+    return TestClient(app)
+
+class TestSerializers:
+    """Test cases for the encoders and Accept negotiation"""
+    
+    def test_encode_json_matches_stdlib(self):
+        """Test models and dicts encode to the same compact JSON as before"""
+        response = ToolResponse(success=True, result={"sum": 3}, message="ok")
+        
+        assert json.loads(encode_json(response)) == response.model_dump()
+        assert encode_json({"a": [1, 2], "b": "é"}) == json.dumps(
+            {"a": [1, 2], "b": "é"}, ensure_ascii=False, separators=(",", ":")
+        ).encode()
+    
+    def test_negotiation(self):
+        """Test MessagePack is only chosen when preferred over JSON"""
+        assert negotiate_response_type(None) == JSON_MEDIA_TYPE
+        assert negotiate_response_type("*/*") == JSON_MEDIA_TYPE
+        assert negotiate_response_type("application/msgpack") == MSGPACK_MEDIA_TYPE
+        assert negotiate_response_type("application/x-msgpack") == MSGPACK_MEDIA_TYPE
+        assert negotiate_response_type("application/json, application/msgpack;q=0.5") == JSON_MEDIA_TYPE
+        assert negotiate_response_type("application/json;q=0.5, application/msgpack") == MSGPACK_MEDIA_TYPE
+        assert negotiate_response_type("application/msgpack;q=0") == JSON_MEDIA_TYPE
+    
+    def test_decode_body(self):
+        """Test bodies are decoded by Content-Type, treating unknown types as JSON"""
+        assert decode_body(b'{"a": 1}', None) == {"a": 1}
+        assert decode_body(b"", "application/json") == {}
+        assert decode_body(msgpack.packb({"a": 1}), "application/msgpack; charset=binary") == {"a": 1}
+        with pytest.raises(ValueError):
+            decode_body(b"\xc1", MSGPACK_MEDIA_TYPE)
+
+class TestMessagePackEndpoints:
+    """Test cases for MessagePack request and response bodies"""
+    
+    def test_tool_call_round_trip(self, client):
+        """Test a MessagePack call returns the same shape as its JSON twin"""
+        as_json = client.post(f"{config.API_PREFIX}/tools/add_numbers", json={"a": 2, "b": 3})
+        as_msgpack = client.post(
+            f"{config.API_PREFIX}/tools/add_numbers",
+            content=msgpack.packb({"a": 2, "b": 3}),
+            headers={"Content-Type": MSGPACK_MEDIA_TYPE, "Accept": MSGPACK_MEDIA_TYPE}
+        )
+        
+        assert as_msgpack.status_code == 200
+        assert as_msgpack.headers["content-type"] == MSGPACK_MEDIA_TYPE
+        assert as_msgpack.headers["vary"] == "Accept"
+        assert msgpack.unpackb(as_msgpack.content) == as_json.json()
+    
+    def test_errors_keep_status_and_shape(self, client):
+        """Test validation errors and malformed bodies map to 400 in either format"""
+        response = client.post(
+            f"{config.API_PREFIX}/tools/add_numbers",
+            content=msgpack.packb({"a": "x"}),
+            headers={"Content-Type": MSGPACK_MEDIA_TYPE, "Accept": MSGPACK_MEDIA_TYPE}
+        )
+        assert response.status_code == 400
+        assert msgpack.unpackb(response.content)["error_type"] == "VALIDATION_ERROR"
+        
+        malformed = client.post(
+            f"{config.API_PREFIX}/tools/add_numbers",
+            content=b"\xc1", headers={"Content-Type": MSGPACK_MEDIA_TYPE}
+        )
+        assert malformed.status_code == 400
+        assert malformed.json()["error_type"] == "VALIDATION_ERROR"
+    
+    def test_batch_and_catalog(self, client):
+        """Test the batch endpoint and the catalog negotiate MessagePack"""
+        batch = client.post(
+            f"{config.API_PREFIX}/tools:batch",
+            content=msgpack.packb({"calls": [{"tool_name": "add_numbers", "arguments": {"a": 1, "b": 1}}]}),
+            headers={"Content-Type": MSGPACK_MEDIA_TYPE, "Accept": MSGPACK_MEDIA_TYPE}
+        )
+        assert msgpack.unpackb(batch.content)["results"][0]["result"] == 2
+        
+        as_json = client.get(f"{config.API_PREFIX}/tools")
+        as_msgpack = client.get(f"{config.API_PREFIX}/tools", headers={"Accept": MSGPACK_MEDIA_TYPE})
+        assert msgpack.unpackb(as_msgpack.content) == as_json.json()
+        assert as_msgpack.headers["etag"] != as_json.headers["etag"]
@@ -0,0 +1,34 @@
+# Tests for the production serving helpers
+import socket
+from server.config import config
+from server.serving import bind_socket, fast_http, fast_loop, worker_config
+
+class TestServing:
+    """Test cases for production serving mode"""
+    
+    def test_fast_paths_fall_back(self):
+        """Test loop and parser choices are always valid uvicorn settings"""
+        assert fast_loop() in ("uvloop", "asyncio")
+        assert fast_http() in ("httptools", "h11")
+    
+    def test_bind_socket_is_listening_and_inheritable(self):
+        """Test the shared socket accepts connections and survives fork/exec"""
+        sock = bind_socket("127.0.0.1", 0, 16)
+        try:
+            assert sock.get_inheritable() is True
+            client = socket.create_connection(sock.getsockname(), timeout=1)
+            client.close()
+        finally:
+            sock.close()
+    
+    def test_worker_config_uses_settings(self, monkeypatch):
+        """Test backlog, keep-alive and drain settings come from Config"""
+        monkeypatch.setattr(config, "BACKLOG", 512)
+        monkeypatch.setattr(config, "KEEPALIVE_TIMEOUT", 15)
+        monkeypatch.setattr(config, "GRACEFUL_TIMEOUT", 7)
+        uv_config = worker_config(app=None)
+        
+        assert uv_config.backlog == 512
+        assert uv_config.timeout_keep_alive == 15
+        assert uv_config.timeout_graceful_shutdown == 7
+        assert uv_config.reload is False
@@ -0,0 +1,241 @@
+# Tests for streaming results from generator tools
+import asyncio
+import json
+import pytest
+from fastapi.testclient import TestClient
+from server.main import app
+from server.config import config
+from server.registry import registry, ToolRegistry
+from server.schemas.tool_schema import AddNumbersRequest, ToolResponse, ErrorResponse
+from server.streaming import negotiate_stream_format, NDJSON_MEDIA_TYPE, SSE_MEDIA_TYPE
+
+def count_up(request: AddNumbersRequest):
+    """Yield the integers from a up to b"""
+    for value in range(request.a, request.b):
+        yield value
+
+async def count_up_async(request: AddNumbersRequest):
+    """Async variant of count_up"""
+    for value in range(request.a, request.b):
+        await asyncio.sleep(0)
+        yield {"value": value}
+
+def fail_halfway(request: AddNumbersRequest):
+    """Yield one chunk then fail"""
+    yield "first"
+    raise RuntimeError("stream broke")
+
+async def tick_slowly(request: AddNumbersRequest):
+    """Yield a chunk every a milliseconds, forever"""
+    while True:
+        await asyncio.sleep(request.a / 1000)
+        yield "tick"
+
+def streaming_registry() -> ToolRegistry:
+    """Registry with the streaming test tools"""
+    local_registry = ToolRegistry()
+    for function in (count_up, count_up_async, fail_halfway, tick_slowly):
+        local_registry.register_tool(
+            function.__name__, function=function, request_model=AddNumbersRequest,
+            description=function.__doc__, parameters={}
+        )
+    return local_registry
+
+@pytest.fixture
+def client():
+    """Test client with count_up registered on the global registry"""
+    registry.register_tool(
+        "count_up", function=count_up, request_model=AddNumbersRequest,
+        description=count_up.__doc__, parameters={}
+    )
+    yield TestClient(app)
+    registry.unregister_tool("count_up")
+
+class TestStreamingRegistry:
+    """Test cases for generator tools in the registry"""
+    
+    def test_generator_tools_are_flagged(self):
+        """Test sync and async generators are detected at registration"""
+        local_registry = streaming_registry()
+        
+        assert local_registry.is_streaming("count_up") is True
+        assert local_registry.is_streaming("count_up_async") is True
+        assert local_registry.is_streaming("add_numbers") is False
+    
+    def test_execute_tool_collects_chunks(self):
+        """Test non-streaming callers get every chunk as a list"""
+        result = streaming_registry().execute_tool("count_up", {"a": 0, "b": 4})
+        
+        assert isinstance(result, ToolResponse)
+        assert result.result == [0, 1, 2, 3]
+    
+    @pytest.mark.asyncio
+    async def test_execute_tool_async_collects_async_chunks(self):
+        """Test async generators are collected on the async path"""
+        result = await streaming_registry().execute_tool_async("count_up_async", {"a": 0, "b": 2})
+        
+        assert result.result == [{"value": 0}, {"value": 1}]
+    
+    @pytest.mark.asyncio
+    async def test_stream_frames(self):
+        """Test chunks are followed by a single summary frame"""
+        frames = await streaming_registry().stream_tool_json("count_up", b'{"a": 0, "b": 3}')
+        collected = [frame async for frame in frames]
+        
+        assert collected[:3] == [("chunk", 0), ("chunk", 1), ("chunk", 2)]
+        kind, summary = collected[3]
+        assert kind == "summary"
+        assert summary.success is True
+        assert summary.result == {"chunks": 3}
+    
+    @pytest.mark.asyncio
+    async def test_stream_failure_ends_with_error_summary(self):
+        """Test a tool failing mid-stream reports EXECUTION_ERROR in the summary"""
+        frames = await streaming_registry().stream_tool_json("fail_halfway", b'{"a": 0, "b": 0}')
+        collected = [frame async for frame in frames]
+        
+        assert collected[0] == ("chunk", "first")
+        assert isinstance(collected[-1][1], ErrorResponse)
+        assert collected[-1][1].error_type == "EXECUTION_ERROR"
+    
+    @pytest.mark.asyncio
+    async def test_stream_timeout_ends_with_timeout_summary(self):
+        """Test a stream that outlives its deadline stops with a TIMEOUT summary"""
+        frames = await streaming_registry().stream_tool_json("tick_slowly", b'{"a": 10, "b": 0}', timeout=0.1)
+        collected = [frame async for frame in frames]
+        
+        assert 1 <= len(collected) - 1 < 10
+        assert collected[-1][1].error_type == "TIMEOUT"
+    
+    @pytest.mark.asyncio
+    async def test_stream_validation_error_before_streaming(self):
+        """Test invalid input is rejected before any frame is produced"""
+        result = await streaming_registry().stream_tool_json("count_up", b'{"a": "x"}')
+        
+        assert isinstance(result, ErrorResponse)
+        assert result.error_type == "VALIDATION_ERROR"
+
+class TestStreamingEndpoint:
+    """Test cases for streaming over the generic tool route"""
+    
+    def test_negotiate_stream_format(self):
+        """Test Accept header negotiation"""
+        assert negotiate_stream_format("application/x-ndjson") == NDJSON_MEDIA_TYPE
+        assert negotiate_stream_format("text/html, text/event-stream;q=0.9") == SSE_MEDIA_TYPE
+        assert negotiate_stream_format("application/json") is None
+        assert negotiate_stream_format(None) is None
+    
+    def test_ndjson_stream(self, client):
+        """Test NDJSON streaming returns one frame per line"""
+        response = client.post(
+            f"{config.API_PREFIX}/tools/count_up",
+            json={"a": 0, "b": 3},
+            headers={"Accept": NDJSON_MEDIA_TYPE}
+        )
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith(NDJSON_MEDIA_TYPE)
+        frames = [json.loads(line) for line in response.text.splitlines()]
+        assert [frame["data"] for frame in frames[:-1]] == [0, 1, 2]
+        assert frames[-1]["type"] == "summary"
+        assert frames[-1]["success"] is True
+    
+    def test_sse_stream(self, client):
+        """Test SSE streaming uses chunk and summary events"""
+        response = client.post(
+            f"{config.API_PREFIX}/tools/count_up",
+            json={"a": 5, "b": 7},
+            headers={"Accept": SSE_MEDIA_TYPE}
+        )
+        
+        events = [block.split("\n") for block in response.text.strip().split("\n\n")]
+        assert [event[0] for event in events] == ["event: chunk", "event: chunk", "event: summary"]
+        assert json.loads(events[1][1][len("data: "):])["data"] == 6
+    
+    def test_json_accept_collects(self, client):
+        """Test clients that do not ask for a stream get the collected result"""
+        response = client.post(f"{config.API_PREFIX}/tools/count_up", json={"a": 0, "b": 2})
+        
+        assert response.json()["result"] == [0, 1]
+    
+    def test_stream_validation_error_status(self, client):
+        """Test validation errors keep their HTTP status on the streaming path"""
+        response = client.post(
+            f"{config.API_PREFIX}/tools/count_up",
+            json={"a": "x", "b": 1},
+            headers={"Accept": NDJSON_MEDIA_TYPE}
+        )
+        
+        assert response.status_code == 400
+        assert response.json()["error_type"] == "VALIDATION_ERROR"
+    
+    @pytest.mark.asyncio
+    async def test_disconnect_while_queued_frees_the_slot(self):
+        """Test a streaming call waiting for admission gives up its place when the client leaves"""
+        registry.register_tool(
+            "count_up_limited", function=count_up, request_model=AddNumbersRequest,
+            description=count_up.__doc__, max_concurrency=1, max_queue=4
+        )
+        permit = await registry.admission.acquire("count_up_limited")
+        messages = [{"type": "http.request", "body": b'{"a": 0, "b": 3}', "more_body": False}]
+        sent = []
+        
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await asyncio.sleep(0.05)
+            return {"type": "http.disconnect"}
+        
+        async def send(message):
+            sent.append(message)
+        
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+            "scheme": "http", "path": f"{config.API_PREFIX}/tools/count_up_limited", "raw_path": b"",
+            "query_string": b"", "root_path": "", "client": ("test", 1), "server": ("test", 80),
+            "headers": [(b"content-type", b"application/json"), (b"accept", NDJSON_MEDIA_TYPE.encode())]
+        }
+        try:
+            await asyncio.wait_for(app(scope, receive, send), 1)
+            assert registry.admission_stats()["count_up_limited"]["queued"] == 0
+            assert sent[0]["status"] == 499
+        finally:
+            registry.admission.release(permit)
+            registry.unregister_tool("count_up_limited")
+    
+    @pytest.mark.asyncio
+    async def test_disconnect_before_first_read_frees_the_slot(self):
+        """Test an admitted stream whose body is never read still releases its admission slot"""
+        registry.register_tool(
+            "count_up_limited", function=count_up, request_model=AddNumbersRequest,
+            description=count_up.__doc__, max_concurrency=1, max_queue=4
+        )
+        messages = [{"type": "http.request", "body": b'{"a": 0, "b": 3}', "more_body": False}]
+        headers_sent = asyncio.Event()
+        sent = []
+        
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            # The client leaves once the response has started, before any body is read
+            await headers_sent.wait()
+            return {"type": "http.disconnect"}
+        
+        async def send(message):
+            sent.append(message)
+            if message["type"] == "http.response.start":
+                headers_sent.set()
+                await asyncio.sleep(1)
+        
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+            "scheme": "http", "path": f"{config.API_PREFIX}/tools/count_up_limited", "raw_path": b"",
+            "query_string": b"", "root_path": "", "client": ("test", 1), "server": ("test", 80),
+            "headers": [(b"content-type", b"application/json"), (b"accept", NDJSON_MEDIA_TYPE.encode())]
+        }
+        try:
+            await asyncio.wait_for(app(scope, receive, send), 2)
+            assert [message["type"] for message in sent] == ["http.response.start"]
+            assert registry.admission_stats()["count_up_limited"]["active"] == 0
+        finally:
+            registry.unregister_tool("count_up_limited")
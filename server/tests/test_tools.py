@@ -1,9 +1,12 @@
 # Comprehensive tests for MCP tools and server functionality
+import asyncio
+import time
 import pytest
-from server.tools.add_numbers import add_numbers
+from server.tools.add_numbers import add_numbers, add_numbers_batch
 from server.tools.dummy_tool import dummy_tool
 from server.schemas.tool_schema import AddNumbersRequest, DummyToolRequest, ToolResponse, ErrorResponse
-from server.registry import registry
+from server.registry import registry, ToolRegistry
+from server.cache import ResultCache
 
 class TestAddNumbersTool:
     """Test cases for add_numbers tool"""
@@ -53,6 +56,17 @@ class TestAddNumbersTool:
         assert "too large" in response.message.lower()
         assert response.error_type == "VALUE_ERROR"
 
+    def test_add_numbers_batch_matches_scalar(self):
+        """Test vectorized add_numbers returns the same responses as the scalar tool"""
+        requests = [
+            AddNumbersRequest(a=1, b=2),
+            AddNumbersRequest(a=-5, b=10),
+            AddNumbersRequest(a=1000001, b=5),
+        ]
+        responses = add_numbers_batch(requests)
+        
+        assert responses == [add_numbers(request) for request in requests]
+
 class TestDummyTool:
     """Test cases for dummy_tool"""
     
@@ -153,6 +167,278 @@ class TestToolRegistry:
         assert result.success is True
         assert "timestamp" in result.result
 
+class TestBatchExecution:
+    """Test cases for batched tool execution"""
+    
+    def test_execute_batch_preserves_order(self):
+        """Test results come back in the order the calls were given"""
+        results = registry.execute_batch([
+            {"tool_name": "add_numbers", "arguments": {"a": 1, "b": 2}},
+            {"tool_name": "dummy_tool", "arguments": {}},
+            {"tool_name": "add_numbers", "arguments": {"a": 3, "b": 4}},
+        ])
+        
+        assert len(results) == 3
+        assert results[0].result == 3
+        assert results[1].result["status"] == "operational"
+        assert results[2].result == 7
+    
+    def test_execute_batch_isolates_failures(self):
+        """Test one failing call does not affect the others"""
+        results = registry.execute_batch([
+            {"tool_name": "add_numbers", "arguments": {"a": 1, "b": 2}},
+            {"tool_name": "add_numbers", "arguments": {"a": "x", "b": 2}},
+            {"tool_name": "missing_tool", "arguments": {}},
+            {"arguments": {}},
+            {"tool_name": "add_numbers", "arguments": {"a": 5, "b": 5}},
+        ])
+        
+        assert results[0].result == 3
+        assert results[1].error_type == "VALIDATION_ERROR"
+        assert results[2].error_type == "TOOL_NOT_FOUND"
+        assert results[3].error_type == "VALIDATION_ERROR"
+        assert results[4].result == 10
+    
+    def test_execute_batch_uses_batch_function(self, monkeypatch):
+        """Test valid calls to a vectorized tool are handed over in one invocation"""
+        tool = registry.get_tool("add_numbers")
+        invocations = []
+        
+        def recording_batch(requests):
+            invocations.append(len(requests))
+            return add_numbers_batch(requests)
+        
+        monkeypatch.setitem(tool, "batch_function", recording_batch)
+        registry.clear_cache()
+        results = registry.execute_batch([
+            {"tool_name": "add_numbers", "arguments": {"a": i, "b": i}} for i in range(10)
+        ])
+        
+        assert invocations == [10]
+        assert [r.result for r in results] == [2 * i for i in range(10)]
+    
+    def test_execute_batch_falls_back_when_batch_function_fails(self, monkeypatch):
+        """Test a failing vectorized implementation falls back to per-call execution"""
+        def broken_batch(requests):
+            raise RuntimeError("boom")
+        
+        monkeypatch.setitem(registry.get_tool("add_numbers"), "batch_function", broken_batch)
+        registry.clear_cache()
+        results = registry.execute_batch([
+            {"tool_name": "add_numbers", "arguments": {"a": 2, "b": 2}},
+        ])
+        
+        assert results[0].success is True
+        assert results[0].result == 4
+
+class TestAsyncExecution:
+    """Test cases for async tools and thread-pool offloading"""
+    
+    @pytest.mark.asyncio
+    async def test_async_tool_is_awaited(self):
+        """Test an async def tool is awaited directly"""
+        async def async_echo(request: AddNumbersRequest) -> ToolResponse:
+            await asyncio.sleep(0)
+            return ToolResponse(success=True, result=request.a, message="echo")
+        
+        local_registry = ToolRegistry()
+        local_registry.register_tool(
+            "async_echo", function=async_echo, request_model=AddNumbersRequest,
+            description="Echo a", parameters={}
+        )
+        
+        assert local_registry.get_tool("async_echo")["is_async"] is True
+        result = await local_registry.execute_tool_async("async_echo", {"a": 7, "b": 0})
+        assert result.result == 7
+    
+    def test_async_tool_from_sync_caller(self):
+        """Test execute_tool drives async tools outside an event loop"""
+        async def async_echo(request: AddNumbersRequest) -> ToolResponse:
+            return ToolResponse(success=True, result=request.b, message="echo")
+        
+        local_registry = ToolRegistry()
+        local_registry.register_tool(
+            "async_echo", function=async_echo, request_model=AddNumbersRequest,
+            description="Echo b", parameters={}
+        )
+        
+        assert local_registry.execute_tool("async_echo", {"a": 0, "b": 9}).result == 9
+    
+    @pytest.mark.asyncio
+    async def test_sync_tool_does_not_block_event_loop(self):
+        """Test a slow synchronous tool runs off the event loop"""
+        def slow_tool(request: DummyToolRequest) -> ToolResponse:
+            time.sleep(0.2)
+            return ToolResponse(success=True, result="done")
+        
+        local_registry = ToolRegistry()
+        local_registry.register_tool(
+            "slow_tool", function=slow_tool, request_model=DummyToolRequest,
+            description="Sleeps", parameters={}, max_workers=1
+        )
+        
+        ticks = 0
+        
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        
+        ticker_task = asyncio.create_task(ticker())
+        result = await local_registry.execute_tool_async("slow_tool", {})
+        ticker_task.cancel()
+        
+        assert result.result == "done"
+        assert ticks >= 5
+        assert local_registry.get_executor("slow_tool") is not local_registry.get_executor("add_numbers")
+        local_registry.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_execute_batch_async(self):
+        """Test the async batch path returns results in order"""
+        results = await registry.execute_batch_async([
+            {"tool_name": "add_numbers", "arguments": {"a": 1, "b": 2}},
+            {"tool_name": "dummy_tool", "arguments": {}},
+            {"tool_name": "nope", "arguments": {}},
+        ])
+        
+        assert results[0].result == 3
+        assert results[1].success is True
+        assert results[2].error_type == "TOOL_NOT_FOUND"
+
+class TestRawBodyValidation:
+    """Test cases for the raw JSON body validation path"""
+    
+    @pytest.mark.asyncio
+    async def test_execute_tool_json_valid(self):
+        """Test a raw JSON body is validated and executed"""
+        result = await registry.execute_tool_json("add_numbers", b'{"a": 2, "b": 40}')
+        
+        assert isinstance(result, ToolResponse)
+        assert result.result == 42
+    
+    @pytest.mark.asyncio
+    async def test_execute_tool_json_empty_body(self):
+        """Test an empty body is treated as an empty object"""
+        result = await registry.execute_tool_json("dummy_tool", b"")
+        
+        assert result.success is True
+    
+    @pytest.mark.asyncio
+    async def test_execute_tool_json_error_format_matches_dict_path(self):
+        """Test validation errors look the same on both paths"""
+        raw_result = await registry.execute_tool_json("add_numbers", b'{"a": "not_a_number"}')
+        dict_result = registry.execute_tool("add_numbers", {"a": "not_a_number"})
+        
+        assert raw_result.error_type == dict_result.error_type == "VALIDATION_ERROR"
+        assert raw_result.details == dict_result.details
+    
+    @pytest.mark.asyncio
+    async def test_execute_tool_json_malformed(self):
+        """Test malformed JSON is reported as a validation error"""
+        result = await registry.execute_tool_json("add_numbers", b'{"a": 1,')
+        
+        assert result.error_type == "VALIDATION_ERROR"
+        assert result.details["validation_errors"][0]["field"] == "__root__"
+
+class TestResultCache:
+    """Test cases for the deterministic-tool result cache"""
+    
+    def test_cache_lru_eviction(self):
+        """Test the least recently used entry is evicted first"""
+        cache = ResultCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+    
+    def test_cache_ttl_expiry(self):
+        """Test entries expire after the TTL"""
+        now = [0.0]
+        cache = ResultCache(max_entries=10, ttl_seconds=5, clock=lambda: now[0])
+        cache.set("a", 1)
+        now[0] = 4.9
+        assert cache.get("a") == 1
+        now[0] = 5.0
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+    
+    def test_deterministic_tool_is_cached(self):
+        """Test repeated calls to a deterministic tool are served from the cache"""
+        calls = []
+        
+        def counting_add(request: AddNumbersRequest) -> ToolResponse:
+            calls.append(request)
+            return add_numbers(request)
+        
+        local_registry = ToolRegistry()
+        local_registry.register_tool(
+            "counting_add", function=counting_add, request_model=AddNumbersRequest,
+            description="Counts calls", parameters={}, deterministic=True
+        )
+        
+        first = local_registry.execute_tool("counting_add", {"a": 1, "b": 2})
+        # Different key order and a coercible type canonicalize to the same key
+        second = local_registry.execute_tool("counting_add", {"b": "2", "a": 1})
+        
+        assert first.result == second.result == 3
+        assert len(calls) == 1
+        stats = local_registry.cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+    
+    def test_non_deterministic_tool_is_not_cached(self):
+        """Test tools not marked deterministic always execute"""
+        local_registry = ToolRegistry()
+        local_registry.execute_tool("dummy_tool", {})
+        local_registry.execute_tool("dummy_tool", {})
+        
+        assert local_registry.cache_stats()["size"] == 0
+    
+    def test_errors_are_not_cached(self):
+        """Test execution errors are not stored"""
+        def failing(request: AddNumbersRequest) -> ToolResponse:
+            raise RuntimeError("boom")
+        
+        local_registry = ToolRegistry()
+        local_registry.register_tool(
+            "failing", function=failing, request_model=AddNumbersRequest,
+            description="Fails", parameters={}, deterministic=True
+        )
+        result = local_registry.execute_tool("failing", {"a": 1, "b": 1})
+        
+        assert result.error_type == "EXECUTION_ERROR"
+        assert local_registry.cache_stats()["size"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_calls_are_coalesced(self):
+        """Test identical in-flight calls share one execution"""
+        calls = []
+        
+        async def slow_add(request: AddNumbersRequest) -> ToolResponse:
+            calls.append(request)
+            await asyncio.sleep(0.05)
+            return add_numbers(request)
+        
+        local_registry = ToolRegistry()
+        local_registry.register_tool(
+            "slow_add", function=slow_add, request_model=AddNumbersRequest,
+            description="Slow add", parameters={}, deterministic=True
+        )
+        
+        results = await asyncio.gather(*(
+            local_registry.execute_tool_async("slow_add", {"a": 2, "b": 3}) for _ in range(10)
+        ))
+        
+        assert [r.result for r in results] == [5] * 10
+        assert len(calls) == 1
+        assert local_registry.cache_stats()["coalesced"] == 9
+
 class TestResponseFormats:
     """Test response format consistency"""
     
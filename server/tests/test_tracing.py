@@ -0,0 +1,140 @@
+# Tests for per-request phase tracing
+import json
+import pytest
+from fastapi.testclient import TestClient
+from server import tracing
+from server.config import config
+from server.main import app
+from server.tracing import Trace, TraceExporter, _parse_traceparent
+
+client = TestClient(app)
+
+def server_timing(header: str) -> dict:
+    """Phase name -> milliseconds from a Server-Timing header"""
+    phases = {}
+    for entry in header.split(","):
+        name, duration = entry.strip().split(";dur=")
+        phases[name] = float(duration)
+    return phases
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    """Export every trace to a temporary file"""
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(config, "TRACE_FILE", str(path))
+    monkeypatch.setattr(config, "TRACE_SAMPLE_RATE", 1.0)
+    tracing.shutdown()
+    yield path
+    tracing.shutdown()
+
+def read_traces(path) -> list:
+    tracing.shutdown()
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+class TestServerTiming:
+    """Test cases for the Server-Timing header"""
+
+    def test_tool_call_reports_every_phase(self):
+        """Test a JSON tool call reports parse, validation, execution, serialization and total"""
+        response = client.post(f"{config.API_PREFIX}/tools/add_numbers", json={"a": 1, "b": 2})
+
+        assert response.status_code == 200
+        phases = server_timing(response.headers["server-timing"])
+        assert list(phases) == ["parse", "validation", "execution", "serialization", "total"]
+        assert phases["total"] >= phases["execution"]
+
+    def test_errors_are_timed(self):
+        """Test a validation error still reports the phases it went through"""
+        response = client.post(f"{config.API_PREFIX}/tools/add_numbers", json={"a": "x"})
+
+        assert response.status_code == 400
+        phases = server_timing(response.headers["server-timing"])
+        assert "validation" in phases and "execution" not in phases
+
+    def test_disabled(self, monkeypatch):
+        """Test no header is sent when tracing is disabled"""
+        monkeypatch.setattr(config, "TRACING_ENABLED", False)
+        response = client.post(f"{config.API_PREFIX}/tools/dummy_tool")
+
+        assert response.status_code == 200
+        assert "server-timing" not in response.headers
+
+    def test_other_routes_are_not_traced(self):
+        """Test only tool calls carry the header"""
+        response = client.get("/health")
+        assert "server-timing" not in response.headers
+
+class TestTraceExport:
+    """Test cases for sampled OTLP JSON trace files"""
+
+    def test_sampled_trace_is_written(self, trace_file):
+        """Test a sampled call is written as one OTLP document with a span per phase"""
+        client.post(f"{config.API_PREFIX}/tools/add_numbers", json={"a": 1, "b": 2})
+
+        (document,) = read_traces(trace_file)
+        spans = document["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        root = spans[0]
+        assert root["name"] == "POST /api/v1/tools/add_numbers"
+        assert root["status"] == {"code": tracing.STATUS_OK}
+        attributes = {item["key"]: item["value"] for item in root["attributes"]}
+        assert attributes["mcp.tool.name"] == {"stringValue": "add_numbers"}
+        assert attributes["http.response.status_code"] == {"intValue": "200"}
+
+        children = spans[1:]
+        assert {span["name"] for span in children} == {"parse", "validation", "execution", "serialization"}
+        for span in children:
+            assert span["traceId"] == root["traceId"]
+            assert span["parentSpanId"] == root["spanId"]
+            assert int(root["startTimeUnixNano"]) <= int(span["startTimeUnixNano"]) <= int(span["endTimeUnixNano"])
+
+    def test_unsampled_trace_is_not_written(self, trace_file, monkeypatch):
+        """Test calls outside the sample still get the header but are not exported"""
+        monkeypatch.setattr(config, "TRACE_SAMPLE_RATE", 0.0)
+        response = client.post(f"{config.API_PREFIX}/tools/dummy_tool")
+
+        assert "server-timing" in response.headers
+        tracing.shutdown()
+        assert not trace_file.exists() or trace_file.read_text() == ""
+
+    def test_traceparent_is_continued(self, trace_file, monkeypatch):
+        """Test a sampled W3C traceparent forces export and keeps the caller's trace id"""
+        monkeypatch.setattr(config, "TRACE_SAMPLE_RATE", 0.0)
+        trace_id, parent_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+        client.post(
+            f"{config.API_PREFIX}/tools/dummy_tool",
+            headers={"traceparent": f"00-{trace_id}-{parent_id}-01"}
+        )
+
+        (document,) = read_traces(trace_file)
+        root = document["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+        assert root["traceId"] == trace_id
+        assert root["parentSpanId"] == parent_id
+
+    def test_file_rotates(self, tmp_path):
+        """Test the exporter rotates its file at the size limit"""
+        path = tmp_path / "traces.jsonl"
+        exporter = TraceExporter(str(path), max_bytes=2000, backups=2)
+        trace = Trace("test", sampled=True)
+        trace.add_phase("execution", 0.001)
+        for _ in range(20):
+            exporter.export(trace.to_otlp(trace.start + 0.002, error=False))
+        exporter.close()
+
+        assert path.exists() and (tmp_path / "traces.jsonl.1").exists()
+        assert not (tmp_path / "traces.jsonl.3").exists()
+
+class TestTraceparent:
+    """Test cases for parsing traceparent headers"""
+
+    def test_valid(self):
+        """Test a valid header yields its ids and sampled flag"""
+        parsed = _parse_traceparent("00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-00")
+        assert parsed == ("4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7", False)
+
+    @pytest.mark.parametrize("header", [
+        None, "", "garbage", "00-xyz-00f067aa0ba902b7-01",
+        "00-00000000000000000000000000000000-00f067aa0ba902b7-01"
+    ])
+    def test_invalid(self, header):
+        """Test malformed headers are ignored"""
+        assert _parse_traceparent(header) is None
@@ -0,0 +1,59 @@
+# Tests for the synthetic workload tool
+import asyncio
+import time
+import pytest
+from server.registry import ToolRegistry
+
+@pytest.fixture
+def workloads():
+    """A registry serving only the synthetic workload package"""
+    local_registry = ToolRegistry(packages=["server.workloads"], entry_point_group="")
+    yield local_registry
+    local_registry.shutdown(wait=False)
+
+class TestSyntheticWorkload:
+    """Test cases for the synthetic_workload tool"""
+
+    @pytest.mark.asyncio
+    async def test_phases_and_payload(self, workloads):
+        """Test each phase takes about its time and the payload has the requested size"""
+        start = time.perf_counter()
+        result = await workloads.execute_tool_async(
+            "synthetic_workload", {"cpu_ms": 20, "async_io_ms": 20, "blocking_io_ms": 20, "payload_bytes": 1000}
+        )
+
+        assert result.success
+        assert len(result.result["payload"]) == 1000
+        assert time.perf_counter() - start >= 0.06
+        assert result.result["elapsed_ms"] >= 60
+
+    @pytest.mark.asyncio
+    async def test_threaded_phases_leave_the_loop_free(self, workloads):
+        """Test blocking work runs off the event loop unless block_event_loop is set"""
+        async def stall(arguments) -> float:
+            """Longest gap between event loop ticks while the call runs"""
+            call = asyncio.ensure_future(workloads.execute_tool_async("synthetic_workload", arguments))
+            longest, last = 0.0, time.perf_counter()
+            while not call.done():
+                await asyncio.sleep(0.001)
+                now = time.perf_counter()
+                longest, last = max(longest, now - last), now
+            return longest
+
+        assert await stall({"blocking_io_ms": 100}) < 0.05
+        assert await stall({"blocking_io_ms": 100, "block_event_loop": True}) >= 0.09
+
+    def test_failure_rate(self, workloads):
+        """Test a failure rate of 1 always fails with an execution error, 0 never does"""
+        assert workloads.execute_tool("synthetic_workload", {"failure_rate": 1}).error_type == "EXECUTION_ERROR"
+        assert workloads.execute_tool("synthetic_workload", {"failure_rate": 0}).success
+
+    def test_limits_are_validated(self, workloads):
+        """Test out-of-range parameters are rejected before anything runs"""
+        for arguments in ({"cpu_ms": -1}, {"failure_rate": 2}, {"payload_bytes": 10 ** 9}):
+            assert workloads.execute_tool("synthetic_workload", arguments).error_type == "VALIDATION_ERROR"
+
+    def test_not_served_by_default(self):
+        """Test the workload tool is only served when its package is configured"""
+        from server.registry import registry
+        assert not registry.tool_exists("synthetic_workload")
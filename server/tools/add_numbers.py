@@ -1,6 +1,21 @@
 # Add numbers tool - simple arithmetic operation
+from typing import List
+import operator
+from ..discovery import tool
 from ..schemas.tool_schema import AddNumbersRequest, ToolResponse
 
+MAX_ABS_VALUE = 1_000_000
+
+@tool(
+    description="Adds two integers together",
+    request_model=AddNumbersRequest,
+    parameters={
+        "a": {"type": "integer", "description": "First number"},
+        "b": {"type": "integer", "description": "Second number"}
+    },
+    batch="add_numbers_batch",
+    deterministic=True
+)
 def add_numbers(request: AddNumbersRequest) -> ToolResponse:
     """
     Adds two integers together
@@ -13,7 +28,7 @@ def add_numbers(request: AddNumbersRequest) -> ToolResponse:
     """
     try:
         # Validate inputs are within reasonable range
-        if abs(request.a) > 1_000_000 or abs(request.b) > 1_000_000:
+        if abs(request.a) > MAX_ABS_VALUE or abs(request.b) > MAX_ABS_VALUE:
             return ToolResponse(
                 success=False,
                 result=None,
@@ -33,4 +48,38 @@ def add_numbers(request: AddNumbersRequest) -> ToolResponse:
             result=None,
             message=f"Error adding numbers: {str(e)}",
             error_type="EXECUTION_ERROR"
-        )
\ No newline at end of file
+        )
+
+def add_numbers_batch(requests: List[AddNumbersRequest]) -> List[ToolResponse]:
+    """
+    Vectorized add_numbers - sums whole arrays of a/b pairs at once
+    
+    Produces exactly the same responses as calling add_numbers on each
+    request, but does the arithmetic in a single pass over the columns.
+    
+    Args:
+        requests: List of AddNumbersRequest objects
+        
+    Returns:
+        List of ToolResponse objects, one per request, in order
+    """
+    a_values = [request.a for request in requests]
+    b_values = [request.b for request in requests]
+    sums = list(map(operator.add, a_values, b_values))
+    
+    responses = []
+    for a, b, result in zip(a_values, b_values, sums):
+        if abs(a) > MAX_ABS_VALUE or abs(b) > MAX_ABS_VALUE:
+            responses.append(ToolResponse(
+                success=False,
+                result=None,
+                message="Numbers too large (max absolute value: 1,000,000)",
+                error_type="VALUE_ERROR"
+            ))
+        else:
+            responses.append(ToolResponse(
+                success=True,
+                result=result,
+                message=f"Successfully added {a} + {b} = {result}"
+            ))
+    return responses
\ No newline at end of file
@@ -1,7 +1,13 @@
 # Dummy tool for testing and validation
+from ..discovery import tool
 from ..schemas.tool_schema import DummyToolRequest, ToolResponse
 import time
 
+@tool(
+    description="A dummy tool for testing server functionality",
+    request_model=DummyToolRequest,
+    parameters={}
+)
 def dummy_tool(request: DummyToolRequest) -> ToolResponse:
     """
     A simple dummy tool that returns a test message
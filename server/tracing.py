@@ -0,0 +1,212 @@
+# Tracing - request-scoped phase timings, Server-Timing and sampled OTLP JSON traces
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+import time
+
+from .config import config
+
+SERVICE_NAME = "mcp-test-server"
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current: ContextVar[Optional["Trace"]] = ContextVar("mcp_trace", default=None)
+
+def _parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """(trace id, parent span id, sampled flag) from a W3C traceparent header"""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        flags = int(parts[3], 16)
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+class Trace:
+    """
+    Timings of the phases of one request
+
+    Phases are stored as (name, start, seconds) with ``time.perf_counter``
+    starts; they are converted to wall-clock nanoseconds only when a sampled
+    trace is exported.
+    """
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_span_id", "sampled",
+        "start", "start_unix_ns", "phases", "attributes"
+    )
+
+    def __init__(self, name: str, sampled: bool, trace_id: Optional[str] = None, parent_span_id: Optional[str] = None):
+        self.name = name
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent_span_id
+        self.sampled = sampled
+        self.start = time.perf_counter()
+        self.start_unix_ns = time.time_ns()
+        self.phases: List[Tuple[str, float, float]] = []
+        self.attributes: Dict[str, Any] = {}
+
+    def add_phase(self, name: str, seconds: float, end: Optional[float] = None):
+        """Record a phase that took ``seconds`` and ended at ``end`` (default: now)"""
+        if end is None:
+            end = time.perf_counter()
+        self.phases.append((name, end - seconds, seconds))
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: every phase plus the total so far, in milliseconds"""
+        phases = sorted(self.phases, key=lambda phase: phase[1])
+        entries = [f"{name};dur={seconds * 1000:.3f}" for name, _, seconds in phases]
+        entries.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.3f}")
+        return ", ".join(entries)
+
+    def _unix_ns(self, perf_time: float) -> int:
+        return self.start_unix_ns + int((perf_time - self.start) * 1e9)
+
+    def to_otlp(self, end: float, error: bool) -> Dict[str, Any]:
+        """The trace as an OTLP/JSON ExportTraceServiceRequest with one span per phase"""
+        spans = [{
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id or "",
+            "name": self.name,
+            "kind": SPAN_KIND_SERVER,
+            "startTimeUnixNano": str(self.start_unix_ns),
+            "endTimeUnixNano": str(self._unix_ns(end)),
+            "attributes": [_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": STATUS_ERROR if error else STATUS_OK}
+        }]
+        for name, start, seconds in self.phases:
+            spans.append({
+                "traceId": self.trace_id,
+                "spanId": os.urandom(8).hex(),
+                "parentSpanId": self.span_id,
+                "name": name,
+                "kind": SPAN_KIND_INTERNAL,
+                "startTimeUnixNano": str(self._unix_ns(start)),
+                "endTimeUnixNano": str(self._unix_ns(start + seconds)),
+                "attributes": [],
+                "status": {}
+            })
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_attribute("service.name", SERVICE_NAME)]},
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}]
+            }]
+        }
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    """OTLP key/value pair"""
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+class TraceExporter:
+    """
+    Writes sampled traces to a size-rotated file, one OTLP/JSON document per line
+
+    Requests only put the trace on a queue; a background thread encodes it
+    and does the file I/O.
+    """
+
+    def __init__(self, path: str, max_bytes: int, backups: int):
+        self.path = path
+        self._queue: "queue.SimpleQueue[Dict[str, Any]]" = queue.SimpleQueue()
+        self._handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def export(self, document: Dict[str, Any]):
+        """Queue a trace for writing"""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+        self._queue.put(document)
+
+    def _run(self):
+        from .serialization import encode_json
+        while True:
+            document = self._queue.get()
+            if document is None:
+                break
+            record = logging.makeLogRecord({"msg": encode_json(document).decode(), "levelno": logging.INFO})
+            self._handler.handle(record)
+
+    def close(self):
+        """Write what is queued and close the file"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+        self._handler.close()
+
+_exporter: Optional[TraceExporter] = None
+_exporter_lock = threading.Lock()
+
+def exporter() -> Optional[TraceExporter]:
+    """The trace file exporter, or None when TRACE_FILE is not set"""
+    global _exporter
+    if _exporter is None and config.TRACE_FILE:
+        with _exporter_lock:
+            if _exporter is None:
+                _exporter = TraceExporter(config.TRACE_FILE, config.TRACE_FILE_MAX_BYTES, config.TRACE_FILE_BACKUPS)
+    return _exporter
+
+def shutdown():
+    """Flush and close the trace file"""
+    global _exporter
+    with _exporter_lock:
+        target, _exporter = _exporter, None
+    if target is not None:
+        target.close()
+
+def start_trace(name: str, traceparent: Optional[str] = None) -> Optional[Trace]:
+    """
+    Start tracing the current request
+
+    Returns None (and records nothing) when TRACING_ENABLED is off. A trace is
+    sampled for export with probability TRACE_SAMPLE_RATE, or when the
+    caller's W3C ``traceparent`` says it sampled the trace.
+    """
+    if not config.TRACING_ENABLED:
+        return None
+    parent = _parse_traceparent(traceparent)
+    sampled = (parent is not None and parent[2]) or random.random() < config.TRACE_SAMPLE_RATE
+    trace = Trace(name, sampled, *(parent[:2] if parent else ()))
+    # Each request runs in its own task, so the value never leaks into another request
+    _current.set(trace)
+    return trace
+
+def current_trace() -> Optional[Trace]:
+    """The trace of the request being handled, if any"""
+    return _current.get()
+
+def finish_trace(trace: Optional[Trace], error: bool = False):
+    """End a trace, exporting it if it was sampled"""
+    if trace is None or not trace.sampled:
+        return
+    target = exporter()
+    if target is not None:
+        target.export(trace.to_otlp(time.perf_counter(), error))
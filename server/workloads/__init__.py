@@ -0,0 +1 @@
+# Synthetic workloads package - capacity-testing tools, not served unless listed in TOOL_PACKAGES
\ No newline at end of file
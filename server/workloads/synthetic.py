@@ -0,0 +1,61 @@
+# Synthetic workload tool - simulated CPU, I/O, payload and failures for capacity testing
+import asyncio
+import random
+import time
+from ..discovery import tool
+from ..schemas.tool_schema import SyntheticWorkloadRequest, ToolResponse
+
+def burn_cpu(milliseconds: float):
+    """Keep the calling thread busy for ``milliseconds`` of its own CPU time"""
+    deadline = time.thread_time() + milliseconds / 1000
+    while time.thread_time() < deadline:
+        pass
+
+def blocking_phases(request: SyntheticWorkloadRequest):
+    """The phases that hold a thread: CPU work, then blocking I/O"""
+    if request.cpu_ms:
+        burn_cpu(request.cpu_ms)
+    if request.blocking_io_ms:
+        time.sleep(request.blocking_io_ms / 1000)
+
+@tool(
+    description="Simulates a tool workload: CPU time, async and blocking I/O, payload size and failures",
+    request_model=SyntheticWorkloadRequest
+)
+async def synthetic_workload(request: SyntheticWorkloadRequest) -> ToolResponse:
+    """
+    Run a configurable mix of work, in the order CPU, blocking I/O, async I/O
+
+    CPU and blocking phases run on a worker thread, like a synchronous tool,
+    unless ``block_event_loop`` is set, which runs them inline to reproduce a
+    tool that stalls the event loop.
+
+    Args:
+        request: SyntheticWorkloadRequest describing the phases
+
+    Returns:
+        ToolResponse with the phase timings and a payload of the requested size
+
+    Raises:
+        RuntimeError: With probability ``failure_rate``, after all phases ran
+    """
+    start = time.perf_counter()
+    if request.cpu_ms or request.blocking_io_ms:
+        if request.block_event_loop:
+            blocking_phases(request)
+        else:
+            await asyncio.to_thread(blocking_phases, request)
+    if request.async_io_ms:
+        await asyncio.sleep(request.async_io_ms / 1000)
+
+    if request.failure_rate and random.random() < request.failure_rate:
+        raise RuntimeError("Simulated failure")
+
+    return ToolResponse(
+        success=True,
+        result={
+            "elapsed_ms": (time.perf_counter() - start) * 1000,
+            "payload": "x" * request.payload_bytes
+        },
+        message="Synthetic workload completed"
+    )